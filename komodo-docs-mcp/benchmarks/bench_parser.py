@@ -0,0 +1,66 @@
+"""Single-pass scanner vs the original regex parsers on module and all-items pages.
+
+    python -m benchmarks.bench_parser [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+
+from komodo_docs_mcp.docsrs import (
+    parse_all_items_html,
+    parse_all_items_html_regex,
+    parse_module_html,
+    parse_module_html_regex,
+)
+
+from .fixtures import CRATE, is_recorded, load_page, page_url
+
+
+def _best_ms(fn, *, repeat: int, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1000
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--number", type=int, default=20)
+    args = ap.parse_args(argv)
+
+    module_html = load_page("api_read")
+    all_html = load_page("all")
+    module_kwargs = dict(crate=CRATE, version="latest", module_path="api::read", page_url=page_url("api_read"))
+
+    if parse_module_html(module_html, **module_kwargs) != parse_module_html_regex(module_html, **module_kwargs):
+        sys.exit("parse_module_html and parse_module_html_regex disagree on api_read")
+    if parse_all_items_html(all_html, version="latest") != parse_all_items_html_regex(all_html, version="latest"):
+        sys.exit("parse_all_items_html and parse_all_items_html_regex disagree on all")
+
+    cases = [
+        (
+            "api_read",
+            module_html,
+            lambda: parse_module_html_regex(module_html, **module_kwargs),
+            lambda: parse_module_html(module_html, **module_kwargs),
+        ),
+        (
+            "all",
+            all_html,
+            lambda: parse_all_items_html_regex(all_html, version="latest"),
+            lambda: parse_all_items_html(all_html, version="latest"),
+        ),
+    ]
+    for name, html, regex_fn, scan_fn in cases:
+        source = "recorded" if is_recorded(name) else "generated"
+        regex_ms = _best_ms(regex_fn, repeat=args.repeat, number=args.number)
+        scan_ms = _best_ms(scan_fn, repeat=args.repeat, number=args.number)
+        sys.stdout.write(
+            f"{name:<10} {len(html) / 1024:7.1f} KiB ({source})  regex {regex_ms:7.3f} ms"
+            f"  single-pass {scan_ms:7.3f} ms  x{regex_ms / scan_ms:.2f}\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Heap held by all-items symbols: AllItem lists + the list-based index vs SymbolTable + SearchIndex.
+
+    python -m benchmarks.bench_symbols [--copies N]
+
+Each copy is parsed from all.html separately, standing in for another crate or
+version kept loaded at the same time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import timeit
+import tracemalloc
+from array import array
+from dataclasses import dataclass
+from typing import Any, Callable, Sequence
+
+from komodo_docs_mcp.docsrs import parse_all_items_html
+from komodo_docs_mcp.index import _GRAM, _grams, _postings
+from komodo_docs_mcp.index import SearchIndex
+from komodo_docs_mcp.symbols import SymbolTable
+
+from .fixtures import is_recorded, load_page
+
+_QUERIES = ("StackListItem", "stack", "config", "read", "st")
+
+
+@dataclass(frozen=True)
+class _DictAllItem:
+    """AllItem as it was before the symbol table: a plain frozen dataclass with a __dict__."""
+
+    kind: str
+    item_path: str
+    href: str
+
+
+class _ListSearchIndex:
+    """Trigram postings over the lowercased paths and leaf names of one crate version.
+
+    Items are numbered by rank, i.e. in the order `search_all_items` breaks score
+    ties (shorter path first, then original position), so every posting list is
+    already sorted by rank and each score bucket can stop as soon as it is full.
+    `search` returns exactly what `search_all_items` returns for the same items.
+    """
+
+    def __init__(self, items: list[Any]):
+        self.items = items
+        paths = [it.item_path.lower() for it in items]
+        order = sorted(range(len(items)), key=lambda i: (len(paths[i]), i))
+        self._ranked = [items[i] for i in order]
+        self._paths = [paths[i] for i in order]
+        self._names = [p.rsplit("::", 1)[-1] for p in self._paths]
+        self._path_postings = _postings(self._paths)
+        self._name_postings = _postings(self._names)
+        self._exact: dict[str, list[int]] = {}
+        for rank, name in enumerate(self._names):
+            self._exact.setdefault(name, []).append(rank)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def search(self, query: str, *, limit: int) -> list[Any]:
+        q = (query or "").strip().lower()
+        if not q:
+            return self.items[:limit]
+        if limit <= 0:
+            return []
+
+        names = self._names
+        hits = list(self._exact.get(q, ())[:limit])
+
+        need = limit - len(hits)
+        prefix: list[int] = []
+        infix: list[int] = []
+        if need > 0:
+            for rank in self._candidates(self._name_postings, q):
+                name = names[rank]
+                if q not in name or name == q:
+                    continue
+                if name.startswith(q):
+                    prefix.append(rank)
+                    if len(prefix) >= need:
+                        break
+                elif len(infix) < need:
+                    infix.append(rank)
+            hits.extend((prefix + infix)[:need])
+
+        need = limit - len(hits)
+        if need > 0:
+            paths = self._paths
+            for rank in self._candidates(self._path_postings, q):
+                if q in paths[rank] and q not in names[rank]:
+                    hits.append(rank)
+                    need -= 1
+                    if not need:
+                        break
+
+        return [self._ranked[rank] for rank in hits]
+
+    def _candidates(self, postings: dict[str, array], q: str) -> Sequence[int]:
+        if len(q) < _GRAM:
+            return range(len(self._ranked))
+        shortest: Sequence[int] = range(len(self._ranked))
+        for gram in _grams(q):
+            ranks = postings.get(gram)
+            if ranks is None:
+                return ()
+            if len(ranks) < len(shortest):
+                shortest = ranks
+        # The rarest trigram's list is the candidate set; the substring check the caller
+        # does on each candidate is exact, so intersecting the other lists would only add work.
+        return shortest
+
+
+def _retained_kib(build: Callable[[], Any]) -> tuple[float, Any]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (after - before) / 1024, kept
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--copies", type=int, default=4)
+    args = ap.parse_args(argv)
+
+    html = load_page("all")
+    sys.stdout.write(f"all: {'recorded' if is_recorded('all') else 'generated'}\n")
+
+    def lists() -> list[Any]:
+        kept = []
+        for _ in range(args.copies):
+            _, items = parse_all_items_html(html, version="x")
+            items = [_DictAllItem(it.kind, it.item_path, it.href) for it in items]
+            kept.append((items, _ListSearchIndex(items)))
+        return kept
+
+    def tables() -> list[Any]:
+        kept = []
+        for _ in range(args.copies):
+            _, items = parse_all_items_html(html, version="x")
+            kept.append(SearchIndex(SymbolTable(items)))
+        return kept
+
+    old_kib, old = _retained_kib(lists)
+    new_kib, new = _retained_kib(tables)
+    count = len(old[0][0])
+    sys.stdout.write(
+        f"{args.copies} x {count} symbols  lists+index {old_kib:9.1f} KiB  table+index {new_kib:9.1f} KiB"
+        f"  ({new_kib / old_kib:.0%})\n"
+    )
+    for q in _QUERIES:
+        old_us = min(timeit.repeat(lambda: old[0][1].search(q, limit=20), number=200, repeat=5)) / 200 * 1e6
+        new_us = min(timeit.repeat(lambda: new[0].search(q, limit=20), number=200, repeat=5)) / 200 * 1e6
+        sys.stdout.write(f"search {q!r:<16} lists {old_us:8.1f} us  table {new_us:8.1f} us\n")
+
+
+if __name__ == "__main__":
+    main()
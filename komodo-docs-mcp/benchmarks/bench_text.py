@@ -0,0 +1,51 @@
+"""Single-pass html_to_text vs the original multi-pass _strip_tags.
+
+    python -m benchmarks.bench_text [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import timeit
+
+from komodo_docs_mcp.docsrs import _strip_tags_regex
+from komodo_docs_mcp.rustdoc import html_to_text, scan_rustdoc
+
+from .fixtures import is_recorded, load_page
+
+_DOCBLOCK_RE = re.compile(r'<div class="docblock"[^>]*>(.*?)</div>', re.S)
+
+
+def _best_ms(fn, *, repeat: int, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1000
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--number", type=int, default=10)
+    args = ap.parse_args(argv)
+
+    all_html = load_page("all")
+    module_html = load_page("api_read")
+    item_html = load_page("struct_deployment_config")
+    cases = [
+        ("all.html item paths", [e[2] for e in scan_rustdoc(all_html) if e[0] == "all-item"]),
+        ("api_read summaries", [e[4] for e in scan_rustdoc(module_html) if e[0] == "item"]),
+        ("item page docblocks", _DOCBLOCK_RE.findall(item_html)),
+    ]
+    for page in ("all", "api_read", "struct_deployment_config"):
+        sys.stdout.write(f"{page}: {'recorded' if is_recorded(page) else 'generated'}\n")
+    for name, fragments in cases:
+        old_ms = _best_ms(lambda: [_strip_tags_regex(f) for f in fragments], repeat=args.repeat, number=args.number)
+        new_ms = _best_ms(lambda: [html_to_text(f) for f in fragments], repeat=args.repeat, number=args.number)
+        sys.stdout.write(
+            f"{name:<22} {len(fragments):5d} fragments  multi-pass {old_ms:8.3f} ms"
+            f"  single-pass {new_ms:8.3f} ms  x{old_ms / new_ms:.2f}\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Throughput of the stdio transport on large and pipelined messages, vs the original bytes-buffer reader.
+
+    python -m benchmarks.bench_transport [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import sys
+import time
+import types
+from json import JSONDecoder
+from typing import Any, Optional
+from unittest import mock
+
+from komodo_docs_mcp import server
+
+
+class _BytesStdioJsonRpc:
+    """The transport before the bytearray rework: re-decodes the whole buffer on every 4 KiB read."""
+
+    def __init__(self) -> None:
+        self._buf = b""
+        self._decoder = JSONDecoder()
+        self.last_framing: Optional[str] = None
+
+    def _fill(self) -> bool:
+        reader = sys.stdin.buffer
+        read1 = getattr(reader, "read1", None)
+        chunk = read1(4096) if callable(read1) else reader.read(4096)
+        if not chunk:
+            return False
+        self._buf += chunk
+        return True
+
+    def read_message(self) -> Optional[dict[str, Any]]:
+        while True:
+            # Trim leading whitespace/newlines.
+            self._buf = self._buf.lstrip(b"\r\n\t ")
+            if not self._buf and not self._fill():
+                return None
+
+            # Header framing: Content-Length
+            lower = self._buf[:64].lower()
+            if lower.startswith(b"content-length:"):
+                self.last_framing = "content-length"
+                header_end = self._buf.find(b"\r\n\r\n")
+                sep_len = 4
+                if header_end < 0:
+                    header_end = self._buf.find(b"\n\n")
+                    sep_len = 2
+                if header_end < 0:
+                    if not self._fill():
+                        return None
+                    continue
+
+                header_blob = self._buf[:header_end].decode("utf-8", errors="replace")
+                length = None
+                for raw_line in header_blob.replace("\r\n", "\n").split("\n"):
+                    if raw_line.lower().startswith("content-length:"):
+                        try:
+                            length = int(raw_line.split(":", 1)[1].strip())
+                        except Exception:
+                            length = None
+                        break
+                if length is None:
+                    raise ValueError("invalid Content-Length header")
+
+                body_start = header_end + sep_len
+                need = body_start + length
+                while len(self._buf) < need:
+                    if not self._fill():
+                        return None
+
+                body = self._buf[body_start:need]
+                self._buf = self._buf[need:]
+                return json.loads(body.decode("utf-8", errors="replace"))
+
+            # Raw JSON (no headers, no newline required).
+            self.last_framing = "ndjson"
+            try:
+                text = self._buf.decode("utf-8")
+            except UnicodeDecodeError:
+                if not self._fill():
+                    return None
+                continue
+
+            start = 0
+            while start < len(text) and text[start] in " \t\r\n":
+                start += 1
+            if start >= len(text):
+                self._buf = b""
+                if not self._fill():
+                    return None
+                continue
+
+            try:
+                obj, end = self._decoder.raw_decode(text, start)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    return None
+                continue
+
+            consumed = len(text[:end].encode("utf-8"))
+            self._buf = self._buf[consumed:]
+            return obj
+
+
+def payloads() -> dict[str, bytes]:
+    def call(n: int, text: str) -> dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": n, "method": "tools/call", "params": {"name": "x", "arguments": {"q": text}}}
+
+    large = json.dumps(call(1, "é" * 512 * 1024), ensure_ascii=False).encode()
+    pipelined = [json.dumps(call(n, f"query {n}")).encode() for n in range(5000)]
+    pretty = call(1, "x")
+    pretty["params"]["arguments"]["items"] = [{"name": f"item {n}", "n": n} for n in range(2000)]
+    return {
+        "ndjson large (1 MiB)": large + b"\n",
+        "ndjson pretty-printed (8k lines)": json.dumps(pretty, indent=2).encode() + b"\n",
+        "ndjson pipelined (5000)": b"".join(m + b"\n" for m in pipelined),
+        "content-length large (1 MiB)": b"Content-Length: %d\r\n\r\n%s" % (len(large), large),
+        "content-length pipelined (5000)": b"".join(b"Content-Length: %d\r\n\r\n%s" % (len(m), m) for m in pipelined),
+    }
+
+
+def read_all(transport: Any, data: bytes) -> int:
+    count = 0
+    with mock.patch.object(sys, "stdin", types.SimpleNamespace(buffer=io.BytesIO(data))):
+        while transport.read_message() is not None:
+            count += 1
+    return count
+
+
+def _best_s(cls: type, data: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        read_all(cls(), data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    for name, data in payloads().items():
+        old_s = _best_s(_BytesStdioJsonRpc, data, args.repeat)
+        new_s = _best_s(server._StdioJsonRpc, data, args.repeat)
+        mib = len(data) / (1024 * 1024)
+        sys.stdout.write(
+            f"{name:<32} {mib:6.2f} MiB  bytes {mib / old_s:8.1f} MiB/s"
+            f"  bytearray {mib / new_s:8.1f} MiB/s  x{old_s / new_s:.1f}\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
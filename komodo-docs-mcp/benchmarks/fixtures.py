@@ -0,0 +1,261 @@
+"""Rustdoc pages for the offline benchmarks.
+
+Pages recorded with `python -m benchmarks.record_fixtures` are read from
+`benchmarks/fixtures/`. When a page has not been recorded, a deterministic page
+with the same rustdoc markup and komodo_client-like names and sizes is generated.
+"""
+
+from __future__ import annotations
+
+import gzip
+import os
+import random
+import zlib
+from typing import Any, Optional
+
+from komodo_docs_mcp.docsrs import DocsRsClient, DocsRsError
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+CRATE = "komodo_client"
+VERSION = "1.19.5"
+
+# name -> path below https://docs.rs/komodo_client/<version>/
+PAGES = {
+    "all": "komodo_client/all.html",
+    "api_read": "komodo_client/api/read/index.html",
+    "struct_stack_list_item_info": "komodo_client/entities/stack/struct.StackListItemInfo.html",
+    "struct_deployment_config": "komodo_client/entities/deployment/struct.DeploymentConfig.html",
+    "struct_list_stack_services": "komodo_client/api/read/struct.ListStackServices.html",
+}
+
+_RESOURCES = [
+    "Action", "Alerter", "Build", "Builder", "Deployment", "Procedure", "Repo", "ResourceSync",
+    "Server", "Stack", "Tag", "User", "UserGroup", "Variable", "GitProviderAccount",
+    "DockerRegistryAccount", "Permission", "ApiKey", "Alert", "Update",
+]
+_READ_OPS = [
+    "Get{r}", "List{r}s", "ListFull{r}s", "Get{r}ActionState", "Get{r}sSummary", "Get{r}Log",
+    "Search{r}Log", "List{r}Services", "Get{r}WebhooksEnabled", "List{r}Versions",
+]
+_WRITE_OPS = ["Create{r}", "Copy{r}", "Delete{r}", "Update{r}", "Rename{r}", "Write{r}FileContents"]
+_EXEC_OPS = ["Run{r}", "Deploy{r}", "Start{r}", "Stop{r}", "Restart{r}", "Pause{r}", "Destroy{r}", "Pull{r}"]
+_TRAITS = [
+    "Clone", "Debug", "Default", "Deserialize<'de>", "Serialize", "PartialEq", "Resolve<ReadArgs>",
+    "HasResponse", "KomodoReadRequest", "TS", "JsonSchema", "Send", "Sync", "Unpin", "UnwindSafe",
+    "RefUnwindSafe", "Freeze", "Any", "Borrow<T>", "BorrowMut<T>", "From<T>", "Into<U>",
+    "TryFrom<U>", "TryInto<U>", "ToOwned", "DeserializeOwned", "Instrument", "WithSubscriber",
+]
+_WORDS = (
+    "the a resource server stack deployment build repo returns response optional query filter id name "
+    "specific list of all matching the given with configuration state info summary update alerts user "
+    "permission tags template target log lines services containers image version branch commit"
+).split()
+
+
+def _wbr(name: str) -> str:
+    out = []
+    for i, ch in enumerate(name):
+        if i and ch.isupper() and name[i - 1].islower():
+            out.append("<wbr>")
+        out.append(ch)
+    return "".join(out)
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    words = [rng.choice(_WORDS) for _ in range(n)]
+    return " ".join(words).capitalize() + "."
+
+
+def _read_names() -> list[str]:
+    return sorted({op.format(r=r) for r in _RESOURCES for op in _READ_OPS})
+
+
+def _head(title: str, depth: int) -> str:
+    up = "../" * depth
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+        f"<title>{title}</title>"
+        f'<link rel="stylesheet" href="{up}static.files/rustdoc-1.css"></head>'
+        '<body class="rustdoc mod"><nav class="sidebar"><div class="sidebar-crate">'
+        f'<h2><a href="{up}{CRATE}/index.html">{CRATE}</a><span class="version">{VERSION}</span></h2></div>'
+    )
+
+
+def _module_page(rng: random.Random) -> str:
+    names = _read_names()
+    parts = [_head("komodo_client::api::read - Rust", 3)]
+    parts.append('<div class="sidebar-elems"><section id="rustdoc-toc"><h3><a href="#structs">Structs</a></h3><ul class="block struct">')
+    parts.extend(f'<li><a href="struct.{n}.html">{n}</a></li>' for n in names)
+    parts.append("</ul></section></div></nav><main><div class=\"width-limiter\"><section id=\"main-content\" class=\"content\">")
+    parts.append(
+        '<div class="main-heading"><div class="rustdoc-breadcrumbs"><a href="../../index.html">komodo_client</a>'
+        '::<wbr><a href="../index.html">api</a></div><h1>Module <span>read</span>&nbsp;'
+        '<button id="copy-path" title="Copy item path to clipboard">Copy item path</button></h1>'
+        '<rustdoc-toolbar></rustdoc-toolbar><span class="sub-heading"><a class="src" href="../../../src/komodo_client/api/read/mod.rs.html#1-200">Source</a></span></div>'
+    )
+    parts.append('<details class="toggle top-doc" open><summary class="hideme"><span>Expand description</span></summary>'
+                 '<div class="docblock"><h2 id="read-requests"><a class="doc-anchor" href="#read-requests">§</a>Read Requests</h2>'
+                 "<p>This module contains all the read requests. The response types are documented alongside.</p></div></details>")
+    parts.append('<h2 id="structs" class="section-header">Structs<a href="#structs" class="anchor">§</a></h2><dl class="item-table">')
+    for n in names:
+        target = rng.choice(_RESOURCES)
+        parts.append(
+            f'<dt><a class="struct" href="struct.{n}.html" title="struct komodo_client::api::read::{n}">{_wbr(n)}</a></dt>'
+            f"<dd>{_sentence(rng, 8)} Response: "
+            f'<a href="../../entities/{target.lower()}/type.{target}.html" title="type komodo_client::entities::{target.lower()}::{target}"><code>{target}</code></a>.</dd>'
+        )
+    parts.append('</dl><h2 id="enums" class="section-header">Enums<a href="#enums" class="anchor">§</a></h2><dl class="item-table">')
+    for n in ("ReadRequest", "ListItemsQuery"):
+        parts.append(f'<dt><a class="enum" href="enum.{n}.html" title="enum komodo_client::api::read::{n}">{_wbr(n)}</a></dt><dd>{_sentence(rng, 6)}</dd>')
+    parts.append('</dl><h2 id="traits" class="section-header">Traits<a href="#traits" class="anchor">§</a></h2><dl class="item-table">')
+    parts.append('<dt><a class="trait" href="trait.KomodoReadRequest.html" title="trait komodo_client::api::read::KomodoReadRequest">Komodo<wbr>Read<wbr>Request</a></dt>')
+    parts.append("</dl></section></div></main></body></html>")
+    return "".join(parts)
+
+
+def _all_page(rng: random.Random) -> str:
+    sections: dict[str, list[str]] = {"structs": [], "enums": [], "traits": [], "macros": [], "functions": [], "types": []}
+    for r in _RESOURCES:
+        low = r.lower()
+        for op in _READ_OPS:
+            n = op.format(r=r)
+            sections["structs"].append(f"api/read/struct.{n}.html|api::read::{n}")
+            sections["types"].append(f"api/read/type.{n}Response.html|api::read::{n}Response")
+        for op in _WRITE_OPS:
+            n = op.format(r=r)
+            sections["structs"].append(f"api/write/struct.{n}.html|api::write::{n}")
+        for op in _EXEC_OPS:
+            n = op.format(r=r)
+            sections["structs"].append(f"api/execute/struct.{n}.html|api::execute::{n}")
+        for suffix in (
+            "Config", "ConfigDiff", "PartialConfig", "Info", "ListItemInfo", "QuerySpecifics", "ActionState",
+            "Query", "ListItem", "Summary", "Template", "Webhook", "Log", "History", "Stats", "Target",
+            "Specifics", "Variant", "Error", "Record", "Defaults", "Secrets", "Schedule", "Metrics",
+        ):
+            sections["structs"].append(f"entities/{low}/struct.{r}{suffix}.html|entities::{low}::{r}{suffix}")
+        for suffix in ("State", "Status", "Kind"):
+            sections["enums"].append(f"entities/{low}/enum.{r}{suffix}.html|entities::{low}::{r}{suffix}")
+        sections["types"].append(f"entities/{low}/type.{r}.html|entities::{low}::{r}")
+        sections["types"].append(f"entities/{low}/type.{r}ListItem.html|entities::{low}::{r}ListItem")
+        sections["functions"].append(f"entities/{low}/fn.default_{low}_config.html|entities::{low}::default_{low}_config")
+    sections["traits"] += [
+        "api/read/trait.KomodoReadRequest.html|api::read::KomodoReadRequest",
+        "api/write/trait.KomodoWriteRequest.html|api::write::KomodoWriteRequest",
+        "api/execute/trait.KomodoExecuteRequest.html|api::execute::KomodoExecuteRequest",
+        "entities/trait.MergePartial.html|entities::MergePartial",
+    ]
+    sections["macros"] += ["macro.api_doc.html|api_doc", "macro.impl_resource.html|impl_resource"]
+    titles = {"structs": "Structs", "enums": "Enums", "traits": "Traits", "macros": "Macros", "functions": "Functions", "types": "Type Aliases"}
+    parts = [_head("List of all items in this crate", 1)]
+    parts.append('</nav><main><div class="width-limiter"><section id="main-content" class="content">'
+                 '<div class="main-heading"><h1>List of all items</h1></div>')
+    for key, entries in sections.items():
+        rng.shuffle(entries)
+        entries.sort(key=lambda e: e.split("|")[1])
+        parts.append(f'<h3 id="{key}">{titles[key]}</h3><ul class="all-items">')
+        for entry in entries:
+            href, path = entry.split("|")
+            parts.append(f'<li><a href="{href}">{_wbr(path)}</a></li>')
+        parts.append("</ul>")
+    parts.append("</section></div></main></body></html>")
+    return "".join(parts)
+
+
+def _struct_page(rng: random.Random, module: str, name: str, n_fields: int) -> str:
+    depth = module.count("::") + 2
+    up = "../" * (depth - 1)
+    parts = [_head(f"{name} in komodo_client::{module} - Rust", depth)]
+    parts.append('</nav><main><div class="width-limiter"><section id="main-content" class="content"><div class="main-heading">'
+                 f'<h1>Struct <span class="struct">{name}</span></h1></div>')
+    fields = [f"{rng.choice(_WORDS)}_{rng.choice(_WORDS)}_{i}" for i in range(n_fields)]
+    decl = [f"<pre class=\"rust item-decl\"><code>pub struct {name} {{"]
+    for f in fields:
+        decl.append(
+            f'\n    pub {f}: <a class="enum" href="https://doc.rust-lang.org/nightly/core/option/enum.Option.html" '
+            f'title="enum core::option::Option">Option</a>&lt;<a class="struct" href="https://doc.rust-lang.org/nightly/alloc/string/struct.String.html" '
+            f'title="struct alloc::string::String">String</a>&gt;,'
+        )
+    decl.append("\n}</code></pre>")
+    parts.append("".join(decl))
+    parts.append('<details class="toggle top-doc" open><summary class="hideme"><span>Expand description</span></summary><div class="docblock">')
+    for _ in range(3):
+        parts.append(f"<p>{_sentence(rng, 14)} See <a href=\"{up}entities/struct.Info.html\"><code>Info</code></a>.</p>\n")
+    parts.append("<ul>\n<li>first detail</li>\n<li>second detail</li>\n</ul>\n")
+    parts.append('<div class="example-wrap"><pre class="rust rust-example-rendered"><code><span class="kw">let </span>x = <span class="number">1</span>;</code></pre></div>')
+    parts.append("</div></details>")
+    parts.append('<h2 id="fields" class="fields section-header">Fields<a href="#fields" class="anchor">§</a></h2>')
+    for f in fields:
+        parts.append(f'<span id="structfield.{f}" class="structfield section-header"><a href="#structfield.{f}" class="anchor field">§</a>'
+                     f'<code>{f}: Option&lt;String&gt;</code></span><div class="docblock"><p>{_sentence(rng, 10)}</p></div>')
+    parts.append('<h2 id="trait-implementations" class="section-header">Trait Implementations<a href="#trait-implementations" class="anchor">§</a></h2><div id="trait-implementations-list">')
+    for t in _TRAITS:
+        parts.append(f'<details class="toggle implementors-toggle" open><summary><section id="impl-{t}-for-{name}" class="impl">'
+                     f'<a class="src rightside" href="{up}src/lib.rs.html#1">Source</a><a href="#impl-{t}-for-{name}" class="anchor">§</a>'
+                     f'<h3 class="code-header">impl {t} for <a class="struct" href="struct.{name}.html" title="struct komodo_client::{module}::{name}">{name}</a></h3></section></summary>'
+                     '<div class="impl-items">')
+        for method in range(3):
+            parts.append(f'<details class="toggle method-toggle" open><summary><section id="method.m{method}" class="method trait-impl">'
+                         f'<h4 class="code-header">fn <a href="#method.m{method}" class="fn">m{method}</a>(&amp;self) -&gt; Self</h4></section></summary>'
+                         f'<div class="docblock"><p>{_sentence(rng, 12)} <a href="https://doc.rust-lang.org/nightly/core/clone/trait.Clone.html">Read more</a></p></div></details>')
+        parts.append("</div></details>")
+    parts.append("</div></section></div></main></body></html>")
+    return "".join(parts)
+
+
+def _generate(name: str) -> str:
+    rng = random.Random(f"komodo-docs-mcp:{name}")
+    if name == "all":
+        return _all_page(rng)
+    if name == "api_read":
+        return _module_page(rng)
+    if name == "struct_stack_list_item_info":
+        return _struct_page(rng, "entities::stack", "StackListItemInfo", 24)
+    if name == "struct_deployment_config":
+        return _struct_page(rng, "entities::deployment", "DeploymentConfig", 60)
+    if name == "struct_list_stack_services":
+        return _struct_page(rng, "api::read", "ListStackServices", 2)
+    raise KeyError(name)
+
+
+def fixture_path(name: str) -> str:
+    return os.path.join(FIXTURES_DIR, f"{name}.html.gz")
+
+
+def is_recorded(name: str) -> bool:
+    return os.path.exists(fixture_path(name))
+
+
+def load_page(name: str) -> str:
+    if is_recorded(name):
+        with gzip.open(fixture_path(name), "rt", encoding="utf-8") as fp:
+            return fp.read()
+    return _generate(name)
+
+
+def page_url(name: str) -> str:
+    return f"https://docs.rs/{CRATE}/{VERSION}/{PAGES[name]}"
+
+
+class FixtureClient(DocsRsClient):
+    """Serves fixture pages through `fetch_text`; nothing touches the network.
+
+    Item pages without a fixture of their own are answered with one of the struct
+    fixtures (picked by a stable hash of the URL) so module expansions have
+    realistic pages to parse.
+    """
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(user_agent="komodo-docs-mcp-benchmarks", **kwargs)
+        self._pages = {page_url(name): load_page(name) for name in PAGES}
+        self._structs = [self._pages[page_url(name)] for name in PAGES if name.startswith("struct_")]
+        self.fetches = 0
+
+    def fetch_text(self, url: str, *, ttl_s: Optional[int] = 300, until: Any = None) -> str:  # type: ignore[override]
+        self.fetches += 1
+        url = url.replace(f"/{CRATE}/latest/", f"/{CRATE}/{VERSION}/", 1)
+        page = self._pages.get(url)
+        if page is not None:
+            return page
+        if url.startswith(f"https://docs.rs/{CRATE}/{VERSION}/") and url.endswith(".html"):
+            return self._structs[zlib.crc32(url.encode("utf-8")) % len(self._structs)]
+        raise DocsRsError(f"no fixture for {url}")
@@ -0,0 +1,26 @@
+"""Downloads the benchmark pages from docs.rs into benchmarks/fixtures/ (needs network)."""
+
+from __future__ import annotations
+
+import gzip
+import os
+import sys
+
+from komodo_docs_mcp.docsrs import DocsRsClient
+
+from .fixtures import FIXTURES_DIR, PAGES, fixture_path, page_url
+
+
+def main() -> None:
+    client = DocsRsClient(user_agent="komodo-docs-mcp-benchmarks")
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for name in PAGES:
+        url = page_url(name)
+        text = client.fetch_text(url, ttl_s=None)
+        with gzip.open(fixture_path(name), "wt", encoding="utf-8") as fp:
+            fp.write(text)
+        sys.stdout.write(f"{name}: {len(text)} chars from {url}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Offline benchmark suite: timings and allocations for parsing, search, rendering and tools/call.
+
+    python -m benchmarks.run [--filter TEXT] [--output results.json] [--baseline old.json]
+
+Every page comes from benchmarks/fixtures through FixtureClient, so nothing
+touches the network. With --baseline, cases whose median time or allocation
+peak grew by more than --threshold are flagged and the exit status is 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+import types
+from typing import Any, Callable, Optional
+
+from komodo_docs_mcp import server
+from komodo_docs_mcp.docsrs import (
+    DocItem,
+    module_docs_to_json,
+    module_docs_to_markdown,
+    search_all_items,
+)
+from komodo_docs_mcp.index import SearchIndex
+from komodo_docs_mcp.snapshot import SnapshotArchive, SnapshotClient, export_snapshot
+
+from .bench_transport import payloads as transport_payloads
+from .bench_transport import read_all
+from .fixtures import CRATE, PAGES, VERSION, FixtureClient, is_recorded, page_url
+
+SCHEMA_VERSION = 1
+_QUERIES = ("StackListItem", "stack", "config")
+_MISSPELLED = ("StackListItems", "ListStackService", "StackServicesList", "stakclistitem")
+_STRUCTS = [name for name in PAGES if name.startswith("struct_")]
+
+Case = Callable[[], Callable[[], Any]]
+
+
+def _parse_all_items() -> Callable[[], Any]:
+    client = FixtureClient()
+    return lambda: client.parse_all_items(crate=CRATE, version=VERSION)
+
+
+def _parse_module() -> Callable[[], Any]:
+    client = FixtureClient()
+    return lambda: client.parse_module(crate=CRATE, version=VERSION, module_path=f"{CRATE}::api::read")
+
+
+def _parse_item_page(name: str) -> Case:
+    def setup() -> Callable[[], Any]:
+        client = FixtureClient()
+        base_url, href = page_url(name).rsplit("/", 1)
+        item = DocItem(kind="struct", name=href.split(".")[1], href=href)
+        return lambda: client.parse_item_page(base_url=base_url + "/", item=item)
+
+    return setup
+
+
+def _search(linear: bool) -> Callable[[], Any]:
+    _, table = FixtureClient().parse_all_items(crate=CRATE, version=VERSION)
+    items = list(table)
+    if linear:
+        return lambda: [search_all_items(items, query=q, limit=20) for q in _QUERIES]
+    index = SearchIndex(items)
+    return lambda: [index.search(q, limit=20) for q in _QUERIES]
+
+
+def _fuzzy() -> Callable[[], Any]:
+    _, table = FixtureClient().parse_all_items(crate=CRATE, version=VERSION)
+    index = SearchIndex(table)
+    index.fuzzy("", limit=1)  # the deletion dictionary is built on first use
+    return lambda: [index.fuzzy(q, limit=10) for q in _MISSPELLED]
+
+
+def _snapshot_item() -> Callable[[], Any]:
+    # Cold start of the offline mode: open the archive and decode one item record.
+    path = os.path.join(tempfile.mkdtemp(prefix="komodo-docs-bench-"), f"{CRATE}.kdsnap")
+    export_snapshot(FixtureClient(), path, crate=CRATE, version=VERSION)
+    item = DocItem(kind="struct", name="GetStack", href="api/read/struct.GetStack.html")
+    base_url = f"https://docs.rs/{CRATE}/{VERSION}/{CRATE}/"
+
+    def run() -> Any:
+        archive = SnapshotArchive(path)
+        try:
+            return SnapshotClient(archive).parse_item_page(base_url=base_url, item=item)
+        finally:
+            archive.close()
+
+    return run
+
+
+def _render(render: Callable[..., str], *, include_item_docs: bool, **kwargs: Any) -> Case:
+    def setup() -> Callable[[], Any]:
+        client = FixtureClient(max_concurrency=1)
+        module = client.parse_module(crate=CRATE, version=VERSION, module_path=f"{CRATE}::api::read")
+        return lambda: render(module, include_item_docs=include_item_docs, max_items=20, client=client, **kwargs)
+
+    return setup
+
+
+def _tools_call(name: str, arguments: dict[str, Any]) -> Case:
+    def setup() -> Callable[[], Any]:
+        client = FixtureClient()
+        request = {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": name, "arguments": arguments}}
+        payload = (json.dumps(request) + "\n").encode("utf-8")
+
+        def run() -> str:
+            stdin, stdout = sys.stdin, sys.stdout
+            sys.stdin = types.SimpleNamespace(buffer=io.BytesIO(payload))  # type: ignore[assignment]
+            sys.stdout = out = io.StringIO()
+            try:
+                server.serve(server._StdioJsonRpc(), client, workers=1)
+            finally:
+                sys.stdin, sys.stdout = stdin, stdout
+            return out.getvalue()
+
+        return run
+
+    return setup
+
+
+def _transport(name: str) -> Case:
+    def setup() -> Callable[[], Any]:
+        data = transport_payloads()[name]
+        return lambda: read_all(server._StdioJsonRpc(), data)
+
+    return setup
+
+
+CASES: dict[str, Case] = {
+    "parse_all_items": _parse_all_items,
+    "parse_module": _parse_module,
+    **{f"parse_item_page[{name}]": _parse_item_page(name) for name in _STRUCTS},
+    "search_all_items": lambda: _search(linear=True),
+    "SearchIndex.search": lambda: _search(linear=False),
+    "SearchIndex.fuzzy": _fuzzy,
+    "snapshot open+item": _snapshot_item,
+    "module_docs_to_markdown": _render(module_docs_to_markdown, include_item_docs=False),
+    "module_docs_to_markdown[itemDocs]": _render(module_docs_to_markdown, include_item_docs=True),
+    "module_docs_to_json": _render(module_docs_to_json, include_item_docs=False),
+    "module_docs_to_json[itemDocs]": _render(module_docs_to_json, include_item_docs=True),
+    "module_docs_to_json[itemDocs,compact]": _render(module_docs_to_json, include_item_docs=True, compact=True),
+    "tools/call get_module_docs": _tools_call(
+        "komodo_docs_get_module_docs", {"includeItemDocs": True, "maxItems": 10}
+    ),
+    "tools/call search": _tools_call("komodo_docs_search", {"query": "StackListItem"}),
+    "tools/call get_item_docs": _tools_call("komodo_docs_get_item_docs", {"item": "entities::stack::StackListItemInfo"}),
+    **{f"transport[{name}]": _transport(name) for name in transport_payloads()},
+}
+
+
+def measure(fn: Callable[[], Any], *, repeat: int, min_time_s: float) -> dict[str, Any]:
+    fn()  # warm-up: imports, regex compilation, lazy state
+
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time_s or number >= 1000:
+            break
+        number *= 2 if elapsed * 2 >= min_time_s else 10
+    per_call = [t / number * 1000 for t in timer.repeat(repeat=repeat, number=number)]
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "calls": number * repeat,
+        "minMs": round(min(per_call), 4),
+        "medianMs": round(statistics.median(per_call), 4),
+        "peakKiB": round((peak - before) / 1024, 1),
+        "retainedKiB": round((after - before) / 1024, 1),
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], *, threshold: float) -> list[str]:
+    """Returns one line per case whose median time or allocation peak regressed past `threshold`."""
+    regressions: list[str] = []
+    for name, now in current["results"].items():
+        then = baseline.get("results", {}).get(name)
+        if not then:
+            continue
+        for key in ("medianMs", "peakKiB"):
+            if then[key] > 0 and now[key] > then[key] * (1 + threshold):
+                regressions.append(f"{name}: {key} {then[key]} -> {now[key]} (+{now[key] / then[key] - 1:.0%})")
+    return regressions
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run(*, names: list[str], repeat: int, min_time_s: float, log: Optional[Callable[[str], None]] = None) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for name in names:
+        results[name] = measure(CASES[name](), repeat=repeat, min_time_s=min_time_s)
+        if log is not None:
+            r = results[name]
+            log(f"{name:<44} {r['medianMs']:10.3f} ms  (min {r['minMs']:.3f})  peak {r['peakKiB']:9.1f} KiB")
+    return {
+        "schema": SCHEMA_VERSION,
+        "createdAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "fixtures": {name: "recorded" if is_recorded(name) else "generated" for name in PAGES},
+        "results": results,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--filter", default="", help="only run cases whose name contains this text")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--min-time", type=float, default=0.05, help="seconds per timing repeat (default: 0.05)")
+    ap.add_argument("--output", help="write results as JSON to this path")
+    ap.add_argument("--baseline", help="compare against results previously written with --output")
+    ap.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before flagging (default: 0.2)")
+    args = ap.parse_args(argv)
+
+    names = [name for name in CASES if args.filter in name]
+    if not names:
+        sys.exit(f"no benchmark matches {args.filter!r}")
+
+    def log(line: str) -> None:
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+    current = run(names=names, repeat=max(1, args.repeat), min_time_s=args.min_time, log=log)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(current, fp, indent=2, sort_keys=True)
+            fp.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fp:
+            baseline = json.load(fp)
+        regressions = compare(current, baseline, threshold=args.threshold)
+        for line in regressions:
+            log(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        log(f"no regressions against {args.baseline} (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
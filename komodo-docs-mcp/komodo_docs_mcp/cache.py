@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    url: str
+    text: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def is_fresh(self, now: float, ttl_s: Optional[float]) -> bool:
+        return ttl_s is None or (now - self.fetched_at) < ttl_s
+
+
+@dataclass(frozen=True)
+class _MemoryEntry:
+    body: bytes
+    fetched_at: float
+    etag: Optional[str]
+    last_modified: Optional[str]
+    size: int
+    digest: int
+
+
+# Rough per-entry bookkeeping cost (dict slot, dataclass, key string header).
+_ENTRY_OVERHEAD = 256
+
+
+class MemoryPageCache:
+    """In-process LRU page cache bounded by the compressed size of its entries.
+
+    Expired entries are kept until evicted because their validators still make
+    the next fetch a cheap conditional request.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, *, compress_level: int = 6):
+        self.max_bytes = max(0, int(max_bytes))
+        self._compress_level = compress_level
+        self._entries: OrderedDict[str, _MemoryEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._evict_listeners: list[Callable[[str], None]] = []
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, url: str, *, now: float, ttl_s: Optional[float]) -> Optional[CachedPage]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or not (ttl_s is None or (now - entry.fetched_at) < ttl_s):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(url)
+            self.hits += 1
+        return self._page(url, entry)
+
+    def fresh_digest(self, url: str, *, now: float, ttl_s: Optional[float]) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or not (ttl_s is None or (now - entry.fetched_at) < ttl_s):
+                return None
+            self._entries.move_to_end(url)
+            return entry.digest
+
+    def add_evict_listener(self, listener: Callable[[str], None]) -> None:
+        self._evict_listeners.append(listener)
+
+    def peek(self, url: str) -> Optional[CachedPage]:
+        with self._lock:
+            entry = self._entries.get(url)
+        return self._page(url, entry) if entry is not None else None
+
+    def put(self, page: CachedPage) -> None:
+        body = zlib.compress(page.text.encode("utf-8"), self._compress_level)
+        entry = _MemoryEntry(
+            body=body,
+            fetched_at=page.fetched_at,
+            etag=page.etag,
+            last_modified=page.last_modified,
+            size=len(body) + len(page.url) + _ENTRY_OVERHEAD,
+            digest=zlib.crc32(body),
+        )
+        dropped: list[str] = []
+        with self._lock:
+            old = self._entries.pop(page.url, None)
+            if old is not None:
+                self.size_bytes -= old.size
+                if old.digest != entry.digest:
+                    dropped.append(page.url)
+            if entry.size > self.max_bytes:
+                dropped.append(page.url)
+            else:
+                self._entries[page.url] = entry
+                self.size_bytes += entry.size
+            while self.size_bytes > self.max_bytes:
+                evicted_url, evicted = self._entries.popitem(last=False)
+                self.size_bytes -= evicted.size
+                self.evictions += 1
+                dropped.append(evicted_url)
+        for url in dropped:
+            for listener in self._evict_listeners:
+                listener(url)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "sizeBytes": self.size_bytes,
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    @staticmethod
+    def _page(url: str, entry: _MemoryEntry) -> CachedPage:
+        return CachedPage(
+            url=url,
+            text=zlib.decompress(entry.body).decode("utf-8"),
+            fetched_at=entry.fetched_at,
+            etag=entry.etag,
+            last_modified=entry.last_modified,
+        )
+
+
+class ParsedCache:
+    """Parsed page results, valid only while the source page body is unchanged.
+
+    Entries are keyed by (crate, version, page url) and tagged with the digest of
+    the page they were parsed from; they are dropped when that page leaves the
+    memory cache.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max(1, int(max_entries))
+        self._entries: OrderedDict[tuple[str, str, str], tuple[int, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, str, str], digest: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != digest:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple[str, str, str], digest: int, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (digest, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard_url(self, url: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k[2] == url]:
+                del self._entries[key]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL
+)
+"""
+
+
+class DiskPageCache:
+    """Persistent page store shared by all server processes using the same directory.
+
+    Bodies are stored zlib-compressed next to their HTTP validators so an expired
+    entry can be revalidated with a conditional request instead of re-downloaded.
+    """
+
+    def __init__(self, cache_dir: str, *, filename: str = "pages.sqlite3"):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, filename)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        with self._lock:
+            try:
+                self._db.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.Error:
+                pass
+            self._db.execute(_SCHEMA)
+            self._db.commit()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT fetched_at, etag, last_modified, body FROM pages WHERE url = ?",
+                    (url,),
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        fetched_at, etag, last_modified, body = row
+        try:
+            text = zlib.decompress(body).decode("utf-8")
+        except (zlib.error, UnicodeDecodeError):
+            return None
+        return CachedPage(url=url, text=text, fetched_at=fetched_at, etag=etag, last_modified=last_modified)
+
+    def put(self, page: CachedPage) -> None:
+        body = zlib.compress(page.text.encode("utf-8"), 6)
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO pages (url, fetched_at, etag, last_modified, body) VALUES (?, ?, ?, ?, ?)",
+                    (page.url, page.fetched_at, page.etag, page.last_modified, body),
+                )
+                self._db.commit()
+        except sqlite3.Error:
+            # The cache is an optimization; a locked or read-only database must not fail a request.
+            pass
+
+    def touch(self, url: str, fetched_at: float) -> None:
+        try:
+            with self._lock:
+                self._db.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (fetched_at, url))
+                self._db.commit()
+        except sqlite3.Error:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
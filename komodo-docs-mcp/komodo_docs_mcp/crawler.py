@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+import urllib.parse
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+from .docsrs import DocItem, DocsRsCancelled, DocsRsClient, DocsRsError, check_cancelled
+
+_MAX_ERRORS = 20
+
+
+class RateLimiter:
+    """Token bucket: on average at most `rate_per_s` acquisitions per second, `burst` back to back.
+
+    A rate of 0 or less disables the limit.
+    """
+
+    def __init__(self, rate_per_s: float, *, burst: int = 1):
+        self.rate_per_s = rate_per_s
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate_per_s <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_s)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_s = (1 - self._tokens) / self.rate_per_s
+            # Short naps keep a cancelled crawl from sitting out a long wait.
+            time.sleep(min(wait_s, 0.1))
+            check_cancelled()
+
+
+@dataclass(frozen=True)
+class CrawlReport:
+    crate: str
+    version: str
+    total: int
+    done: int
+    fetched: int  # pages that needed a request
+    cached: int  # pages already in the page cache, e.g. from an interrupted run
+    failed: int
+    elapsed_s: float
+    errors: tuple[str, ...] = ()
+
+    @property
+    def pages_per_s(self) -> float:
+        return self.done / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "crate": self.crate,
+            "version": self.version,
+            "total": self.total,
+            "done": self.done,
+            "fetched": self.fetched,
+            "cached": self.cached,
+            "failed": self.failed,
+            "elapsedS": round(self.elapsed_s, 2),
+            "pagesPerS": round(self.pages_per_s, 2),
+            "errors": list(self.errors),
+        }
+
+
+@dataclass(frozen=True)
+class _Page:
+    url: str
+    head: bool  # only the head of the page is fetched (item pages, see `item_head_complete`)
+    load: Callable[[], Any]
+
+
+def module_paths(modules: list[str]) -> list[str]:
+    """Every module holding `modules`, parents first; `""` is the crate root."""
+    # Modules that only hold other modules have no items of their own in all.html.
+    paths = {""}
+    for module in modules:
+        parts = module.split("::") if module else []
+        for n in range(1, len(parts) + 1):
+            paths.add("::".join(parts[:n]))
+    return sorted(paths, key=lambda p: (p.count("::"), p))
+
+
+def crawl_crate(
+    client: DocsRsClient,
+    *,
+    crate: str,
+    version: str = "latest",
+    include_modules: bool = False,
+    concurrency: Optional[int] = None,
+    rate_per_s: float = 0.0,
+    progress: Optional[Callable[[CrawlReport], None]] = None,
+    limiter: Optional[RateLimiter] = None,
+    results: Optional[dict[str, Any]] = None,
+) -> CrawlReport:
+    """Fetches, parses and stores every item page (and optionally module page) of a crate version.
+
+    Pages go through `parse_item_page` / `parse_module`, so they land in the page
+    caches and the full-text index exactly as a tool call would leave them. Pages
+    still fresh in the memory or disk cache are parsed from there without a request,
+    which is what makes an interrupted crawl resume where it stopped; only requests
+    count against `rate_per_s` (or a shared `limiter`). A failed page is recorded and
+    the crawl goes on. `progress` gets a report after every page, from the calling thread.
+    With `results`, each page that loaded is stored there by URL (its `ModuleDocs` or
+    detailed `DocItem`), independent of what the page cache keeps.
+    """
+    started = time.perf_counter()
+    page_version, table = client.parse_all_items(crate=crate, version=version)
+    base_url = f"https://docs.rs/{crate}/{page_version}/{crate}/"
+
+    pages: list[_Page] = []
+    if include_modules:
+        for module in module_paths(table.modules):
+            module_path = f"{crate}::{module}" if module else crate
+            pages.append(
+                _Page(
+                    url=client.module_url(crate, page_version, module_path),
+                    head=False,
+                    load=lambda m=module_path: client.parse_module(crate=crate, version=page_version, module_path=m),
+                )
+            )
+    for row in range(len(table)):
+        item = DocItem(kind=table.kind(row), name=table.names[row], href=table.href(row))
+        pages.append(_item_page(client, base_url, item))
+    return _crawl(
+        client,
+        pages,
+        crate=crate,
+        version=page_version,
+        concurrency=concurrency,
+        limiter=limiter or RateLimiter(rate_per_s),
+        progress=progress,
+        started=started,
+        results=results,
+    )
+
+
+def crawl_item_pages(
+    client: DocsRsClient,
+    items: Iterable[tuple[str, DocItem]],
+    *,
+    crate: str,
+    version: str,
+    concurrency: Optional[int] = None,
+    rate_per_s: float = 0.0,
+    progress: Optional[Callable[[CrawlReport], None]] = None,
+    limiter: Optional[RateLimiter] = None,
+    results: Optional[dict[str, Any]] = None,
+) -> CrawlReport:
+    """Like `crawl_crate`, for given `(base_url, item)` pages, e.g. items only listed on module pages."""
+    pages = [_item_page(client, base_url, item) for base_url, item in items]
+    return _crawl(
+        client,
+        pages,
+        crate=crate,
+        version=version,
+        concurrency=concurrency,
+        limiter=limiter or RateLimiter(rate_per_s),
+        progress=progress,
+        started=time.perf_counter(),
+        results=results,
+    )
+
+
+def _item_page(client: DocsRsClient, base_url: str, item: DocItem) -> _Page:
+    return _Page(
+        url=urllib.parse.urljoin(base_url, item.href),
+        head=True,
+        load=lambda: client.parse_item_page(base_url=base_url, item=item),
+    )
+
+
+def _crawl(
+    client: DocsRsClient,
+    pages: list[_Page],
+    *,
+    crate: str,
+    version: str,
+    concurrency: Optional[int],
+    limiter: RateLimiter,
+    progress: Optional[Callable[[CrawlReport], None]],
+    started: float,
+    results: Optional[dict[str, Any]] = None,
+) -> CrawlReport:
+    counts = {"done": 0, "fetched": 0, "cached": 0, "failed": 0}
+    errors: list[str] = []
+
+    def report() -> CrawlReport:
+        return CrawlReport(
+            crate=crate,
+            version=version,
+            total=len(pages),
+            elapsed_s=time.perf_counter() - started,
+            errors=tuple(errors),
+            **counts,
+        )
+
+    def run(page: _Page) -> tuple[bool, Any]:
+        cached = client.is_cached(page.url, head=page.head)
+        if not cached:
+            limiter.acquire()
+        return cached, page.load()
+
+    workers = max(1, min(concurrency or client.max_concurrency, len(pages) or 1))
+    # At most two pages per worker are queued, so cancellation leaves little work behind.
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="docsrs-crawl") as pool:
+        queue = iter(pages)
+        running: dict[Future[tuple[bool, Any]], _Page] = {}
+
+        def submit_next() -> None:
+            page = next(queue, None)
+            if page is not None:
+                running[pool.submit(contextvars.copy_context().run, run, page)] = page
+
+        for _ in range(workers * 2):
+            submit_next()
+        try:
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    page = running.pop(future)
+                    try:
+                        cached, value = future.result()
+                    except DocsRsCancelled:
+                        raise
+                    except DocsRsError as e:
+                        counts["failed"] += 1
+                        if len(errors) < _MAX_ERRORS:
+                            errors.append(f"{page.url}: {e}")
+                    else:
+                        counts["cached" if cached else "fetched"] += 1
+                        if results is not None:
+                            results[page.url] = value
+                    counts["done"] += 1
+                    if progress is not None:
+                        progress(report())
+                    submit_next()
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
+    return report()
@@ -1,14 +1,27 @@
 from __future__ import annotations
 
-import json
+import contextvars
+import http.client
 import re
 import time
-import urllib.error
+import threading
 import urllib.parse
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from html import unescape
-from typing import Any, Iterable, Optional
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, TypeVar
+
+from .cache import CachedPage, DiskPageCache, MemoryPageCache, ParsedCache
+from .fulltext import FullTextIndex
+from .httppool import HttpPool
+from .index import SearchIndex
+from .jsonio import dumps
+from .metrics import Metrics
+from .rustdoc import html_to_text, scan_rustdoc
+from .symbols import AllItem, SymbolTable
+
+_T = TypeVar("_T")
 
 
 @dataclass(frozen=True)
@@ -37,13 +50,6 @@ class ModuleDocs:
     sections: list[DocSection]
 
 
-@dataclass(frozen=True)
-class AllItem:
-    kind: str
-    item_path: str
-    href: str
-
-
 def filter_module_docs(module: ModuleDocs, *, query: str) -> ModuleDocs:
     q = (query or "").strip().lower()
     if not q:
@@ -72,6 +78,30 @@ class DocsRsError(RuntimeError):
     pass
 
 
+class DocsRsCancelled(DocsRsError):
+    pass
+
+
+_CANCEL_EVENT: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "komodo_docs_cancel_event", default=None
+)
+
+
+@contextmanager
+def cancellation_scope(event: threading.Event) -> Iterator[None]:
+    token = _CANCEL_EVENT.set(event)
+    try:
+        yield
+    finally:
+        _CANCEL_EVENT.reset(token)
+
+
+def check_cancelled() -> None:
+    event = _CANCEL_EVENT.get()
+    if event is not None and event.is_set():
+        raise DocsRsCancelled("request cancelled")
+
+
 _SECTION_RE = re.compile(
     r'<h2 id="(?P<id>[^"]+)" class="section-header">(?P<title>.*?)<a href="#',
     re.S,
@@ -89,12 +119,16 @@ _VERSION_RE = re.compile(r'<span class="version">(?P<ver>[^<]+)</span>', re.S)
 
 _ITEM_DOCBLOCK_RE = re.compile(r'<div class="docblock"[^>]*>(?P<html>.*?)</div>', re.S)
 _ITEM_DECL_RE = re.compile(r'<pre class="rust item-decl">(?P<html>.*?)</pre>', re.S)
+# parse_item_html only reads the first item-decl <pre> and the first docblock.
+_ITEM_HEAD_MARKS = ((b'<pre class="rust item-decl">', b"</pre>"), (b'<div class="docblock"', b"</div>"))
 _ALL_SECTION_RE = re.compile(r'<h3 id="(?P<id>[^"]+)">(?P<title>[^<]+)</h3>', re.S)
 _ALL_UL_RE = re.compile(r'<ul class="all-items">(?P<html>.*?)</ul>', re.S)
 _ALL_A_RE = re.compile(r'<a href="(?P<href>[^"]+)">(?P<text>.*?)</a>', re.S)
 
 
-def _strip_tags(html: str) -> str:
+def _strip_tags_regex(html: str) -> str:
+    # The original multi-pass stripper; kept for benchmarks. The `\\s` patterns in the
+    # raw strings never matched, so <br>, </p>, <li>, </li>, </pre> and </code> were dropped.
     html = re.sub(r"</?(?:wbr|span)[^>]*>", "", html)
     html = re.sub(r"<br\\s*/?>", "\n", html)
     html = re.sub(r"</p\\s*>", "\n\n", html)
@@ -120,36 +154,403 @@ def normalize_module_path(crate: str, module_path: str) -> str:
     return module_path
 
 
+def _inline_text(html: str) -> str:
+    # Item names and paths are plain text broken up by <wbr>; skip the full stripper for those.
+    text = html.replace("<wbr>", "")
+    if "<" in text or "&" in text or "\n" in text:
+        return html_to_text(html)
+    return text.strip()
+
+
+def _page_version(html: str) -> Optional[str]:
+    vm = _VERSION_RE.search(html)
+    if vm:
+        return unescape(vm.group("ver")).strip() or None
+    return None
+
+
+def _module_fqn(breadcrumbs: list[str], module_name: Optional[str], module_path: str) -> str:
+    module_fqn = "::".join([*breadcrumbs, module_name] if module_name else breadcrumbs)
+    if not module_fqn:
+        module_fqn = module_path.replace("/", "::")
+    return module_fqn
+
+
+def parse_module_html(html: str, *, crate: str, version: str, module_path: str, page_url: str) -> ModuleDocs:
+    page_version = version
+    module_name = None
+    breadcrumbs: list[str] = []
+    sections: list[DocSection] = []
+    items: list[DocItem] = []
+    for event in scan_rustdoc(html):
+        kind = event[0]
+        if kind == "item":
+            _, css_class, href, name_html, summary_html = event
+            items.append(
+                DocItem(
+                    kind=css_class.split()[0],
+                    name=_inline_text(name_html),
+                    href=unescape(href),
+                    summary=html_to_text(summary_html) if summary_html else None,
+                )
+            )
+        elif kind == "section":
+            items = []
+            sections.append(DocSection(id=event[1], title=html_to_text(event[2]), items=items))
+        elif kind == "breadcrumb":
+            t = html_to_text(event[1])
+            if t:
+                breadcrumbs.append(t.replace("\u00ad", ""))
+        elif kind == "module":
+            module_name = html_to_text(event[1])
+        elif kind == "version":
+            page_version = unescape(event[1]).strip() or version
+
+    return ModuleDocs(
+        crate=crate,
+        version=page_version,
+        module_path=_module_fqn(breadcrumbs, module_name, module_path),
+        page_url=page_url,
+        sections=sections,
+    )
+
+
+def parse_module_html_regex(html: str, *, crate: str, version: str, module_path: str, page_url: str) -> ModuleDocs:
+    # The original multi-scan parser; kept as the reference for tests and benchmarks.
+    page_version = _page_version(html) or version
+
+    module_name = None
+    m1 = _H1_MODULE_RE.search(html)
+    if m1:
+        module_name = html_to_text(m1.group("name"))
+
+    breadcrumbs: list[str] = []
+    bm = _BREADCRUMBS_RE.search(html)
+    if bm:
+        for m in _BREADCRUMB_LINK_RE.finditer(bm.group("html")):
+            t = html_to_text(m.group("text"))
+            if t:
+                breadcrumbs.append(t.replace("\u00ad", ""))
+
+    module_fqn = _module_fqn(breadcrumbs, module_name, module_path)
+
+    sections: list[DocSection] = []
+    # rustdoc module pages: repeated (<h2.section-header> + <dl.item-table>)
+    # We find all section headers first, then pair them with the next dl.
+    pos = 0
+    while True:
+        hm = _SECTION_RE.search(html, pos)
+        if not hm:
+            break
+        section_id = hm.group("id")
+        title = html_to_text(hm.group("title"))
+        dlm = _DL_AFTER_SECTION_RE.search(html, hm.end())
+        if not dlm:
+            pos = hm.end()
+            continue
+        dl_html = dlm.group("dl")
+        pos = dlm.end()
+
+        items: list[DocItem] = []
+        for m in _DT_DD_RE.finditer(dl_html):
+            dt_html = m.group("dt")
+            dd_html = m.group("dd")
+            am = _A_RE.search(dt_html)
+            if not am:
+                continue
+            kind = am.group("class").split()[0]
+            href = unescape(am.group("href"))
+            name = html_to_text(am.group("text"))
+            summary = html_to_text(dd_html) if dd_html else None
+            items.append(DocItem(kind=kind, name=name, href=href, summary=summary))
+
+        sections.append(DocSection(id=section_id, title=title, items=items))
+
+    return ModuleDocs(
+        crate=crate,
+        version=page_version,
+        module_path=module_fqn,
+        page_url=page_url,
+        sections=sections,
+    )
+
+
+def parse_item_html(html: str, *, item: DocItem) -> DocItem:
+    signature = None
+    sm = _ITEM_DECL_RE.search(html)
+    if sm:
+        signature = html_to_text(sm.group("html"))
+
+    docs = None
+    dm = _ITEM_DOCBLOCK_RE.search(html)
+    if dm:
+        docs = html_to_text(dm.group("html"))
+
+    return DocItem(
+        kind=item.kind,
+        name=item.name,
+        href=item.href,
+        summary=item.summary,
+        signature=signature,
+        docs=docs,
+    )
+
+
+def item_head_complete(body: bytearray) -> bool:
+    """Whether a page prefix already holds everything `parse_item_html` reads."""
+    for start, end in _ITEM_HEAD_MARKS:
+        at = body.find(start)
+        if at < 0 or body.find(end, at + len(start)) < 0:
+            return False
+    return True
+
+
+def _head_url(url: str) -> str:
+    # Cache key for a page prefix cut short by `until`; the full page keeps its own URL.
+    return url + "#head"
+
+
+def parse_all_items_html(html: str, *, version: str) -> tuple[str, list[AllItem]]:
+    page_version = version
+    items: list[AllItem] = []
+    kind = ""
+    for event in scan_rustdoc(html):
+        if event[0] == "all-item":
+            item_path = _inline_text(event[2]).replace("\u00ad", "").strip()
+            if item_path:
+                items.append(AllItem(kind=kind, item_path=item_path, href=unescape(event[1])))
+        elif event[0] == "all-section":
+            kind = html_to_text(event[2]).strip().lower().strip()
+        elif event[0] == "version":
+            page_version = unescape(event[1]).strip() or version
+    return page_version, items
+
+
+def parse_all_items_html_regex(html: str, *, version: str) -> tuple[str, list[AllItem]]:
+    # The original multi-scan parser; kept as the reference for tests and benchmarks.
+    page_version = _page_version(html) or version
+
+    items: list[AllItem] = []
+    pos = 0
+    while True:
+        sm = _ALL_SECTION_RE.search(html, pos)
+        if not sm:
+            break
+        section_title = html_to_text(sm.group("title")).strip()
+        ulm = _ALL_UL_RE.search(html, sm.end())
+        if not ulm:
+            pos = sm.end()
+            continue
+        pos = ulm.end()
+
+        kind = section_title.lower().strip()
+        for am in _ALL_A_RE.finditer(ulm.group("html")):
+            href = unescape(am.group("href"))
+            item_path = html_to_text(am.group("text")).replace("\u00ad", "").strip()
+            if not item_path:
+                continue
+            items.append(AllItem(kind=kind, item_path=item_path, href=href))
+
+    return page_version, items
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: dict[str, _Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], _T]) -> _T:
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if flight is None:
+                    flight = self._flights[key] = _Flight()
+                    self.started += 1
+                else:
+                    self.coalesced += 1
+            if leader:
+                break
+            flight.done.wait()
+            # The leader's cancellation is its own: followers run the call again instead.
+            if isinstance(flight.error, DocsRsCancelled):
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"inFlight": len(self._flights), "started": self.started, "coalesced": self.coalesced}
+
+
 class DocsRsClient:
-    def __init__(self, *, user_agent: str = "komodo-docs-mcp/0.1.0"):
+    def __init__(
+        self,
+        *,
+        user_agent: str = "komodo-docs-mcp/0.1.0",
+        disk_cache: Optional[DiskPageCache] = None,
+        memory_cache: Optional[MemoryPageCache] = None,
+        max_concurrency: int = 8,
+        http_pool: Optional[HttpPool] = None,
+        fulltext: Optional[FullTextIndex] = None,
+        latest_ttl_s: int = 300,
+        metrics: Optional[Metrics] = None,
+    ):
         self._user_agent = user_agent
-        self._cache: dict[str, tuple[float, str]] = {}
-
-    def fetch_text(self, url: str, *, ttl_s: int = 300) -> str:
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._http = http_pool if http_pool is not None else HttpPool(max_idle_per_host=self.max_concurrency)
+        self._cache = memory_cache if memory_cache is not None else MemoryPageCache()
+        self._disk = disk_cache
+        self.fulltext = fulltext if fulltext is not None else FullTextIndex()
+        self._parsed = ParsedCache()
+        self._inflight = _SingleFlight()
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.latest_ttl_s = latest_ttl_s
+        self._latest: dict[str, tuple[float, str]] = {}
+        self._latest_lock = threading.Lock()
+        self._cache.add_evict_listener(self._parsed.discard_url)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "memory": self._cache.stats(),
+            "parsed": self._parsed.stats(),
+            "disk": self._disk.path if self._disk is not None else None,
+            "http": self._http.stats(),
+            "inflight": self._inflight.stats(),
+        }
+
+    def fetch_text(
+        self, url: str, *, ttl_s: Optional[int] = 300, until: Optional[Callable[[bytearray], bool]] = None
+    ) -> str:
+        """Returns the page at `url`, from cache when fresh.
+
+        With `until`, the caller only needs the page up to the point where
+        `until(decoded_bytes_so_far)` holds: the download stops there and the
+        returned text may be a prefix, cached apart from the full page.
+        """
+        with self.metrics.timed("fetch", stage="fetch"):
+            fresh = self._cache.get(url, now=time.time(), ttl_s=ttl_s)
+            if fresh is None and until is not None:
+                fresh = self._cache.get(_head_url(url), now=time.time(), ttl_s=ttl_s)
+            if fresh is not None:
+                self.metrics.incr("fetch.memory")
+                return fresh.text
+            check_cancelled()
+            key = url if until is None else _head_url(url)
+            return self._inflight.do(key, lambda: self._fetch_uncached(url, ttl_s=ttl_s, until=until))
+
+    def _fetch_uncached(
+        self, url: str, *, ttl_s: Optional[int], until: Optional[Callable[[bytearray], bool]] = None
+    ) -> str:
         now = time.time()
-        cached = self._cache.get(url)
-        if cached and (now - cached[0]) < ttl_s:
-            return cached[1]
-
-        req = urllib.request.Request(
-            url,
-            headers={
-                "User-Agent": self._user_agent,
-                "Accept": "text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8",
-            },
-        )
+        cached = None
+        for key in (url, _head_url(url)) if until is not None else (url,):
+            cached = self._cache.peek(key)
+            if cached is not None and cached.is_fresh(now, ttl_s):
+                # Another caller's flight finished between our cache miss and this one starting.
+                self.metrics.incr("fetch.memory")
+                return cached.text
+
+            # A stale entry is still useful: its validators turn the refetch into a conditional request.
+            if self._disk is not None:
+                stored = self._disk.get(key)
+                if stored and (cached is None or stored.fetched_at > cached.fetched_at):
+                    cached = stored
+                    if stored.is_fresh(now, ttl_s):
+                        self._cache.put(stored)
+                        self.metrics.incr("fetch.disk")
+                        return stored.text
+            if cached is not None:
+                break
+
+        headers = {
+            "User-Agent": self._user_agent,
+            "Accept": "text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8",
+        }
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
         try:
-            with urllib.request.urlopen(req, timeout=20) as resp:
-                raw = resp.read()
-        except urllib.error.HTTPError as e:
-            raise DocsRsError(f"docs.rs returned HTTP {e.code} for {url}") from e
-        except urllib.error.URLError as e:
+            with self.metrics.timed("fetch.http"):
+                resp = self._http.get(url, headers=headers, until=until)
+        except (OSError, http.client.HTTPException) as e:
+            self.metrics.incr("fetch.errors")
             raise DocsRsError(f"failed to reach docs.rs for {url}: {e}") from e
-
-        text = raw.decode("utf-8", errors="replace")
-        self._cache[url] = (now, text)
+        if resp.status == 304 and cached is not None:
+            self.metrics.incr("fetch.notModified")
+            return self._revalidated(cached, now)
+        if resp.status >= 300:
+            self.metrics.incr("fetch.errors")
+            raise DocsRsError(f"docs.rs returned HTTP {resp.status} for {url}")
+        self.metrics.incr("fetch.network")
+
+        text = resp.body.decode("utf-8", errors="replace")
+        page = CachedPage(
+            url=url if resp.complete else _head_url(url),
+            text=text,
+            fetched_at=now,
+            etag=resp.headers.get("etag"),
+            last_modified=resp.headers.get("last-modified"),
+        )
+        self._cache.put(page)
+        if self._disk is not None:
+            self._disk.put(page)
         return text
 
+    def is_cached(self, url: str, *, head: bool = False) -> bool:
+        """Whether `fetch_text(url)` (with `head`: cut short by `until`) would be served without a request."""
+        now = time.time()
+        ttl_s = self._page_ttl(url)
+        keys = (url, _head_url(url)) if head else (url,)
+        if any(self._cache.fresh_digest(key, now=now, ttl_s=ttl_s) is not None for key in keys):
+            return True
+        if self._disk is None:
+            return False
+        for key in keys:
+            stored = self._disk.get(key)
+            if stored is not None and stored.is_fresh(now, ttl_s):
+                return True
+        return False
+
+    def _revalidated(self, page: CachedPage, now: float) -> str:
+        fresh = CachedPage(
+            url=page.url,
+            text=page.text,
+            fetched_at=now,
+            etag=page.etag,
+            last_modified=page.last_modified,
+        )
+        self._cache.put(fresh)
+        if self._disk is not None:
+            self._disk.touch(page.url, now)
+        return fresh.text
+
     def module_url(self, crate: str, version: str, module_path: str) -> str:
         norm = normalize_module_path(crate, module_path)
         base = f"https://docs.rs/{urllib.parse.quote(crate)}/{urllib.parse.quote(version)}/"
@@ -161,126 +562,179 @@ class DocsRsClient:
         base = f"https://docs.rs/{urllib.parse.quote(crate)}/{urllib.parse.quote(version)}/"
         return urllib.parse.urljoin(base, f"{crate}/all.html")
 
-    def parse_module(self, *, crate: str, version: str, module_path: str) -> ModuleDocs:
-        page_url = self.module_url(crate, version, module_path)
-        html = self.fetch_text(page_url)
-
-        page_version = version
-        vm = _VERSION_RE.search(html)
-        if vm:
-            page_version = unescape(vm.group("ver")).strip()
-
-        module_name = None
-        m1 = _H1_MODULE_RE.search(html)
-        if m1:
-            module_name = _strip_tags(m1.group("name"))
-
-        breadcrumbs: list[str] = []
-        bm = _BREADCRUMBS_RE.search(html)
-        if bm:
-            for m in _BREADCRUMB_LINK_RE.finditer(bm.group("html")):
-                t = _strip_tags(m.group("text"))
-                if t:
-                    breadcrumbs.append(t.replace("\u00ad", ""))
-
-        module_fqn = "::".join([*breadcrumbs, module_name] if module_name else breadcrumbs)
-        if not module_fqn:
-            module_fqn = module_path.replace("/", "::")
-
-        sections: list[DocSection] = []
-        # rustdoc module pages: repeated (<h2.section-header> + <dl.item-table>)
-        # We find all section headers first, then pair them with the next dl.
-        pos = 0
-        while True:
-            hm = _SECTION_RE.search(html, pos)
-            if not hm:
-                break
-            section_id = hm.group("id")
-            title = _strip_tags(hm.group("title"))
-            dlm = _DL_AFTER_SECTION_RE.search(html, hm.end())
-            if not dlm:
-                pos = hm.end()
-                continue
-            dl_html = dlm.group("dl")
-            pos = dlm.end()
-
-            items: list[DocItem] = []
-            for m in _DT_DD_RE.finditer(dl_html):
-                dt_html = m.group("dt")
-                dd_html = m.group("dd")
-                am = _A_RE.search(dt_html)
-                if not am:
-                    continue
-                kind = am.group("class").split()[0]
-                href = unescape(am.group("href"))
-                name = _strip_tags(am.group("text"))
-                summary = _strip_tags(dd_html) if dd_html else None
-                items.append(DocItem(kind=kind, name=name, href=href, summary=summary))
-
-            sections.append(DocSection(id=section_id, title=title, items=items))
-
-        return ModuleDocs(
-            crate=crate,
-            version=page_version,
-            module_path=module_fqn,
-            page_url=page_url,
-            sections=sections,
-        )
-
-    def parse_item_page(self, *, base_url: str, item: DocItem) -> DocItem:
-        url = urllib.parse.urljoin(base_url, item.href)
-        html = self.fetch_text(url)
-
-        signature = None
-        sm = _ITEM_DECL_RE.search(html)
-        if sm:
-            signature = _strip_tags(sm.group("html"))
-
-        docs = None
-        dm = _ITEM_DOCBLOCK_RE.search(html)
-        if dm:
-            docs = _strip_tags(dm.group("html"))
-
-        return DocItem(
-            kind=item.kind,
-            name=item.name,
-            href=item.href,
-            summary=item.summary,
-            signature=signature,
-            docs=docs,
-        )
-
-    def parse_all_items(self, *, crate: str, version: str) -> tuple[str, list[AllItem]]:
-        url = self.all_items_url(crate, version)
-        html = self.fetch_text(url)
+    def resolve_version(self, crate: str, version: str) -> str:
+        """Maps `latest` to the concrete version learned from a recent `latest` page, if any."""
+        if version != "latest":
+            return version
+        with self._latest_lock:
+            pinned = self._latest.get(crate)
+        if pinned and (time.time() - pinned[0]) < self.latest_ttl_s:
+            return pinned[1]
+        return version
+
+    def _versioned_page(self, crate: str, version: str, url_for: Callable[[str], str]) -> tuple[str, str]:
+        # Pages under a concrete version never change, so only the latest -> version
+        # pointer needs a TTL. An unknown or expired pointer is refreshed from the
+        # requested page itself, which then also seeds the immutable versioned entry.
+        resolved = self.resolve_version(crate, version)
+        if resolved != "latest":
+            return resolved, url_for(resolved)
+        html = self.fetch_text(url_for("latest"), ttl_s=self.latest_ttl_s)
+        page_version = _page_version(html)
+        if not page_version:
+            return "latest", url_for("latest")
+        now = time.time()
+        with self._latest_lock:
+            self._latest[crate] = (now, page_version)
+        url = url_for(page_version)
+        if self._cache.peek(url) is None:
+            self._cache.put(CachedPage(url=url, text=html, fetched_at=now))
+        return page_version, url
 
-        page_version = version
-        vm = _VERSION_RE.search(html)
-        if vm:
-            page_version = unescape(vm.group("ver")).strip()
+    def _page_ttl(self, url: str) -> Optional[int]:
+        parts = urllib.parse.urlsplit(url).path.split("/")
+        return self.latest_ttl_s if len(parts) > 2 and parts[2] == "latest" else None
 
-        items: list[AllItem] = []
-        pos = 0
-        while True:
-            sm = _ALL_SECTION_RE.search(html, pos)
-            if not sm:
-                break
-            section_title = _strip_tags(sm.group("title")).strip()
-            ulm = _ALL_UL_RE.search(html, sm.end())
-            if not ulm:
-                pos = sm.end()
-                continue
-            pos = ulm.end()
+    def parse_module(self, *, crate: str, version: str, module_path: str) -> ModuleDocs:
+        resolved, page_url = self._versioned_page(crate, version, lambda v: self.module_url(crate, v, module_path))
+
+        def parse(html: str) -> ModuleDocs:
+            module = parse_module_html(html, crate=crate, version=resolved, module_path=module_path, page_url=page_url)
+            self.fulltext.add_listings(
+                (urllib.parse.urljoin(page_url, it.href), it.name, it.summary)
+                for section in module.sections
+                for it in section.items
+            )
+            return module
 
-            kind = section_title.lower().strip()
-            for am in _ALL_A_RE.finditer(ulm.group("html")):
-                href = unescape(am.group("href"))
-                item_path = _strip_tags(am.group("text")).replace("\u00ad", "").strip()
-                if not item_path:
-                    continue
-                items.append(AllItem(kind=kind, item_path=item_path, href=href))
+        return self._parsed_page((crate, resolved, page_url), parse, name="parse.module")
 
-        return page_version, items
+    def parse_item_page(self, *, base_url: str, item: DocItem) -> DocItem:
+        url = urllib.parse.urljoin(base_url, item.href)
+        html = self.fetch_text(url, ttl_s=self._page_ttl(url), until=item_head_complete)
+        with self.metrics.timed("parse.item", stage="parse"):
+            detailed = parse_item_html(html, item=item)
+            self.fulltext.add_page(url, name=item.name, signature=detailed.signature, docs=detailed.docs)
+        return detailed
+
+    def parse_all_items(self, *, crate: str, version: str) -> tuple[str, SymbolTable]:
+        page_version, index = self.all_items_index(crate=crate, version=version)
+        return page_version, index.table
+
+    def all_items_index(self, *, crate: str, version: str) -> tuple[str, SearchIndex]:
+        resolved, url = self._versioned_page(crate, version, lambda v: self.all_items_url(crate, v))
+
+        def parse(html: str) -> tuple[str, SearchIndex]:
+            page_version, items = parse_all_items_html(html, version=resolved)
+            return page_version, SearchIndex(SymbolTable(items))
+
+        return self._parsed_page((crate, resolved, url), parse, name="parse.allItems")
+
+    def _parsed_page(self, key: tuple[str, str, str], parse: Callable[[str], _T], *, name: str) -> _T:
+        # Parsed results are only reused while the page they came from is still fresh
+        # in the memory cache and unchanged (same body digest).
+        url = key[2]
+        ttl_s = self._page_ttl(url)
+        digest = self._cache.fresh_digest(url, now=time.time(), ttl_s=ttl_s)
+        if digest is not None:
+            hit = self._parsed.get(key, digest)
+            if hit is not None:
+                return hit
+        # Concurrent callers of the same page (e.g. a tool call racing the startup warmup) share one parse.
+        return self._inflight.do("parsed " + url, lambda: self._parse_page(key, parse, name=name, ttl_s=ttl_s))
+
+    def _parse_page(
+        self, key: tuple[str, str, str], parse: Callable[[str], _T], *, name: str, ttl_s: Optional[int]
+    ) -> _T:
+        url = key[2]
+        html = self.fetch_text(url, ttl_s=ttl_s)
+        with self.metrics.timed(name, stage="parse"):
+            value = parse(html)
+        digest = self._cache.fresh_digest(url, now=time.time(), ttl_s=ttl_s)
+        if digest is not None:
+            self._parsed.put(key, digest, value)
+        return value
+
+    def parse_item_pages(
+        self,
+        *,
+        base_url: str,
+        items: list[DocItem],
+        concurrency: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> list[DocItem]:
+        """Parses the item pages of `items` in order; `progress(done, total)` runs after each one."""
+        done = 0
+        done_lock = threading.Lock()
+
+        def parse(it: DocItem) -> DocItem:
+            nonlocal done
+            detailed = self.parse_item_page(base_url=base_url, item=it)
+            if progress is not None:
+                # Reported under the lock so counts reach the callback in increasing order.
+                with done_lock:
+                    done += 1
+                    progress(done, len(items))
+            return detailed
+
+        workers = max(1, min(concurrency or self.max_concurrency, len(items)))
+        if workers <= 1:
+            return [parse(it) for it in items]
+
+        # Results are collected in submission order so the output does not depend on timing.
+        # Each task runs in a copy of the caller's context so cancellation reaches the workers.
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="docsrs-item") as pool:
+            futures = [pool.submit(contextvars.copy_context().run, parse, it) for it in items]
+            try:
+                return [f.result() for f in futures]
+            except BaseException:
+                for f in futures:
+                    f.cancel()
+                raise
+
+
+def _expansion_slots(module: ModuleDocs, max_items: int) -> list[tuple[int, int]]:
+    return [
+        (section_idx, item_idx)
+        for section_idx, section in enumerate(module.sections)
+        for item_idx in range(min(len(section.items), max_items))
+    ]
+
+
+def expansion_items(module: ModuleDocs, *, max_items: int) -> list[DocItem]:
+    """The items `includeItemDocs` expands, in output order: the first max_items of every section."""
+    return [module.sections[s].items[i] for s, i in _expansion_slots(module, max_items)]
+
+
+def _expand_sections(
+    module: ModuleDocs,
+    *,
+    base_url: str,
+    max_items: int,
+    client: DocsRsClient,
+    concurrency: Optional[int],
+    offset: int = 0,
+    limit: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> list[dict[int, DocItem]]:
+    # Fetch the wanted items of every section in one batch so sections do not wait on each other.
+    slots = _expansion_slots(module, max_items)
+    slots = slots[offset : None if limit is None else offset + limit]
+    items = [module.sections[s].items[i] for s, i in slots]
+    detailed = client.parse_item_pages(base_url=base_url, items=items, concurrency=concurrency, progress=progress)
+    expanded: list[dict[int, DocItem]] = [{} for _ in module.sections]
+    for (section_idx, item_idx), it in zip(slots, detailed):
+        expanded[section_idx][item_idx] = it
+    return expanded
+
+
+def _window_note(*, offset: int, count: int, total: int, continuation: Optional[str]) -> str:
+    if not count:
+        return f"_No items left to expand ({total} in total)._"
+    note = f"_Expanded items {offset + 1}–{offset + count} of {total}."
+    if continuation:
+        note += f' Call again with `continuation: "{continuation}"` for the next items.'
+    return note + "_"
 
 
 def module_docs_to_markdown(
@@ -289,7 +743,19 @@ def module_docs_to_markdown(
     include_item_docs: bool,
     max_items: int,
     client: Optional[DocsRsClient] = None,
+    concurrency: Optional[int] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    listing: bool = True,
+    continuation: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
 ) -> str:
+    """Renders `module` as Markdown.
+
+    With `limit`, only that many expansion items starting at `offset` get their
+    item docs; `listing=False` leaves out the item listing so a follow-up page only
+    carries the newly expanded items.
+    """
     lines: list[str] = []
     lines.append(f"# {module.module_path}")
     lines.append("")
@@ -299,30 +765,36 @@ def module_docs_to_markdown(
     lines.append("")
 
     base_url = module.page_url.rsplit("/", 1)[0] + "/"
-    expanded_client = client or DocsRsClient()
+    expanded: list[dict[int, DocItem]] = []
+    if include_item_docs:
+        expanded = _expand_sections(
+            module,
+            base_url=base_url,
+            max_items=max_items,
+            client=client or DocsRsClient(),
+            concurrency=concurrency,
+            offset=offset,
+            limit=limit,
+            progress=progress,
+        )
 
-    for section in module.sections:
-        if not section.items:
+    rendered_at = time.perf_counter()
+    for section_idx, section in enumerate(module.sections):
+        if not section.items or (not listing and not (expanded and expanded[section_idx])):
             continue
         lines.append(f"## {section.title}")
         lines.append("")
-        for item in section.items:
-            link = urllib.parse.urljoin(base_url, item.href)
-            if item.summary:
-                lines.append(f"- `{item.name}` — {item.summary} ({link})")
-            else:
-                lines.append(f"- `{item.name}` ({link})")
-        lines.append("")
+        if listing:
+            for item in section.items:
+                link = urllib.parse.urljoin(base_url, item.href)
+                if item.summary:
+                    lines.append(f"- `{item.name}` — {item.summary} ({link})")
+                else:
+                    lines.append(f"- `{item.name}` ({link})")
+            lines.append("")
 
         if include_item_docs:
-            count = 0
-            for item in section.items:
-                if count >= max_items:
-                    lines.append(f"_Stopped after {max_items} items (maxItems)._")
-                    lines.append("")
-                    break
-                count += 1
-                detailed = expanded_client.parse_item_page(base_url=base_url, item=item)
+            for detailed in expanded[section_idx].values():
                 lines.append(f"### {detailed.name}")
                 lines.append("")
                 if detailed.signature:
@@ -333,8 +805,19 @@ def module_docs_to_markdown(
                 if detailed.docs:
                     lines.append(detailed.docs)
                     lines.append("")
+            if len(section.items) > max_items and max_items - 1 in expanded[section_idx]:
+                lines.append(f"_Stopped after {max_items} items (maxItems)._")
+                lines.append("")
+
+    if include_item_docs and limit is not None:
+        count = sum(len(e) for e in expanded)
+        total = len(_expansion_slots(module, max_items))
+        lines.append(_window_note(offset=offset, count=count, total=total, continuation=continuation))
 
-    return "\n".join(lines).strip() + "\n"
+    text = "\n".join(lines).strip() + "\n"
+    if client is not None:
+        client.metrics.record("render.markdown", (time.perf_counter() - rendered_at) * 1000, stage="render")
+    return text
 
 
 def module_docs_to_json(
@@ -343,17 +826,39 @@ def module_docs_to_json(
     include_item_docs: bool,
     max_items: int,
     client: Optional[DocsRsClient] = None,
+    concurrency: Optional[int] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    listing: bool = True,
+    continuation: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    compact: bool = False,
 ) -> str:
+    """JSON counterpart of `module_docs_to_markdown`, with the same paging arguments; `compact` drops the indentation."""
     base_url = module.page_url.rsplit("/", 1)[0] + "/"
-    expanded_client = client or DocsRsClient()
+    expanded: list[dict[int, DocItem]] = []
+    if include_item_docs:
+        expanded = _expand_sections(
+            module,
+            base_url=base_url,
+            max_items=max_items,
+            client=client or DocsRsClient(),
+            concurrency=concurrency,
+            offset=offset,
+            limit=limit,
+            progress=progress,
+        )
 
+    rendered_at = time.perf_counter()
     sections: list[dict[str, Any]] = []
-    for section in module.sections:
+    for section_idx, section in enumerate(module.sections):
         items: list[dict[str, Any]] = []
         for idx, item in enumerate(section.items):
             detailed = item
-            if include_item_docs and idx < max_items:
-                detailed = expanded_client.parse_item_page(base_url=base_url, item=item)
+            if include_item_docs:
+                detailed = expanded[section_idx].get(idx, item)
+            if not listing and detailed is item:
+                continue
             items.append(
                 {
                     "kind": detailed.kind,
@@ -365,16 +870,27 @@ def module_docs_to_json(
                     "docs": detailed.docs,
                 }
             )
-        sections.append({"id": section.id, "title": section.title, "items": items})
+        if listing or items:
+            sections.append({"id": section.id, "title": section.title, "items": items})
 
-    payload = {
+    payload: dict[str, Any] = {
         "crate": module.crate,
         "version": module.version,
         "modulePath": module.module_path,
         "pageUrl": module.page_url,
         "sections": sections,
     }
-    return json.dumps(payload, indent=2, ensure_ascii=False) + "\n"
+    if include_item_docs and limit is not None:
+        payload["expanded"] = {
+            "offset": offset,
+            "count": sum(len(e) for e in expanded),
+            "total": len(_expansion_slots(module, max_items)),
+        }
+        payload["continuation"] = continuation
+    text = dumps(payload, indent=not compact) + "\n"
+    if client is not None:
+        client.metrics.record("render.json", (time.perf_counter() - rendered_at) * 1000, stage="render")
+    return text
 
 
 def ensure_int(v: Any, *, default: int, min_value: int, max_value: int) -> int:
@@ -410,7 +926,7 @@ def ensure_one_of(v: Any, *, default: str, allowed: Iterable[str]) -> str:
     return s if s in set(allowed) else default
 
 
-def search_all_items(items: list[AllItem], *, query: str, limit: int) -> list[AllItem]:
+def search_all_items(items: Sequence[AllItem], *, query: str, limit: int) -> list[AllItem]:
     q = (query or "").strip().lower()
     if not q:
         return items[:limit]
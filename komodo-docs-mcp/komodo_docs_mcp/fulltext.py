@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import re
+import sqlite3
+import threading
+import urllib.parse
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional
+
+# Bump when tokenization changes so persisted term counts are rebuilt instead of reused.
+_SCHEMA_VERSION = 1
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or that the this to what when which with".split()
+)
+# Leaf names are short and decisive, so they count as much as several doc sentences.
+_NAME_WEIGHT = 3
+_K1 = 1.2
+_B = 0.75
+
+
+def _stem(token: str) -> str:
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    out: list[str] = []
+    for word in _TOKEN_RE.findall(text or ""):
+        parts = _CAMEL_RE.findall(word)
+        lowered = word.lower()
+        if len(parts) > 1:
+            out.append(_stem(lowered))
+        for part in parts or [word]:
+            token = part.lower()
+            if token not in _STOPWORDS:
+                out.append(_stem(token))
+    return out
+
+
+def doc_location(url: str) -> tuple[str, str, str, str]:
+    """Returns (crate, version, kind, item_path) for a docs.rs item or module URL."""
+    parts = [p for p in urllib.parse.urlsplit(url).path.split("/") if p]
+    crate, version = (parts[0], parts[1]) if len(parts) >= 2 else ("", "")
+    inner = parts[3:] if len(parts) > 3 else []
+    if not inner:
+        return crate, version, "mod", ""
+    filename = inner[-1]
+    if filename == "index.html":
+        return crate, version, "mod", "::".join(inner[:-1])
+    kind, _, rest = filename.partition(".")
+    name = rest[: -len(".html")] if rest.endswith(".html") else rest
+    return crate, version, kind, "::".join([*inner[:-1], name])
+
+
+@dataclass(frozen=True)
+class FullTextHit:
+    url: str
+    crate: str
+    version: str
+    kind: str
+    item_path: str
+    summary: Optional[str]
+    score: float
+
+
+@dataclass
+class _Doc:
+    crate: str
+    version: str
+    kind: str
+    item_path: str
+    summary: Optional[str]
+    # Term counts from the module listing (name + summary) and from the item page
+    # (signature + docs) are kept apart so either can be refreshed on its own.
+    listing_tf: dict[str, int]
+    page_tf: dict[str, int]
+    length: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.length = sum(self.listing_tf.values()) + sum(self.page_tf.values())
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    url TEXT PRIMARY KEY,
+    crate TEXT NOT NULL,
+    version TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    item_path TEXT NOT NULL,
+    summary TEXT,
+    listing_tf TEXT NOT NULL,
+    page_tf TEXT NOT NULL
+)
+"""
+
+
+class FullTextIndex:
+    """BM25 index over item names, summaries, signatures and docs.
+
+    Documents are added as module and item pages are parsed; with a `path` they
+    are also written to SQLite and reloaded lazily by the next process. A `loader`
+    supplies documents exported by `export_docs` instead, on first use.
+    """
+
+    def __init__(self, path: Optional[str] = None, *, loader: Optional[Callable[[], Iterable[dict[str, Any]]]] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._docs: dict[str, _Doc] = {}
+        self._postings: dict[str, dict[str, int]] = {}
+        self._total_length = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._pending: list[tuple[str, _Doc]] = []  # indexed, not yet written to SQLite
+        self._writing = False
+        self._loader = loader
+        self._loaded = path is None and loader is None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._docs)
+
+    def add_listing(self, url: str, *, name: str, summary: Optional[str]) -> None:
+        self.add_listings([(url, name, summary)])
+
+    def add_listings(self, entries: Iterable[tuple[str, str, Optional[str]]]) -> None:
+        """Indexes `(url, name, summary)` module listing entries, written to SQLite as one transaction."""
+        updates = [
+            (url, summary, dict(Counter(tokenize(name) * _NAME_WEIGHT + tokenize(summary))), None, False)
+            for url, name, summary in entries
+        ]
+        self._update(updates)
+
+    def add_page(self, url: str, *, name: str, signature: Optional[str], docs: Optional[str]) -> None:
+        tf = Counter(tokenize(signature) + tokenize(docs))
+        listing = dict(Counter(tokenize(name) * _NAME_WEIGHT))
+        self._update([(url, None, listing, dict(tf), True)])
+
+    def search(self, query: str, *, crate: str, version: Optional[str] = None, limit: int = 20) -> list[FullTextHit]:
+        terms = set(tokenize(query))
+        with self._lock:
+            self._ensure_loaded()
+            n = len(self._docs)
+            if not terms or not n:
+                return []
+            avg = self._total_length / n
+            scores: dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for url, tf in postings.items():
+                    doc = self._docs[url]
+                    if doc.crate != crate or (version is not None and doc.version != version):
+                        continue
+                    norm = tf + _K1 * (1 - _B + _B * doc.length / avg)
+                    scores[url] = scores.get(url, 0.0) + idf * tf * (_K1 + 1) / norm
+            best = heapq.nlargest(limit, scores.items(), key=lambda kv: (kv[1], kv[0]))
+            return [
+                FullTextHit(
+                    url=url,
+                    crate=self._docs[url].crate,
+                    version=self._docs[url].version,
+                    kind=self._docs[url].kind,
+                    item_path=self._docs[url].item_path,
+                    summary=self._docs[url].summary,
+                    score=score,
+                )
+                for url, score in best
+            ]
+
+    def export_docs(self, *, crate: str, version: str) -> list[dict[str, Any]]:
+        """The documents of one crate version, in the form a `loader` returns them."""
+        with self._lock:
+            self._ensure_loaded()
+            return [
+                {
+                    "url": url,
+                    "crate": doc.crate,
+                    "version": doc.version,
+                    "kind": doc.kind,
+                    "itemPath": doc.item_path,
+                    "summary": doc.summary,
+                    "listingTf": doc.listing_tf,
+                    "pageTf": doc.page_tf,
+                }
+                for url, doc in sorted(self._docs.items())
+                if doc.crate == crate and doc.version == version
+            ]
+
+    def _update(
+        self, updates: list[tuple[str, Optional[str], dict[str, int], Optional[dict[str, int]], bool]]
+    ) -> None:
+        # Each entry: url, summary, listing term counts, page term counts, keep the listing counts.
+        with self._lock:
+            self._ensure_loaded()
+            for url, summary, listing_tf, page_tf, keep_listing in updates:
+                crate, version, kind, item_path = doc_location(url)
+                old = self._docs.get(url)
+                if old is not None:
+                    self._unindex(url, old)
+                    if keep_listing and old.listing_tf:
+                        listing_tf = old.listing_tf
+                    if page_tf is None:
+                        page_tf = old.page_tf
+                    summary = summary if summary is not None else old.summary
+                doc = _Doc(
+                    crate=crate,
+                    version=version,
+                    kind=kind,
+                    item_path=item_path,
+                    summary=summary,
+                    listing_tf=listing_tf,
+                    page_tf=page_tf or {},
+                )
+                self._index(url, doc)
+                if self.path is not None and (old is None or old != doc):
+                    self._pending.append((url, doc))
+            if not self._pending or self._writing:
+                return
+            self._writing = True
+        self._flush()
+
+    def _flush(self) -> None:
+        # Write-behind, outside the index lock: whichever caller finds no write in progress
+        # drains everything queued so far in one transaction, in the order it was indexed.
+        while True:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                if not batch:
+                    self._writing = False
+                    return
+            try:
+                self._persist(batch)
+            except BaseException:
+                with self._lock:
+                    self._writing = False
+                raise
+
+    def _index(self, url: str, doc: _Doc) -> None:
+        self._docs[url] = doc
+        self._total_length += doc.length
+        for tf in (doc.listing_tf, doc.page_tf):
+            for term, count in tf.items():
+                postings = self._postings.setdefault(term, {})
+                postings[url] = postings.get(url, 0) + count
+
+    def _unindex(self, url: str, doc: _Doc) -> None:
+        del self._docs[url]
+        self._total_length -= doc.length
+        for tf in (doc.listing_tf, doc.page_tf):
+            for term in tf:
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(url, None)
+                    if not postings:
+                        del self._postings[term]
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._db is None and self.path is not None:
+            try:
+                db = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+                try:
+                    # Index writes are rebuildable, so they skip the fsync on every commit.
+                    db.execute("PRAGMA journal_mode=WAL")
+                    db.execute("PRAGMA synchronous=NORMAL")
+                except sqlite3.Error:
+                    pass
+                if db.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                    db.execute("DROP TABLE IF EXISTS docs")
+                    db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+                db.execute(_SCHEMA)
+                db.commit()
+                self._db = db
+            except sqlite3.Error:
+                self.path = None
+        return self._db
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self._loader is not None:
+            for d in self._loader():
+                self._index(
+                    d["url"],
+                    _Doc(
+                        crate=d["crate"],
+                        version=d["version"],
+                        kind=d["kind"],
+                        item_path=d["itemPath"],
+                        summary=d["summary"],
+                        listing_tf=d["listingTf"],
+                        page_tf=d["pageTf"],
+                    ),
+                )
+        db = self._connect()
+        if db is None:
+            return
+        try:
+            rows = db.execute(
+                "SELECT url, crate, version, kind, item_path, summary, listing_tf, page_tf FROM docs"
+            ).fetchall()
+        except sqlite3.Error:
+            return
+        for url, crate, version, kind, item_path, summary, listing_tf, page_tf in rows:
+            self._index(
+                url,
+                _Doc(
+                    crate=crate,
+                    version=version,
+                    kind=kind,
+                    item_path=item_path,
+                    summary=summary,
+                    listing_tf=json.loads(listing_tf),
+                    page_tf=json.loads(page_tf),
+                ),
+            )
+
+    def _persist(self, batch: list[tuple[str, _Doc]]) -> None:
+        db = self._connect()
+        if db is None:
+            return
+        try:
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO docs (url, crate, version, kind, item_path, summary, listing_tf, page_tf)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            url,
+                            doc.crate,
+                            doc.version,
+                            doc.kind,
+                            doc.item_path,
+                            doc.summary,
+                            json.dumps(doc.listing_tf),
+                            json.dumps(doc.page_tf),
+                        )
+                        for url, doc in batch
+                    ],
+                )
+        except sqlite3.Error:
+            pass
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Sequence
+
+_TOKEN_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+
+def camel_tokens(name: str) -> list[str]:
+    """Lowercased CamelCase words: `GetUIConfig` -> get, ui, config. A plural `s` is dropped (`Stacks` ~ `Stack`)."""
+    tokens = []
+    for token in _TOKEN_RE.findall(name):
+        token = token.lower()
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _letters(word: str) -> int:
+    mask = 0
+    for ch in set(word):
+        mask |= 1 << (ord(ch) & 63)
+    return mask
+
+
+def _deletes(word: str, max_distance: int) -> set[str]:
+    out = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1 :] for w in frontier for i in range(len(w))}
+        out |= frontier
+    return out
+
+
+def osa_distance(a: str, b: str, max_distance: int) -> int:
+    """Edit distance counting an adjacent transposition as one edit; anything past `max_distance` is `max_distance + 1`."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    # Typos are local: drop the shared prefix and suffix so the table only spans the differing middle.
+    start = 0
+    shortest = min(len(a), len(b))
+    while start < shortest and a[start] == b[start]:
+        start += 1
+    trail = 0
+    while trail < shortest - start and a[-1 - trail] == b[-1 - trail]:
+        trail += 1
+    a = a[start : len(a) - trail]
+    b = b[start : len(b) - trail]
+    if not a or not b:
+        return min(len(a) + len(b), max_distance + 1)
+
+    # Only cells within `max_distance` of the diagonal can stay within budget.
+    big = max_distance + 1
+    width = len(b)
+    before: list[int] = []
+    prev = [j if j <= max_distance else big for j in range(width + 1)]
+    for i in range(1, len(a) + 1):
+        row = [big] * (width + 1)
+        if i <= max_distance:
+            row[0] = i
+        best = row[0]
+        ai = a[i - 1]
+        for j in range(max(1, i - max_distance), min(width, i + max_distance) + 1):
+            bj = b[j - 1]
+            d = prev[j - 1]
+            if ai != bj:
+                if prev[j] < d:
+                    d = prev[j]
+                if row[j - 1] < d:
+                    d = row[j - 1]
+                d += 1
+                if i > 1 and j > 1 and ai == b[j - 2] and a[i - 2] == bj and before[j - 2] < d - 1:
+                    d = before[j - 2] + 1
+                if d > big:
+                    d = big
+            row[j] = d
+            if d < best:
+                best = d
+        if best > max_distance:
+            return big
+        before, prev = prev, row
+    return prev[width]
+
+
+class FuzzyIndex:
+    """Typo-tolerant lookup over leaf names, SymSpell style.
+
+    Every name's first `prefix_length` characters are stored under each string
+    obtained by deleting up to `max_distance` of them, so a query only looks up
+    its own deletes and verifies the few names that share one. Names are also
+    indexed by CamelCase word, which catches reordered, missing or extra words
+    (`StackServicesList`, `ListStackService`) that are too far apart by characters.
+    """
+
+    def __init__(self, names: Sequence[str], *, max_distance: int = 2, prefix_length: int = 7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._words: list[str] = []  # distinct lowercased names
+        self._positions: list[list[int]] = []  # word id -> positions in `names`
+        self._tokens: list[frozenset[str]] = []
+        self._letters: list[int] = []  # bit set of the characters in each word
+        word_ids: dict[str, int] = {}
+        for position, name in enumerate(names):
+            word = name.lower()
+            word_id = word_ids.get(word)
+            if word_id is None:
+                word_id = word_ids[word] = len(self._words)
+                self._words.append(word)
+                self._letters.append(_letters(word))
+                self._positions.append([])
+                self._tokens.append(frozenset(camel_tokens(name)))
+            self._positions[word_id].append(position)
+
+        self._deletes: dict[str, list[int]] = {}
+        for word_id, word in enumerate(self._words):
+            for key in _deletes(word[:prefix_length], max_distance):
+                self._deletes.setdefault(key, []).append(word_id)
+        self._token_postings: dict[str, list[int]] = {}
+        for word_id, tokens in enumerate(self._tokens):
+            for token in tokens:
+                self._token_postings.setdefault(token, []).append(word_id)
+
+    def search(self, query: str, *, limit: int) -> list[int]:
+        """Positions of the names nearest to `query`, best first (ties keep input order).
+
+        A name within `max_distance` character edits costs its distance; a name that
+        shares at least two CamelCase words, with at most `max_distance` words missing
+        or extra, costs that word count plus one half.
+        """
+        query = query.strip()
+        word = query.lower()
+        if not word or limit <= 0:
+            return []
+        costs: dict[int, float] = {}
+        max_distance = self.max_distance
+        words, letters = self._words, self._letters
+        size = len(word)
+        query_letters = _letters(word)
+        for key in _deletes(word[: self.prefix_length], max_distance):
+            for word_id in self._deletes.get(key, ()):
+                if word_id in costs:
+                    continue
+                candidate = words[word_id]
+                # Each edit adds and removes at most one character, so both length and the
+                # characters only one side has bound the distance from below; both are cheap.
+                if (
+                    abs(len(candidate) - size) > max_distance
+                    or bin(query_letters & ~letters[word_id]).count("1") > max_distance
+                    or bin(letters[word_id] & ~query_letters).count("1") > max_distance
+                ):
+                    costs[word_id] = max_distance + 1
+                else:
+                    costs[word_id] = osa_distance(word, candidate, max_distance)
+
+        query_tokens = set(camel_tokens(query))
+        if len(query_tokens) > 1:
+            shared: Counter[int] = Counter()
+            for token in query_tokens:
+                shared.update(self._token_postings.get(token, ()))
+            need = max(2, len(query_tokens) - max_distance)
+            tokens = self._tokens
+            for word_id, n in shared.items():
+                if n < need:
+                    continue
+                cost = len(query_tokens) - n + len(tokens[word_id]) - n + 0.5
+                if cost < costs.get(word_id, max_distance + 1):
+                    costs[word_id] = cost
+
+        positions = self._positions
+        ranked = sorted(
+            (word_id for word_id, cost in costs.items() if cost <= max_distance + 0.5),
+            key=lambda word_id: (costs[word_id], positions[word_id][0]),
+        )
+        out: list[int] = []
+        for word_id in ranked:
+            out.extend(positions[word_id])
+            if len(out) >= limit:
+                break
+        return out[:limit]
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import http.client
+import threading
+import urllib.parse
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+_REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+_MAX_REDIRECTS = 5
+_STREAM_CHUNK = 16 * 1024
+# Errors that mean a kept-alive connection was closed by the server while idle.
+_STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError)
+
+
+class HttpPoolError(OSError):
+    pass
+
+
+@dataclass(frozen=True)
+class HttpResponse:
+    status: int
+    url: str
+    headers: dict[str, str]
+    body: bytes
+    # False when the read was stopped early by `until`; `body` is then a prefix.
+    complete: bool = True
+
+
+def decode_body(body: bytes, encoding: Optional[str]) -> bytes:
+    encoding = (encoding or "").strip().lower()
+    if not body or encoding in ("", "identity"):
+        return body
+    try:
+        if encoding in ("gzip", "x-gzip"):
+            return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        if encoding == "deflate":
+            # Servers disagree on whether "deflate" carries the zlib header.
+            try:
+                return zlib.decompress(body)
+            except zlib.error:
+                return zlib.decompress(body, -zlib.MAX_WBITS)
+    except zlib.error as e:
+        raise HttpPoolError(f"invalid {encoding} body: {e}") from e
+    raise HttpPoolError(f"unsupported Content-Encoding: {encoding}")
+
+
+class _StreamDecoder:
+    """Incremental counterpart of `decode_body`."""
+
+    def __init__(self, encoding: Optional[str]):
+        self._encoding = (encoding or "").strip().lower()
+        self._z: Any = None
+        if self._encoding in ("gzip", "x-gzip"):
+            self._z = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self._encoding not in ("", "identity", "deflate"):
+            raise HttpPoolError(f"unsupported Content-Encoding: {self._encoding}")
+
+    def feed(self, chunk: bytes) -> bytes:
+        if not self._encoding or self._encoding == "identity":
+            return chunk
+        if self._z is None:
+            # Servers disagree on whether "deflate" carries the zlib header.
+            wrapped = len(chunk) < 2 or (chunk[0] & 0x0F == 8 and ((chunk[0] << 8) | chunk[1]) % 31 == 0)
+            self._z = zlib.decompressobj(zlib.MAX_WBITS if wrapped else -zlib.MAX_WBITS)
+        try:
+            return self._z.decompress(chunk)
+        except zlib.error as e:
+            raise HttpPoolError(f"invalid {self._encoding} body: {e}") from e
+
+    def flush(self) -> bytes:
+        return self._z.flush() if self._z is not None else b""
+
+
+class HttpPool:
+    """Keep-alive HTTP(S) connections per host, safe to share between worker threads.
+
+    Each request borrows an idle connection (or opens a new one) and returns it
+    after the body has been read completely, so concurrent workers never share a
+    socket and sequential requests skip the TCP/TLS handshake.
+    """
+
+    def __init__(self, *, max_idle_per_host: int = 8, timeout_s: float = 20.0):
+        self.max_idle_per_host = max(1, int(max_idle_per_host))
+        self.timeout_s = timeout_s
+        self._idle: dict[tuple[str, str, int], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.bytes_received = 0
+        self.bytes_decoded = 0
+        self.streams_stopped = 0
+        self.bytes_skipped = 0
+
+    def get(
+        self, url: str, *, headers: dict[str, str], until: Optional[Callable[[bytearray], bool]] = None
+    ) -> HttpResponse:
+        """GETs `url`, following redirects.
+
+        With `until`, a 200 body is read and decoded chunk by chunk and the read stops
+        as soon as `until(decoded_so_far)` is true; the connection is then closed
+        instead of draining the rest and the response is marked incomplete.
+        """
+        for _ in range(_MAX_REDIRECTS + 1):
+            resp = self._request("GET", url, headers, until)
+            if resp.status not in _REDIRECT_STATUSES or "location" not in resp.headers:
+                return resp
+            url = urllib.parse.urljoin(url, resp.headers["location"])
+        raise HttpPoolError(f"too many redirects for {url}")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connectionsOpened": self.connections_opened,
+                "connectionsReused": self.connections_reused,
+                "idleConnections": sum(len(v) for v in self._idle.values()),
+                "bytesReceived": self.bytes_received,
+                "bytesDecoded": self.bytes_decoded,
+                "streamsStopped": self.streams_stopped,
+                "bytesSkipped": self.bytes_skipped,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            idle = [conn for conns in self._idle.values() for conn in conns]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+    def _request(
+        self, method: str, url: str, headers: dict[str, str], until: Optional[Callable[[bytearray], bool]] = None
+    ) -> HttpResponse:
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise HttpPoolError(f"unsupported URL: {url}")
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        send_headers = {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive", **headers}
+
+        conn, reused = self._acquire(key)
+        try:
+            try:
+                resp = self._send(conn, method, target, send_headers)
+            except _STALE_ERRORS:
+                if not reused:
+                    raise
+                # The server dropped the idle connection; retry once on a fresh one.
+                conn.close()
+                conn, reused = self._open(key), False
+                resp = self._send(conn, method, target, send_headers)
+            response_headers = {k.lower(): v for k, v in resp.getheaders()}
+            raw: Optional[bytes] = None
+            if until is not None and resp.status == 200:
+                body, received, complete = self._read_until(resp, response_headers.get("content-encoding"), until)
+            else:
+                raw = resp.read()
+                body, received, complete = b"", len(raw), True
+        except BaseException:
+            conn.close()
+            raise
+
+        skipped = 0
+        if complete:
+            self._release(key, conn, keep=not resp.will_close)
+        else:
+            # The unread rest of the body makes the connection unusable for the next request.
+            conn.close()
+            length = response_headers.get("content-length", "")
+            skipped = max(0, int(length) - received) if length.isdigit() else 0
+        if raw is not None:
+            body = decode_body(raw, response_headers.get("content-encoding"))
+        with self._lock:
+            self.requests += 1
+            if reused:
+                self.connections_reused += 1
+            self.bytes_received += received
+            self.bytes_decoded += len(body)
+            if not complete:
+                self.streams_stopped += 1
+                self.bytes_skipped += skipped
+        return HttpResponse(status=resp.status, url=url, headers=response_headers, body=body, complete=complete)
+
+    @staticmethod
+    def _read_until(
+        resp: http.client.HTTPResponse, encoding: Optional[str], until: Callable[[bytearray], bool]
+    ) -> tuple[bytes, int, bool]:
+        decoder = _StreamDecoder(encoding)
+        body = bytearray()
+        received = 0
+        while True:
+            chunk = resp.read(_STREAM_CHUNK)
+            if not chunk:
+                body += decoder.flush()
+                return bytes(body), received, True
+            received += len(chunk)
+            body += decoder.feed(chunk)
+            if until(body):
+                if resp.isclosed():
+                    body += decoder.flush()
+                    return bytes(body), received, True
+                return bytes(body), received, False
+
+    @staticmethod
+    def _send(
+        conn: http.client.HTTPConnection, method: str, target: str, headers: dict[str, str]
+    ) -> http.client.HTTPResponse:
+        conn.request(method, target, headers=headers)
+        return conn.getresponse()
+
+    def _acquire(self, key: tuple[str, str, int]) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._open(key), False
+
+    def _open(self, key: tuple[str, str, int]) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        with self._lock:
+            self.connections_opened += 1
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout_s)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout_s)
+
+    def _release(self, key: tuple[str, str, int], conn: http.client.HTTPConnection, *, keep: bool) -> None:
+        if keep:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle_per_host:
+                    idle.append(conn)
+                    return
+        conn.close()
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from typing import Iterable, Optional, Sequence, Union
+
+from .fuzzy import FuzzyIndex
+from .symbols import AllItem, SymbolTable
+
+_GRAM = 3
+
+
+def _grams(text: str) -> set[str]:
+    return {text[i : i + _GRAM] for i in range(len(text) - _GRAM + 1)}
+
+
+def normalize_item_path(query: str, *, crate: str = "") -> str:
+    """Reduces the ways an item gets named to its all-items path (`api::read::GetStack`).
+
+    Accepts `::` and `/` separators, a leading `crate::` or crate name, and docs.rs
+    hrefs or URLs such as `api/read/struct.GetStack.html`.
+    """
+    path = query.strip().strip("`").split("#", 1)[0].strip()
+    crate_ident = crate.replace("-", "_")
+    if "://" in path and crate_ident:
+        path = path.rpartition(f"/{crate_ident}/")[2]
+    if path.endswith(".html"):
+        folder, _, file = path[: -len(".html")].rpartition("/")
+        path = f"{folder}/{file.split('.', 1)[-1]}" if folder else file.split(".", 1)[-1]
+    parts = [p for p in path.replace("/", "::").split("::") if p]
+    if parts and parts[0] in {"crate", crate_ident}:
+        parts = parts[1:]
+    return "::".join(parts)
+
+
+def _postings(texts: list[str]) -> dict[str, array]:
+    postings: dict[str, list[int]] = {}
+    for rank, text in enumerate(texts):
+        for gram in _grams(text):
+            postings.setdefault(gram, []).append(rank)
+    return {gram: array("I", ranks) for gram, ranks in postings.items()}
+
+
+class SearchIndex:
+    """Trigram postings over the lowercased leaf names of one crate version.
+
+    Items are numbered by rank, i.e. in the order `search_all_items` breaks score
+    ties (shorter path first, then original position), so every posting list is
+    already sorted by rank and each score bucket can stop as soon as it is full.
+    Path matches outside the leaf name come from per-module rank lists, so full
+    paths are only assembled for the candidates. `search` returns exactly what
+    `search_all_items` returns for the same items.
+    """
+
+    def __init__(self, items: Union[SymbolTable, Iterable[AllItem]]):
+        table = items if isinstance(items, SymbolTable) else SymbolTable(items)
+        self.table = table
+        modules = table.modules
+        n = len(table)
+
+        def path_len(row: int) -> int:
+            module = modules[table.module_id(row)]
+            return len(module) + 2 + len(table.names[row]) if module else len(table.names[row])
+
+        order = sorted(range(n), key=lambda row: (path_len(row), row))
+        self._rows = array("I", order)
+        self._names = [table.names[row].lower() for row in order]
+        self._module_ids = array("I", (table.module_id(row) for row in order))
+        self._modules = [m.lower() for m in modules]
+        module_ranks: list[list[int]] = [[] for _ in modules]
+        for rank, module_id in enumerate(self._module_ids):
+            module_ranks[module_id].append(rank)
+        self._module_ranks = [array("I", ranks) for ranks in module_ranks]
+        self._name_postings = _postings(self._names)
+        self._exact: dict[str, list[int]] = {}
+        for rank, name in enumerate(self._names):
+            self._exact.setdefault(name, []).append(rank)
+        self._fuzzy: Optional[FuzzyIndex] = None
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    @property
+    def items(self) -> list[AllItem]:
+        return list(self.table)
+
+    def resolve(self, query: str, *, crate: str = "") -> list[AllItem]:
+        """Items named exactly by `query`, found by hash lookup on the leaf name.
+
+        A path (in any form `normalize_item_path` accepts) matches the items whose
+        path equals it or ends with it at a `::` boundary; a bare leaf name matches
+        every item of that name. Exact-case matches come first, then search order.
+        """
+        path = normalize_item_path(query, crate=crate)
+        module, _, leaf = path.rpartition("::")
+        ranks: Sequence[int] = self._exact.get(leaf.lower(), ())
+        if module:
+            module = module.lower()
+            suffix = "::" + module
+            modules, module_ids = self._modules, self._module_ids
+            ranks = [
+                rank
+                for rank in ranks
+                if modules[module_ids[rank]] == module or modules[module_ids[rank]].endswith(suffix)
+            ]
+        row, rows = self.table.row, self._rows
+        items = [row(rows[rank]) for rank in ranks]
+        lowered = path.lower()
+        items.sort(
+            key=lambda it: (
+                it.item_path != path,
+                it.item_path.lower() != lowered,
+                it.item_path.rpartition("::")[2] != leaf,
+            )
+        )
+        return items
+
+    def search(self, query: str, *, limit: int) -> list[AllItem]:
+        q = (query or "").strip().lower()
+        if not q:
+            return self.table[:limit]
+        if limit <= 0:
+            return []
+
+        names = self._names
+        hits = list(self._exact.get(q, ())[:limit])
+
+        need = limit - len(hits)
+        prefix: list[int] = []
+        infix: list[int] = []
+        if need > 0:
+            for rank in self._candidates(self._name_postings, q):
+                name = names[rank]
+                if q not in name or name == q:
+                    continue
+                if name.startswith(q):
+                    prefix.append(rank)
+                    if len(prefix) >= need:
+                        break
+                elif len(infix) < need:
+                    infix.append(rank)
+            hits.extend((prefix + infix)[:need])
+
+        need = limit - len(hits)
+        if need > 0:
+            for rank in self._path_candidates(q):
+                if q not in names[rank] and q in self._path(rank):
+                    hits.append(rank)
+                    need -= 1
+                    if not need:
+                        break
+
+        row, rows = self.table.row, self._rows
+        return [row(rows[rank]) for rank in hits]
+
+    def fuzzy(self, query: str, *, limit: int) -> list[AllItem]:
+        """Near-misses of the leaf name in `query` (typos, casing, CamelCase words reordered or missing)."""
+        fuzzy = self._fuzzy
+        if fuzzy is None:
+            # Built on the first miss only: its delete keys outweigh the rest of the index.
+            fuzzy = self._fuzzy = FuzzyIndex([self.table.names[row] for row in self._rows])
+        leaf = normalize_item_path(query).rpartition("::")[2]
+        row, rows = self.table.row, self._rows
+        return [row(rows[rank]) for rank in fuzzy.search(leaf, limit=limit)]
+
+    def _path(self, rank: int) -> str:
+        module = self._modules[self._module_ids[rank]]
+        return f"{module}::{self._names[rank]}" if module else self._names[rank]
+
+    def _path_candidates(self, q: str) -> Iterable[int]:
+        # Without a ':' the query cannot span the "::" before the leaf name, so outside the
+        # name it can only match inside the module path: every item of such a module qualifies.
+        if ":" in q:
+            return range(len(self._names))
+        matching = [self._module_ranks[i] for i, module in enumerate(self._modules) if q in module]
+        if len(matching) <= 1:
+            return matching[0] if matching else ()
+        return heapq.merge(*matching)
+
+    def _candidates(self, postings: dict[str, array], q: str) -> Sequence[int]:
+        if len(q) < _GRAM:
+            return range(len(self._names))
+        shortest: Sequence[int] = range(len(self._names))
+        for gram in _grams(q):
+            ranks = postings.get(gram)
+            if ranks is None:
+                return ()
+            if len(ranks) < len(shortest):
+                shortest = ranks
+        # The rarest trigram's list is the candidate set; the substring check the caller
+        # does on each candidate is exact, so intersecting the other lists would only add work.
+        return shortest
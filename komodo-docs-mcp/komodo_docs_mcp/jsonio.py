@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any
+
+try:  # Optional: a faster encoder, used when installed.
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore[assignment]
+
+if (os.environ.get("KOMODO_DOCS_MCP_JSON") or "").strip().lower() == "stdlib":
+    orjson = None  # type: ignore[assignment]
+
+BACKEND = "orjson" if orjson is not None else "stdlib"
+
+_ORJSON_OPTS = 0 if orjson is None else orjson.OPT_NON_STR_KEYS
+_ORJSON_INDENT_OPTS = 0 if orjson is None else orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+
+
+def _stdlib_dumps(obj: Any, *, indent: bool) -> str:
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def dumps_bytes(obj: Any, *, indent: bool = False) -> bytes:
+    """UTF-8 JSON for `obj`: minified, or indented by two spaces like `json.dumps(indent=2)`."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=_ORJSON_INDENT_OPTS if indent else _ORJSON_OPTS)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits, which only the stdlib encodes
+    return _stdlib_dumps(obj, indent=indent).encode("utf-8")
+
+
+def dumps(obj: Any, *, indent: bool = False) -> str:
+    if orjson is not None:
+        return dumps_bytes(obj, indent=indent).decode("utf-8")
+    return _stdlib_dumps(obj, indent=indent)
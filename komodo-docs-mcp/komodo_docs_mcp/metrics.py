@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import bisect
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+# Upper bounds (ms) of the latency histogram buckets; slower observations land in a last, open bucket.
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum_ms", "max_ms")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation, capped at the slowest one seen."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(float(BUCKETS_MS[i]) if i < len(BUCKETS_MS) else self.max_ms, self.max_ms)
+        return self.max_ms
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "meanMs": round(self.sum_ms / self.count, 2) if self.count else 0.0,
+            "p50Ms": self.quantile(0.5),
+            "p90Ms": self.quantile(0.9),
+            "p99Ms": self.quantile(0.99),
+            "maxMs": round(self.max_ms, 2),
+            "buckets": {
+                (f"<={BUCKETS_MS[i]}" if i < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]}"): n
+                for i, n in enumerate(self.counts)
+                if n
+            },
+        }
+
+
+class StageTimes:
+    """Milliseconds spent per stage (fetch / parse / render) during one tool call, summed across workers."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.ms: dict[str, float] = {}
+
+    def add(self, stage: str, ms: float) -> None:
+        with self._lock:
+            self.ms[stage] = self.ms.get(stage, 0.0) + ms
+
+    def summary(self) -> str:
+        with self._lock:
+            return ", ".join(f"{stage} {ms:.0f} ms" for stage, ms in sorted(self.ms.items()))
+
+
+_STAGES: contextvars.ContextVar[Optional[StageTimes]] = contextvars.ContextVar("komodo_docs_stages", default=None)
+
+
+@contextmanager
+def call_stages() -> Iterator[StageTimes]:
+    """Collects the stage timings recorded in this context (and contexts copied from it)."""
+    stages = StageTimes()
+    token = _STAGES.set(stages)
+    try:
+        yield stages
+    finally:
+        _STAGES.reset(token)
+
+
+class Metrics:
+    """Thread-safe counters and latency histograms, keyed by dotted names."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.counters: dict[str, int] = {}
+        self.histograms: dict[str, Histogram] = {}
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, name: str, ms: float, *, stage: Optional[str] = None) -> None:
+        """Adds one observation to histogram `name` and, inside `call_stages`, to `stage`."""
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram()
+            hist.observe(ms)
+        if stage is not None:
+            stages = _STAGES.get()
+            if stages is not None:
+                stages.add(stage, ms)
+
+    @contextmanager
+    def timed(self, name: str, *, stage: Optional[str] = None) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - started) * 1000, stage=stage)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "uptimeS": round(time.time() - self.started_at, 1),
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {name: h.snapshot() for name, h in sorted(self.histograms.items())},
+            }
+
+
+def hit_rate(hits: int, misses: int) -> Optional[float]:
+    total = hits + misses
+    return round(hits / total, 4) if total else None
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import cProfile
+import os
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Iterator, Mapping, Optional
+
+_TRUE = {"1", "true", "yes", "y", "on", "all", "*"}
+_UNSAFE_CHARS_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+_TOP_ALLOCATIONS = 25
+
+
+class CallProfiler:
+    """Profiles selected tool calls with cProfile and, optionally, tracemalloc.
+
+    A call is profiled when its tool is in `tools` (empty: every tool); with
+    `threshold_ms`, the results are only kept for calls that took at least that
+    long. cProfile only sees the calling thread, and one call is profiled at a
+    time: calls that start while another is being profiled run unprofiled.
+    """
+
+    def __init__(
+        self,
+        *,
+        directory: str,
+        tools: frozenset[str] = frozenset(),
+        threshold_ms: float = 0.0,
+        memory: bool = False,
+        log: Optional[Callable[[str], None]] = None,
+    ):
+        self.directory = directory
+        self.tools = tools
+        self.threshold_ms = threshold_ms
+        self.memory = memory
+        self._log = log
+        self._lock = threading.Lock()
+        self.written = 0
+        self.skipped = 0
+
+    @classmethod
+    def from_env(
+        cls, environ: Mapping[str, str], *, default_dir: str, log: Optional[Callable[[str], None]] = None
+    ) -> Optional[CallProfiler]:
+        """Reads KOMODO_DOCS_MCP_PROFILE*; returns None (profiling off) unless a tool list or threshold is set."""
+        selection = (environ.get("KOMODO_DOCS_MCP_PROFILE") or "").strip()
+        threshold = (environ.get("KOMODO_DOCS_MCP_PROFILE_THRESHOLD_MS") or "").strip()
+        if selection.lower() in {"", "0", "false", "no", "off"} and not threshold:
+            return None
+        tools: frozenset[str] = frozenset()
+        if selection and selection.lower() not in _TRUE:
+            tools = frozenset(t.strip() for t in selection.split(",") if t.strip())
+        try:
+            threshold_ms = max(0.0, float(threshold)) if threshold else 0.0
+        except ValueError:
+            threshold_ms = 0.0
+        return cls(
+            directory=os.path.expanduser((environ.get("KOMODO_DOCS_MCP_PROFILE_DIR") or "").strip() or default_dir),
+            tools=tools,
+            threshold_ms=threshold_ms,
+            memory=(environ.get("KOMODO_DOCS_MCP_PROFILE_MEMORY") or "").strip().lower() in _TRUE,
+            log=log,
+        )
+
+    def wants(self, tool: str) -> bool:
+        return not self.tools or tool in self.tools
+
+    @contextmanager
+    def profile(self, tool: str, call_id: object) -> Iterator[None]:
+        if not self._lock.acquire(blocking=False):
+            self.skipped += 1
+            yield
+            return
+        try:
+            started_tracing = self.memory and not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                ms = (time.perf_counter() - started) * 1000
+                snapshot = tracemalloc.take_snapshot() if self.memory else None
+                peak = tracemalloc.get_traced_memory()[1] if self.memory else 0
+                if started_tracing:
+                    tracemalloc.stop()
+                if ms >= self.threshold_ms:
+                    self._write(tool, call_id, ms, profiler, snapshot, peak)
+        finally:
+            self._lock.release()
+
+    def _write(
+        self,
+        tool: str,
+        call_id: object,
+        ms: float,
+        profiler: cProfile.Profile,
+        snapshot: Optional[tracemalloc.Snapshot],
+        peak: int,
+    ) -> None:
+        stem = _UNSAFE_CHARS_RE.sub("_", f"{time.strftime('%Y%m%d-%H%M%S')}-{tool}-{call_id}-{ms:.0f}ms")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, stem + ".prof")
+            profiler.dump_stats(path)
+            if snapshot is not None:
+                with open(os.path.join(self.directory, stem + ".alloc.txt"), "w", encoding="utf-8") as fp:
+                    fp.write(f"{tool} id={call_id!r}: {ms:.0f} ms, traced peak {peak / 1024:.1f} KiB\n")
+                    fp.write(f"top {_TOP_ALLOCATIONS} allocation sites still alive at the end of the call:\n\n")
+                    for stat in snapshot.statistics("lineno")[:_TOP_ALLOCATIONS]:
+                        fp.write(f"{stat}\n")
+        except OSError as e:
+            if self._log is not None:
+                self._log(f"profile not written: {e!r}")
+            return
+        self.written += 1
+        if self._log is not None:
+            self._log(f"profile: {tool} id={call_id!r} {ms:.0f} ms -> {path}")
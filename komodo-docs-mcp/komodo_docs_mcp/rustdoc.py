@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import re
+from html import unescape
+from typing import Iterator, Optional
+
+# Opening tags of the blocks the scanner reacts to; everything else is skipped by the regex engine.
+_TAG_RE = re.compile(r"<(div|dl|h1|h2|h3|span|ul)\b([^>]*)>")
+_SECTION_ATTRS_RE = re.compile(r'^ id="([^"]+)" class="section-header"$')
+_ALL_SECTION_ATTRS_RE = re.compile(r'^ id="([^"]+)"$')
+_DT_DD_RE = re.compile(r"<dt>(.*?)</dt>(?:<dd>(.*?)</dd>)?", re.S)
+_ITEM_LINK_RE = re.compile(r'<a class="([^"]+)" href="([^"]+)"[^>]*>(.*?)</a>', re.S)
+_BREADCRUMB_LINK_RE = re.compile(r"<a [^>]*>(.*?)</a>", re.S)
+_ALL_LINK_RE = re.compile(r'<a href="([^"]+)">(.*?)</a>', re.S)
+
+# Every tag, split into its head ("a", "/a", "br", ...) and the rest of the tag.
+_SPLIT_TAG_RE = re.compile(r"<(?=[^>])(/?[^\s/>]*)([^>]*)>")
+_BR_REST_RE = re.compile(r"\s*/?")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_FENCE_OPEN = "\n```text\n"
+_CLOSE_TEXT = {"p": "\n\n", "li": "\n", "pre": "\n```\n", "code": "`"}
+# Tags whose text does not depend on their attributes; anything else goes through _tag_text.
+_TAG_TEXT_BY_HEAD = {
+    "pre": _FENCE_OPEN,
+    "code": "`",
+    **{
+        closing + name: ""
+        for closing in ("", "/")
+        for name in (
+            "a", "span", "wbr", "div", "em", "strong", "h1", "h2", "h3", "h4", "ul", "ol",
+            "section", "details", "summary", "table", "tr", "td", "th", "dl", "dt", "dd",
+        )
+    },
+    **{name: "" for name in ("p", "img", "button", "sup", "sub", "i", "b")},
+}
+
+
+def _tag_text(head: str, rest: str) -> str:
+    closing = head.startswith("/")
+    name = head[1:] if closing else head
+    if name.startswith(("wbr", "span")):
+        return ""
+    blank = not rest or rest.isspace()
+    if closing:
+        return _CLOSE_TEXT.get(name, "") if blank else ""
+    if name.startswith("pre"):
+        return _FENCE_OPEN
+    if name.startswith("code"):
+        return "`"
+    if name == "li" and blank:
+        return "- "
+    if name == "br" and _BR_REST_RE.fullmatch(rest):
+        return "\n"
+    return ""
+
+
+def html_to_text(html: str) -> str:
+    """Renders a rustdoc HTML fragment as plain text in one pass over its tags.
+
+    `<pre>` becomes a ```text fence, `<code>` a backtick span, `<li>` a "- " bullet,
+    `<br>`/`</p>`/`</li>` line breaks; all other tags are dropped, entities are
+    unescaped and runs of blank lines are collapsed.
+    """
+    if "<" in html:
+        parts = _SPLIT_TAG_RE.split(html)
+        by_head = _TAG_TEXT_BY_HEAD
+        for i in range(1, len(parts), 3):
+            text = by_head.get(parts[i])
+            parts[i] = text if text is not None else _tag_text(parts[i], parts[i + 1])
+            parts[i + 1] = ""
+        html = "".join(parts)
+    if "&" in html:
+        html = unescape(html)
+    if "\n\n\n" in html:
+        html = _BLANK_LINES_RE.sub("\n\n", html)
+    return html.strip()
+
+
+Event = tuple[str, ...]
+
+
+def scan_rustdoc(html: str) -> Iterator[Event]:
+    """Walks a rustdoc page once and yields what the module/all-items parsers need.
+
+    Events (all text values are raw HTML fragments; callers strip tags):
+
+    - ("version", text)
+    - ("module", name_html)                       first `<h1>Module <span>…</span>`
+    - ("breadcrumb", link_html)                   links of the first breadcrumbs bar
+    - ("section", id, title_html)                 module section that has an item table
+    - ("item", kind_class, href, name_html, summary_html or "")
+    - ("all-section", id, title)                  all.html section that has an item list
+    - ("all-item", href, text_html)
+
+    A section header is paired with the first item table that follows it before the
+    next section header. Item tables, item lists and the breadcrumbs bar are consumed
+    in one go up to their closing tag, so every byte of the page is examined a bounded
+    number of times.
+    """
+    seen_version = False
+    seen_module = False
+    seen_breadcrumbs = False
+    pending_section: Optional[tuple[str, str]] = None
+    pending_all: Optional[tuple[str, str]] = None
+
+    pos = 0
+    while True:
+        m = _TAG_RE.search(html, pos)
+        if m is None:
+            return
+        tag, attrs = m.groups()
+        end = pos = m.end()
+
+        if tag == "span":
+            if not seen_version and attrs == ' class="version"':
+                close = html.find("<", end)
+                if close > end and html.startswith("</span>", close):
+                    seen_version = True
+                    yield ("version", html[end:close])
+
+        elif tag == "h2":
+            sm = _SECTION_ATTRS_RE.match(attrs)
+            if sm:
+                title_end = html.find('<a href="#', end)
+                pending_section = (sm.group(1), html[end:title_end]) if title_end >= 0 else None
+
+        elif tag == "dl":
+            if pending_section is not None and attrs == ' class="item-table"':
+                close = html.find("</dl>", end)
+                if close < 0:
+                    return
+                yield ("section", *pending_section)
+                pending_section = None
+                for dm in _DT_DD_RE.finditer(html, end, close):
+                    am = _ITEM_LINK_RE.search(dm.group(1))
+                    if am:
+                        yield ("item", am.group(1), am.group(2), am.group(3), dm.group(2) or "")
+                pos = close + len("</dl>")
+
+        elif tag == "h3":
+            hm = _ALL_SECTION_ATTRS_RE.match(attrs)
+            if hm:
+                close = html.find("<", end)
+                if close > end and html.startswith("</h3>", close):
+                    pending_all = (hm.group(1), html[end:close])
+                else:
+                    pending_all = None
+
+        elif tag == "ul":
+            if pending_all is not None and attrs == ' class="all-items"':
+                close = html.find("</ul>", end)
+                if close < 0:
+                    return
+                yield ("all-section", *pending_all)
+                pending_all = None
+                for am in _ALL_LINK_RE.finditer(html, end, close):
+                    yield ("all-item", am.group(1), am.group(2))
+                pos = close + len("</ul>")
+
+        elif tag == "div":
+            if not seen_breadcrumbs and attrs == ' class="rustdoc-breadcrumbs"':
+                seen_breadcrumbs = True
+                close = html.find("</div>", end)
+                if close >= 0:
+                    for bm in _BREADCRUMB_LINK_RE.finditer(html, end, close):
+                        yield ("breadcrumb", bm.group(1))
+                    pos = close + len("</div>")
+
+        elif tag == "h1":
+            if not seen_module and not attrs and html.startswith("Module <span>", end):
+                start = end + len("Module <span>")
+                close = html.find("</span>", start)
+                if close >= 0:
+                    seen_module = True
+                    yield ("module", html[start:close])
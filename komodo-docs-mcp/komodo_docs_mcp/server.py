@@ -1,26 +1,46 @@
 from __future__ import annotations
 
+import argparse
+import base64
+import binascii
+import contextlib
 import json
+import math
 import os
+import re
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from json import JSONDecoder
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from . import __version__
+from .cache import DiskPageCache, MemoryPageCache
+from .crawler import CrawlReport, crawl_crate
+from .fulltext import FullTextHit, FullTextIndex
+from .jsonio import dumps, dumps_bytes
+from .metrics import call_stages, hit_rate
+from .profiling import CallProfiler
+from .snapshot import SnapshotArchive, SnapshotClient, SnapshotError, export_snapshot
 from .docsrs import (
     AllItem,
     DocItem,
+    DocsRsCancelled,
     DocsRsClient,
     DocsRsError,
+    cancellation_scope,
+    check_cancelled,
     ensure_bool,
     ensure_int,
     ensure_one_of,
     ensure_str,
+    expansion_items,
     filter_module_docs,
     module_docs_to_json,
     module_docs_to_markdown,
-    search_all_items,
 )
 
 
@@ -35,6 +55,24 @@ _DEBUG = os.environ.get("KOMODO_DOCS_MCP_DEBUG", "").strip().lower() in {"1", "t
 _LOG_FILE = (os.environ.get("KOMODO_DOCS_MCP_LOG_FILE") or "").strip()
 _LOG_FP = None
 _STDIO_MODE: Optional[str] = None  # "content-length" | "ndjson"
+_CACHE_DIR = (os.environ.get("KOMODO_DOCS_MCP_CACHE_DIR") or "").strip()
+_MEMORY_CACHE_MB = (os.environ.get("KOMODO_DOCS_MCP_MEMORY_CACHE_MB") or "").strip()
+_CONCURRENCY = (os.environ.get("KOMODO_DOCS_MCP_CONCURRENCY") or "").strip()
+_WORKERS = (os.environ.get("KOMODO_DOCS_MCP_WORKERS") or "").strip()
+_STATS_INTERVAL = (os.environ.get("KOMODO_DOCS_MCP_STATS_INTERVAL") or "").strip()
+_WARMUP = (os.environ.get("KOMODO_DOCS_MCP_WARMUP") or "").strip()
+_SNAPSHOT = (os.environ.get("KOMODO_DOCS_MCP_SNAPSHOT") or "").strip()
+_DEFAULT_WARMUP_MODULES = ("api::read", "api::write", "api::execute")
+_EXIT_GRACE_S = 2.0
+
+
+def _cache_dir() -> Optional[str]:
+    if _CACHE_DIR.lower() in {"0", "false", "no", "off", "none"}:
+        return None
+    if _CACHE_DIR:
+        return os.path.expanduser(_CACHE_DIR)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "komodo-docs-mcp")
 
 
 def _log_open() -> None:
@@ -69,108 +107,245 @@ def _debug(msg: str) -> None:
         _LOG_FP.flush()
 
 
-def _write_message(payload: dict[str, Any]) -> None:
-    global _STDIO_MODE
-    raw_text = json.dumps(payload, ensure_ascii=False)
+class _StdoutWriter:
+    """Writes framed messages to stdout in submission order, one write and flush per batch.
 
-    # Default to NDJSON; Codex's stdio transport uses newline-delimited JSON.
-    mode = _STDIO_MODE or "ndjson"
+    Callers append under a short lock; whichever caller finds no write in progress
+    drains everything queued so far, so messages finished by several workers at once
+    leave in a single write instead of interleaving or flushing one by one.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: list[bytes] = []
+        self._writing = False
+
+    def write(self, frame: bytes) -> None:
+        with self._lock:
+            self._pending.append(frame)
+            if self._writing:
+                return
+            self._writing = True
+        while True:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                if not batch:
+                    self._writing = False
+                    return
+            try:
+                data = batch[0] if len(batch) == 1 else b"".join(batch)
+                out = getattr(sys.stdout, "buffer", None)
+                if out is not None:
+                    out.write(data)
+                    out.flush()
+                else:
+                    sys.stdout.write(data.decode("utf-8"))
+                    sys.stdout.flush()
+            except BaseException:
+                with self._lock:
+                    self._writing = False
+                raise
+
+
+_WRITER = _StdoutWriter()
+
+
+def _frame(payload: dict[str, Any], mode: str) -> bytes:
+    body = dumps_bytes(payload)
     if mode == "content-length":
-        raw = raw_text.encode("utf-8")
-        sys.stdout.buffer.write(f"Content-Length: {len(raw)}\r\n\r\n".encode("ascii"))
-        sys.stdout.buffer.write(raw)
-        sys.stdout.buffer.flush()
-        return
+        return b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+    return body + b"\n"
+
+
+def _write_message(payload: dict[str, Any]) -> None:
+    # Default to NDJSON; Codex's stdio transport uses newline-delimited JSON.
+    _WRITER.write(_frame(payload, _STDIO_MODE or "ndjson"))
+
+
+_READ_CHUNK = 65536
+_WHITESPACE = b" \t\r\n"
+_STRUCTURE = re.compile(rb'[{}\[\]"]')
+_STRING_BODY = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*', re.S)  # up to the closing quote
 
-    sys.stdout.write(raw_text + "\n")
-    sys.stdout.flush()
 
 class _StdioJsonRpc:
+    """Reads JSON-RPC messages from stdin, framed by Content-Length headers or newlines.
+
+    Unread input lives in one `bytearray` starting at `_pos`; consumed bytes are only
+    dropped when the buffer is refilled, so each input byte is copied a bounded number
+    of times and NDJSON lines are decoded once, when their newline arrives. A message
+    spanning lines is followed bracket by bracket and decoded once, when it closes.
+    """
+
     def __init__(self) -> None:
-        self._buf = b""
+        self._buf = bytearray()
+        self._pos = 0
+        self._scan = 0  # NDJSON: where the next newline search or bracket scan resumes
+        self._nested = False  # NDJSON: the message at `_pos` spans lines, scanned by brackets
+        self._depth = 0
+        self._in_string = False
         self._decoder = JSONDecoder()
         self.last_framing: Optional[str] = None
 
-    def _fill(self) -> bool:
+    def _fill(self, want: int = 0) -> bool:
         reader = sys.stdin.buffer
+        size = max(_READ_CHUNK, want)
         read1 = getattr(reader, "read1", None)
-        chunk = read1(4096) if callable(read1) else reader.read(4096)
+        chunk = read1(size) if callable(read1) else reader.read(size)
         if not chunk:
             return False
+        if self._pos and self._pos * 2 >= len(self._buf):
+            del self._buf[: self._pos]
+            self._scan -= self._pos
+            self._pos = 0
         self._buf += chunk
         return True
 
+    def _consume(self, end: int) -> None:
+        if end >= len(self._buf):
+            self._buf.clear()
+            end = 0
+        self._pos = self._scan = end
+        self._nested = False
+
     def read_message(self) -> Optional[dict[str, Any]]:
         while True:
-            # Trim leading whitespace/newlines.
-            self._buf = self._buf.lstrip(b"\r\n\t ")
-            if not self._buf and not self._fill():
-                return None
-
-            # Header framing: Content-Length
-            lower = self._buf[:64].lower()
-            if lower.startswith(b"content-length:"):
-                self.last_framing = "content-length"
-                header_end = self._buf.find(b"\r\n\r\n")
-                sep_len = 4
-                if header_end < 0:
-                    header_end = self._buf.find(b"\n\n")
-                    sep_len = 2
-                if header_end < 0:
-                    if not self._fill():
-                        return None
-                    continue
-
-                header_blob = self._buf[:header_end].decode("utf-8", errors="replace")
-                length = None
-                for raw_line in header_blob.replace("\r\n", "\n").split("\n"):
-                    if raw_line.lower().startswith("content-length:"):
-                        try:
-                            length = int(raw_line.split(":", 1)[1].strip())
-                        except Exception:
-                            length = None
-                        break
-                if length is None:
-                    raise ValueError("invalid Content-Length header")
-
-                body_start = header_end + sep_len
-                need = body_start + length
-                while len(self._buf) < need:
-                    if not self._fill():
-                        return None
-
-                body = self._buf[body_start:need]
-                self._buf = self._buf[need:]
-                return json.loads(body.decode("utf-8", errors="replace"))
-
-            # Raw JSON (no headers, no newline required).
-            self.last_framing = "ndjson"
-            try:
-                text = self._buf.decode("utf-8")
-            except UnicodeDecodeError:
+            buf = self._buf
+            pos, n = self._pos, len(buf)
+            while pos < n and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= n:
+                self._consume(n)
                 if not self._fill():
                     return None
                 continue
+            self._pos = pos
+            self._scan = max(self._scan, pos)
 
-            start = 0
-            while start < len(text) and text[start] in " \t\r\n":
-                start += 1
-            if start >= len(text):
-                self._buf = b""
-                if not self._fill():
-                    return None
-                continue
+            if buf[pos : pos + 15].lower() == b"content-length:":
+                self.last_framing = "content-length"
+                return self._read_framed()
+            self.last_framing = "ndjson"
+            return self._read_ndjson()
+
+    def _read_framed(self) -> Optional[dict[str, Any]]:
+        while True:
+            pos = self._pos
+            header_end = self._buf.find(b"\r\n\r\n", pos)
+            sep_len = 4
+            if header_end < 0:
+                header_end = self._buf.find(b"\n\n", pos)
+                sep_len = 2
+            if header_end >= 0:
+                break
+            if not self._fill():
+                return None
 
+        length = None
+        if self._buf.find(b"\n", pos, header_end) < 0:
+            # A lone Content-Length header: skip the per-line header parse.
             try:
-                obj, end = self._decoder.raw_decode(text, start)
-            except json.JSONDecodeError:
-                if not self._fill():
-                    return None
-                continue
+                length = int(self._buf[pos + 15 : header_end])
+            except ValueError:
+                pass
+        else:
+            header_blob = self._buf[pos:header_end].decode("utf-8", errors="replace")
+            for raw_line in header_blob.replace("\r\n", "\n").split("\n"):
+                if raw_line.lower().startswith("content-length:"):
+                    try:
+                        length = int(raw_line.split(":", 1)[1].strip())
+                    except Exception:
+                        length = None
+                    break
+        if length is None:
+            raise ValueError("invalid Content-Length header")
+
+        # Offsets relative to _pos: _fill may compact the buffer.
+        body_start = header_end + sep_len - pos
+        need = body_start + length
+        while len(self._buf) - self._pos < need:
+            if not self._fill(need - (len(self._buf) - self._pos)):
+                return None
+
+        start = self._pos
+        body = self._buf[start + body_start : start + need].decode("utf-8", errors="replace")
+        self._consume(start + need)
+        return json.loads(body)
+
+    def _read_ndjson(self) -> Optional[dict[str, Any]]:
+        # Raw JSON: usually one message per line, but pretty-printed messages, several
+        # messages on one line and a final message without a newline are accepted too.
+        while True:
+            buf, pos = self._buf, self._pos
+            if not self._nested:
+                nl = buf.find(b"\n", self._scan)
+                if nl >= 0:
+                    obj, end = self._decode(pos, nl + 1)
+                    if end >= 0:
+                        self._consume(end)
+                        return obj
+                    if buf[pos] not in b"{[":
+                        self._consume(nl + 1)
+                        raise ValueError("invalid JSON message")
+                if buf[pos] in b"{[":
+                    # Not one whole message per line: follow its brackets instead, so each byte
+                    # is scanned once and the message is decoded once, when it closes.
+                    self._nested = True
+                    self._scan = pos
+                    self._depth = 0
+                    self._in_string = False
+                else:
+                    self._scan = len(buf)
+            if self._nested:
+                end = self._scan_brackets()
+                if end >= 0:
+                    obj, obj_end = self._decode(pos, end)
+                    self._consume(end)
+                    if obj_end < 0:
+                        raise ValueError("invalid JSON message")
+                    return obj
+            if not self._fill():
+                return None
 
-            consumed = len(text[:end].encode("utf-8"))
-            self._buf = self._buf[consumed:]
-            return obj
+    def _decode(self, start: int, end: int) -> tuple[Any, int]:
+        """The first JSON value in `_buf[start:end]` and the offset it ends at, or `(None, -1)`."""
+        try:
+            text = self._buf[start:end].decode("utf-8")
+            obj, obj_end = self._decoder.raw_decode(text)
+        except ValueError:  # UnicodeDecodeError, JSONDecodeError
+            return None, -1
+        if obj_end == len(text) or not text[obj_end:].strip():
+            return obj, end
+        return obj, start + len(text[:obj_end].encode("utf-8"))
+
+    def _scan_brackets(self) -> int:
+        """Advances the bracket scan of the message at `_pos`; its end once it closes, else -1."""
+        buf = self._buf
+        at, n, depth = self._scan, len(buf), self._depth
+        while True:
+            if self._in_string:
+                at = _STRING_BODY.match(buf, at).end()
+                if at >= n or buf[at] != 0x22:  # more to come, or a trailing backslash
+                    break
+                self._in_string = False
+                at += 1
+            m = _STRUCTURE.search(buf, at)
+            if m is None:
+                at = n
+                break
+            at = m.end()
+            c = buf[at - 1]
+            if c == 0x22:
+                self._in_string = True
+            elif c in b"{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    self._depth = 0
+                    return at
+        self._scan, self._depth = at, depth
+        return -1
 
 
 def _as_request(msg: dict[str, Any]) -> JsonRpcRequest:
@@ -216,6 +391,17 @@ def _tool_schema_get_module_docs() -> dict[str, Any]:
                 "includeItemDocs": {"type": "boolean", "default": False},
                 "maxItems": {"type": "integer", "default": 50, "minimum": 1, "maximum": 500},
                 "format": {"type": "string", "default": "markdown", "enum": ["markdown", "json"]},
+                "compact": {"type": "boolean", "default": False, "description": "With format=json, return minified JSON."},
+                "pageSize": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": 500,
+                    "description": "Expand only this many items now and return a continuation handle for the rest (implies includeItemDocs).",
+                },
+                "continuation": {
+                    "type": "string",
+                    "description": "Handle from a previous paged result; returns the next page of expanded items.",
+                },
             },
             "required": [],
         },
@@ -225,15 +411,20 @@ def _tool_schema_get_module_docs() -> dict[str, Any]:
 def _tool_schema_search() -> dict[str, Any]:
     return {
         "name": "komodo_docs_search",
-        "description": "Search the crate-wide docs.rs 'all items' index and return matching symbols with URLs.",
+        "description": (
+            "Search the crate-wide docs.rs 'all items' index and return matching symbols with URLs. "
+            "mode=fulltext ranks already-fetched summaries, signatures and docs for concept queries without network access."
+        ),
         "inputSchema": {
             "type": "object",
             "properties": {
                 "crate": {"type": "string", "default": "komodo_client"},
                 "version": {"type": "string", "default": "latest"},
                 "query": {"type": "string"},
+                "mode": {"type": "string", "default": "symbol", "enum": ["symbol", "fulltext"]},
                 "limit": {"type": "integer", "default": 20, "minimum": 1, "maximum": 200},
                 "format": {"type": "string", "default": "markdown", "enum": ["markdown", "json"]},
+                "compact": {"type": "boolean", "default": False, "description": "With format=json, return minified JSON."},
             },
             "required": ["query"],
         },
@@ -252,13 +443,68 @@ def _tool_schema_get_item_docs() -> dict[str, Any]:
                 "item": {"type": "string", "description": "Symbol name or full path like entities::stack::StackListItem"},
                 "maxMatches": {"type": "integer", "default": 10, "minimum": 1, "maximum": 50},
                 "format": {"type": "string", "default": "markdown", "enum": ["markdown", "json"]},
+                "compact": {"type": "boolean", "default": False, "description": "With format=json, return minified JSON."},
             },
             "required": ["item"],
         },
     }
 
 
-def _format_search_markdown(*, crate: str, version: str, query: str, hits: list[AllItem], base_url: str) -> str:
+def _tool_schema_stats() -> dict[str, Any]:
+    return {
+        "name": "komodo_docs_stats",
+        "description": (
+            "Server metrics: per-tool latency percentiles, fetch/parse/render stage timings, "
+            "cache hit rates, bytes downloaded and requests in flight."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "format": {"type": "string", "default": "markdown", "enum": ["markdown", "json"]},
+                "compact": {"type": "boolean", "default": False, "description": "With format=json, return minified JSON."},
+            },
+            "required": [],
+        },
+    }
+
+
+def _tool_schema_prefetch() -> dict[str, Any]:
+    return {
+        "name": "komodo_docs_prefetch",
+        "description": (
+            "Fetches and caches every item page (optionally every module page) of a crate version, so later "
+            "calls are served from the cache. Pages already cached are skipped, so an interrupted run resumes."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "crate": {"type": "string", "default": "komodo_client"},
+                "version": {"type": "string", "default": "latest"},
+                "includeModules": {"type": "boolean", "default": False, "description": "Also fetch every module page."},
+                "concurrency": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": 32,
+                    "description": "Pages fetched at once (default: KOMODO_DOCS_MCP_CONCURRENCY).",
+                },
+                "maxRequestsPerSecond": {
+                    "type": "number",
+                    "default": 5,
+                    "minimum": 0,
+                    "maximum": 100,
+                    "description": "Average request rate towards docs.rs; 0 for no limit.",
+                },
+                "format": {"type": "string", "default": "markdown", "enum": ["markdown", "json"]},
+                "compact": {"type": "boolean", "default": False, "description": "With format=json, return minified JSON."},
+            },
+            "required": [],
+        },
+    }
+
+
+def _format_search_markdown(
+    *, crate: str, version: str, query: str, hits: list[AllItem], base_url: str, fuzzy: bool = False
+) -> str:
     lines: list[str] = []
     lines.append(f"# Search: {query}")
     lines.append("")
@@ -268,28 +514,86 @@ def _format_search_markdown(*, crate: str, version: str, query: str, hits: list[
     if not hits:
         lines.append("_No matches._")
         return "\n".join(lines).strip() + "\n"
+    if fuzzy:
+        lines.append("_No names contain the query; closest names:_")
+        lines.append("")
     for it in hits:
         url = base_url + it.href.lstrip("/")
         lines.append(f"- `{it.item_path}` ({it.kind}) — {url}")
     return "\n".join(lines).strip() + "\n"
 
 
+def _format_fulltext_markdown(*, crate: str, version: str, query: str, hits: list[FullTextHit]) -> str:
+    lines: list[str] = []
+    lines.append(f"# Full-text search: {query}")
+    lines.append("")
+    lines.append(f"- Crate: `{crate}`")
+    lines.append(f"- Version: `{version}`")
+    lines.append("")
+    if not hits:
+        lines.append(
+            "_No matches among the pages fetched so far. Expand modules with includeItemDocs=true to index more docs._"
+        )
+        return "\n".join(lines).strip() + "\n"
+    for h in hits:
+        if h.summary:
+            lines.append(f"- `{h.item_path}` ({h.kind}) — {h.summary} — {h.url}")
+        else:
+            lines.append(f"- `{h.item_path}` ({h.kind}) — {h.url}")
+    return "\n".join(lines).strip() + "\n"
+
+
+def _handle_tool_fulltext_search(
+    *, crate: str, version: str, query: str, limit: int, fmt: str, compact: bool, client: DocsRsClient
+) -> dict[str, Any]:
+    # Resolving only uses the cached latest -> version pointer; an unknown latest searches every indexed version.
+    resolved = client.resolve_version(crate, version)
+    hits = client.fulltext.search(query, crate=crate, version=None if resolved == "latest" else resolved, limit=limit)
+    if fmt == "json":
+        payload = {
+            "crate": crate,
+            "version": resolved,
+            "query": query,
+            "mode": "fulltext",
+            "hits": [
+                {"kind": h.kind, "itemPath": h.item_path, "url": h.url, "summary": h.summary, "score": round(h.score, 4)}
+                for h in hits
+            ],
+        }
+        text = dumps(payload, indent=not compact) + "\n"
+    else:
+        text = _format_fulltext_markdown(crate=crate, version=resolved, query=query, hits=hits)
+    return {"content": [{"type": "text", "text": text}]}
+
+
 def _handle_tool_search(arguments: dict[str, Any], client: DocsRsClient) -> dict[str, Any]:
     crate = ensure_str(arguments.get("crate"), default="komodo_client")
     version = ensure_str(arguments.get("version"), default="latest")
     query = ensure_str(arguments.get("query"), default="")
+    mode = ensure_one_of(arguments.get("mode"), default="symbol", allowed=["symbol", "fulltext"])
     limit = ensure_int(arguments.get("limit"), default=20, min_value=1, max_value=200)
     fmt = ensure_one_of(arguments.get("format"), default="markdown", allowed=["markdown", "json"])
+    compact = ensure_bool(arguments.get("compact"), default=False)
+
+    if mode == "fulltext":
+        return _handle_tool_fulltext_search(
+            crate=crate, version=version, query=query, limit=limit, fmt=fmt, compact=compact, client=client
+        )
 
-    page_version, items = client.parse_all_items(crate=crate, version=version)
-    hits = search_all_items(items, query=query, limit=limit)
-    base_url = f"https://docs.rs/{crate}/{version}/{crate}/"
+    page_version, index = client.all_items_index(crate=crate, version=version)
+    hits = index.search(query, limit=limit)
+    match = "substring"
+    if not hits and query.strip():
+        match = "fuzzy"
+        hits = index.fuzzy(query, limit=limit)
+    base_url = f"https://docs.rs/{crate}/{page_version}/{crate}/"
 
     if fmt == "json":
         payload = {
             "crate": crate,
             "version": page_version,
             "query": query,
+            "match": match,
             "hits": [
                 {
                     "kind": it.kind,
@@ -300,9 +604,11 @@ def _handle_tool_search(arguments: dict[str, Any], client: DocsRsClient) -> dict
                 for it in hits
             ],
         }
-        text = json.dumps(payload, indent=2, ensure_ascii=False) + "\n"
+        text = dumps(payload, indent=not compact) + "\n"
     else:
-        text = _format_search_markdown(crate=crate, version=page_version, query=query, hits=hits, base_url=base_url)
+        text = _format_search_markdown(
+            crate=crate, version=page_version, query=query, hits=hits, base_url=base_url, fuzzy=match == "fuzzy"
+        )
 
     return {"content": [{"type": "text", "text": text}]}
 
@@ -313,11 +619,21 @@ def _handle_tool_get_item_docs(arguments: dict[str, Any], client: DocsRsClient)
     item_query = ensure_str(arguments.get("item"), default="")
     max_matches = ensure_int(arguments.get("maxMatches"), default=10, min_value=1, max_value=50)
     fmt = ensure_one_of(arguments.get("format"), default="markdown", allowed=["markdown", "json"])
+    compact = ensure_bool(arguments.get("compact"), default=False)
 
-    page_version, items = client.parse_all_items(crate=crate, version=version)
-    hits = search_all_items(items, query=item_query, limit=max_matches)
+    page_version, index = client.all_items_index(crate=crate, version=version)
+    # Paths and leaf names resolve by hash lookup; the substring search is only the fallback,
+    # and near-misses (typos, reordered CamelCase words) are looked up when both miss.
+    match = "exact"
+    hits = index.resolve(item_query, crate=crate)[:max_matches]
+    if not hits:
+        match = "substring"
+        hits = index.search(item_query, limit=max_matches)
+    if not hits:
+        match = "fuzzy"
+        hits = index.fuzzy(item_query, limit=max_matches)
 
-    base_url = f"https://docs.rs/{crate}/{version}/{crate}/"
+    base_url = f"https://docs.rs/{crate}/{page_version}/{crate}/"
     if not hits:
         return {
             "content": [
@@ -329,10 +645,7 @@ def _handle_tool_get_item_docs(arguments: dict[str, Any], client: DocsRsClient)
             "isError": True,
         }
 
-    # Prefer exact full-path matches if provided.
-    normalized = item_query.strip()
-    exact = [h for h in hits if h.item_path == normalized]
-    chosen = exact[0] if exact else hits[0]
+    chosen = hits[0]
 
     item = DocItem(kind=chosen.kind, name=chosen.item_path.split("::")[-1], href=chosen.href)
     detailed = client.parse_item_page(base_url=base_url, item=item)
@@ -342,6 +655,7 @@ def _handle_tool_get_item_docs(arguments: dict[str, Any], client: DocsRsClient)
         payload = {
             "crate": crate,
             "version": page_version,
+            "match": match,
             "item": {
                 "kind": chosen.kind,
                 "itemPath": chosen.item_path,
@@ -354,7 +668,7 @@ def _handle_tool_get_item_docs(arguments: dict[str, Any], client: DocsRsClient)
                 for h in hits[1:]
             ],
         }
-        text = json.dumps(payload, indent=2, ensure_ascii=False) + "\n"
+        text = dumps(payload, indent=not compact) + "\n"
     else:
         lines: list[str] = []
         lines.append(f"# {chosen.item_path}")
@@ -362,6 +676,8 @@ def _handle_tool_get_item_docs(arguments: dict[str, Any], client: DocsRsClient)
         lines.append(f"- Crate: `{crate}`")
         lines.append(f"- Version: `{page_version}`")
         lines.append(f"- Source: {url}")
+        if match == "fuzzy":
+            lines.append(f"- Closest match: nothing is named `{item_query}`")
         lines.append("")
         if detailed.signature:
             lines.append("```rust")
@@ -382,7 +698,39 @@ def _handle_tool_get_item_docs(arguments: dict[str, Any], client: DocsRsClient)
     return {"content": [{"type": "text", "text": text}]}
 
 
-def _handle_tool_get_module_docs(arguments: dict[str, Any], client: DocsRsClient) -> dict[str, Any]:
+def _encode_continuation(state: dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_continuation(handle: str) -> dict[str, Any]:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(handle + "=" * (-len(handle) % 4)))
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"invalid continuation handle: {e}") from e
+    if not isinstance(state, dict):
+        raise ValueError("invalid continuation handle")
+    return state
+
+
+def _handle_tool_get_module_docs(
+    arguments: dict[str, Any],
+    client: DocsRsClient,
+    *,
+    progress: Optional[Callable[[int, int], None]] = None,
+    prefetch: Optional[Callable[[Callable[[], Any]], None]] = None,
+) -> dict[str, Any]:
+    offset = 0
+    handle = ensure_str(arguments.get("continuation"), default="")
+    if handle:
+        try:
+            state = _decode_continuation(handle)
+        except ValueError as e:
+            return {"content": [{"type": "text", "text": f"{e}\n"}], "isError": True}
+        # The handle carries the original arguments, pinned to the version the first page used.
+        arguments = {**state, "includeItemDocs": True}
+        offset = ensure_int(state.get("offset"), default=0, min_value=0, max_value=10_000)
+
     crate = ensure_str(arguments.get("crate"), default="komodo_client")
     version = ensure_str(arguments.get("version"), default="latest")
     module_path = ensure_str(arguments.get("modulePath"), default=f"{crate}::api::read")
@@ -390,6 +738,11 @@ def _handle_tool_get_module_docs(arguments: dict[str, Any], client: DocsRsClient
     include_item_docs = ensure_bool(arguments.get("includeItemDocs"), default=False)
     max_items = ensure_int(arguments.get("maxItems"), default=50, min_value=1, max_value=500)
     fmt = ensure_one_of(arguments.get("format"), default="markdown", allowed=["markdown", "json"])
+    compact = ensure_bool(arguments.get("compact"), default=False)
+    page_size: Optional[int] = None
+    if arguments.get("pageSize") is not None:
+        page_size = ensure_int(arguments.get("pageSize"), default=20, min_value=1, max_value=500)
+        include_item_docs = True
 
     # Convenience topic shorthands.
     if module_path.lower() in {"stack", "stacks"}:
@@ -400,96 +753,636 @@ def _handle_tool_get_module_docs(arguments: dict[str, Any], client: DocsRsClient
     module = client.parse_module(crate=crate, version=version, module_path=module_path)
     if query:
         module = filter_module_docs(module, query=query)
+
+    continuation = None
+    if page_size is not None:
+        pending = expansion_items(module, max_items=max_items)[offset + page_size :]
+        if pending:
+            next_state = {
+                "crate": crate,
+                "version": module.version,
+                "modulePath": module_path,
+                "query": query,
+                "maxItems": max_items,
+                "format": fmt,
+                "compact": compact,
+                "pageSize": page_size,
+                "offset": offset + page_size,
+            }
+            continuation = _encode_continuation(next_state)
+            if prefetch is not None:
+                # Warm the caches with the next page while the client reads this one.
+                base_url = module.page_url.rsplit("/", 1)[0] + "/"
+                next_items = pending[:page_size]
+                prefetch(lambda: client.parse_item_pages(base_url=base_url, items=next_items))
+
+    render_args: dict[str, Any] = dict(
+        include_item_docs=include_item_docs,
+        max_items=max_items,
+        client=client,
+        offset=offset,
+        limit=page_size,
+        listing=not handle,
+        continuation=continuation,
+        progress=progress,
+    )
     if fmt == "json":
-        text = module_docs_to_json(
-            module,
-            include_item_docs=include_item_docs,
-            max_items=max_items,
-            client=client,
-        )
+        text = module_docs_to_json(module, compact=compact, **render_args)
     else:
-        text = module_docs_to_markdown(
-            module,
-            include_item_docs=include_item_docs,
-            max_items=max_items,
-            client=client,
-        )
+        text = module_docs_to_markdown(module, **render_args)
 
     return {"content": [{"type": "text", "text": text}]}
 
 
-def main() -> None:
+def _ensure_rate(v: Any, *, default: float) -> float:
+    try:
+        rate = float(v) if v is not None else default
+    except (TypeError, ValueError):
+        return default
+    return min(100.0, max(0.0, rate)) if math.isfinite(rate) else default
+
+
+def _format_crawl_markdown(report: CrawlReport) -> str:
+    lines: list[str] = []
+    lines.append(f"# Prefetch: {report.crate} {report.version}")
+    lines.append("")
+    lines.append(f"- Pages: {report.done} of {report.total}")
+    lines.append(f"- Fetched: {report.fetched}, already cached: {report.cached}, failed: {report.failed}")
+    lines.append(f"- Time: {report.elapsed_s:.1f} s ({report.pages_per_s:.1f} pages/s)")
+    if report.errors:
+        lines.append("")
+        lines.append("## Errors")
+        lines.append("")
+        for error in report.errors:
+            lines.append(f"- {error}")
+        if report.failed > len(report.errors):
+            lines.append(f"- … and {report.failed - len(report.errors)} more")
+    return "\n".join(lines).strip() + "\n"
+
+
+def _handle_tool_prefetch(
+    arguments: dict[str, Any], client: DocsRsClient, *, progress: Optional[Callable[[int, int], None]] = None
+) -> dict[str, Any]:
+    crate = ensure_str(arguments.get("crate"), default="komodo_client")
+    version = ensure_str(arguments.get("version"), default="latest")
+    include_modules = ensure_bool(arguments.get("includeModules"), default=False)
+    concurrency = ensure_int(arguments.get("concurrency"), default=client.max_concurrency, min_value=1, max_value=32)
+    rate = _ensure_rate(arguments.get("maxRequestsPerSecond"), default=5.0)
+    fmt = ensure_one_of(arguments.get("format"), default="markdown", allowed=["markdown", "json"])
+    compact = ensure_bool(arguments.get("compact"), default=False)
+
+    report = crawl_crate(
+        client,
+        crate=crate,
+        version=version,
+        include_modules=include_modules,
+        concurrency=concurrency,
+        rate_per_s=rate,
+        progress=(lambda r: progress(r.done, r.total)) if progress is not None else None,
+    )
+    if fmt == "json":
+        text = dumps(report.to_json(), indent=not compact) + "\n"
+    else:
+        text = _format_crawl_markdown(report)
+    return {"content": [{"type": "text", "text": text}], "isError": bool(report.total) and report.failed == report.total}
+
+
+_TOOL_NAMES = (
+    "komodo_docs_get_module_docs",
+    "komodo_docs_search",
+    "komodo_docs_get_item_docs",
+    "komodo_docs_stats",
+    "komodo_docs_prefetch",
+)
+
+
+def _stats_payload(client: DocsRsClient) -> dict[str, Any]:
+    snap = client.metrics.snapshot()
+    client_stats = client.stats()
+    counters = snap["counters"]
+    histograms = snap["histograms"]
+    memory, parsed = client_stats["memory"], client_stats["parsed"]
+    served = counters.get("fetch.memory", 0) + counters.get("fetch.disk", 0)
+    return {
+        "uptimeS": snap["uptimeS"],
+        "tools": {name[len("tool.") :]: h for name, h in histograms.items() if name.startswith("tool.")},
+        "stages": {name: h for name, h in histograms.items() if not name.startswith("tool.")},
+        "counters": counters,
+        "cache": {
+            "fetchHitRate": hit_rate(served, counters.get("fetch.network", 0) + counters.get("fetch.notModified", 0)),
+            "memoryHitRate": hit_rate(memory["hits"], memory["misses"]),
+            "parsedHitRate": hit_rate(parsed["hits"], parsed["misses"]),
+            "memory": memory,
+            "parsed": parsed,
+            "disk": client_stats["disk"],
+        },
+        "http": client_stats["http"],
+        "inFlight": {"toolCalls": counters.get("tools.inFlight", 0), "fetches": client_stats["inflight"]["inFlight"]},
+    }
+
+
+def _percent(rate: Optional[float]) -> str:
+    return "n/a" if rate is None else f"{rate:.0%}"
+
+
+def _format_stats_markdown(stats: dict[str, Any]) -> str:
+    lines: list[str] = []
+    lines.append("# komodo-docs-mcp stats")
+    lines.append("")
+    lines.append(f"- Uptime: {stats['uptimeS']:.0f} s")
+    lines.append(f"- In flight: {stats['inFlight']['toolCalls']} tool calls, {stats['inFlight']['fetches']} page fetches")
+    cache, http = stats["cache"], stats["http"]
+    lines.append(
+        f"- Page fetches served from cache: {_percent(cache['fetchHitRate'])}"
+        f" (memory cache {_percent(cache['memoryHitRate'])}, parsed results {_percent(cache['parsedHitRate'])})"
+    )
+    lines.append(
+        f"- Downloaded: {http['bytesReceived']} bytes in {http['requests']} requests"
+        f" ({http['bytesSkipped']} bytes skipped by stopping early)"
+    )
+    for title, rows in (("Tools", stats["tools"]), ("Stages", stats["stages"])):
+        lines.append("")
+        lines.append(f"## {title}")
+        lines.append("")
+        if not rows:
+            lines.append("_Nothing recorded yet._")
+            continue
+        lines.append("| name | count | mean ms | p50 ms | p90 ms | p99 ms | max ms |")
+        lines.append("| --- | ---: | ---: | ---: | ---: | ---: | ---: |")
+        for name, h in rows.items():
+            lines.append(
+                f"| {name} | {h['count']} | {h['meanMs']:g} | {h['p50Ms']:g} | {h['p90Ms']:g} | {h['p99Ms']:g} | {h['maxMs']:g} |"
+            )
+    if stats["counters"]:
+        lines.append("")
+        lines.append("## Counters")
+        lines.append("")
+        for name, value in stats["counters"].items():
+            lines.append(f"- `{name}`: {value}")
+    return "\n".join(lines).strip() + "\n"
+
+
+def _handle_tool_stats(arguments: dict[str, Any], client: DocsRsClient) -> dict[str, Any]:
+    fmt = ensure_one_of(arguments.get("format"), default="markdown", allowed=["markdown", "json"])
+    compact = ensure_bool(arguments.get("compact"), default=False)
+    stats = _stats_payload(client)
+    if fmt == "json":
+        text = dumps(stats, indent=not compact) + "\n"
+    else:
+        text = _format_stats_markdown(stats)
+    return {"content": [{"type": "text", "text": text}]}
+
+
+def _stats_summary_line(client: DocsRsClient) -> str:
+    stats = _stats_payload(client)
+    tools = ", ".join(
+        f"{name} {h['count']}x p50 {h['p50Ms']:g} ms p99 {h['p99Ms']:g} ms max {h['maxMs']:.0f} ms"
+        for name, h in stats["tools"].items()
+    )
+    c = stats["counters"]
+    return (
+        f"stats: uptime {stats['uptimeS']:.0f}s; calls: {tools or 'none'}; "
+        f"fetches: memory {c.get('fetch.memory', 0)}, disk {c.get('fetch.disk', 0)}, "
+        f"304 {c.get('fetch.notModified', 0)}, network {c.get('fetch.network', 0)}, errors {c.get('fetch.errors', 0)} "
+        f"(cache hit {_percent(stats['cache']['fetchHitRate'])}); "
+        f"downloaded {stats['http']['bytesReceived']} bytes; "
+        f"in flight: {stats['inFlight']['toolCalls']} calls, {stats['inFlight']['fetches']} fetches"
+    )
+
+
+def _log_stats_periodically(client: DocsRsClient, interval_s: float, stop: threading.Event) -> None:
+    while not stop.wait(interval_s):
+        try:
+            _debug(_stats_summary_line(client))
+        except Exception as e:
+            _debug(f"stats summary failed: {e!r}")
+
+
+def _warmup_modules() -> Optional[tuple[str, ...]]:
+    if _WARMUP.lower() in {"0", "false", "no", "off", "none"}:
+        return None
+    if not _WARMUP or _WARMUP.lower() in {"1", "true", "yes", "y", "on"}:
+        return _DEFAULT_WARMUP_MODULES
+    return tuple(m.strip() for m in _WARMUP.split(",") if m.strip())
+
+
+def _warmup_jobs(client: DocsRsClient, modules: tuple[str, ...], crate: str = "komodo_client") -> list[Callable[[], Any]]:
+    """Loads what the first calls of a session need: the all-items index (which also pins `latest`) and `modules`."""
+
+    def job(name: str, load: Callable[[], Any]) -> Callable[[], Any]:
+        def run() -> None:
+            with client.metrics.timed(f"warmup.{name}"):
+                load()
+            _debug(f"warmup: {name} ready")
+
+        return run
+
+    jobs = [job("allItems", lambda: client.all_items_index(crate=crate, version="latest"))]
+    for module in modules:
+        module_path = module if module.startswith(f"{crate}::") else f"{crate}::{module}"
+        jobs.append(
+            job(module, lambda p=module_path: client.parse_module(crate=crate, version="latest", module_path=p))
+        )
+    return jobs
+
+
+def _build_client(*, snapshot: str = "") -> tuple[DocsRsClient, Optional[str]]:
+    concurrency = ensure_int(_CONCURRENCY or None, default=8, min_value=1, max_value=64)
+    if snapshot:
+        archive = SnapshotArchive(os.path.expanduser(snapshot))
+        _debug(f"offline: serving {archive.meta.get('crate')} {archive.meta.get('version')} from {archive.path}")
+        return SnapshotClient(archive, max_concurrency=concurrency), None
     # Allow overriding user agent (useful if docs.rs rate limits).
     user_agent = os.environ.get("KOMODO_DOCS_MCP_USER_AGENT") or f"komodo-docs-mcp/{__version__}"
-    docs_client = DocsRsClient(user_agent=user_agent)
-    transport = _StdioJsonRpc()
-    _debug(f"server start: version={__version__} pid={os.getpid()} cwd={os.getcwd()}")
-    _debug(f"python: {sys.executable} {sys.version.split()[0]}")
-
-    while True:
+    disk_cache = None
+    cache_dir = _cache_dir()
+    if cache_dir:
         try:
-            msg = transport.read_message()
+            disk_cache = DiskPageCache(cache_dir)
         except Exception as e:
-            _debug(f"read_message error: {e}")
-            return
-        if msg is None:
+            _debug(f"disk cache disabled: {e!r}")
+    fulltext = FullTextIndex(os.path.join(cache_dir, "fulltext.sqlite3") if disk_cache else None)
+    memory_mb = ensure_int(_MEMORY_CACHE_MB or None, default=64, min_value=1, max_value=4096)
+    memory_cache = MemoryPageCache(max_bytes=memory_mb * 1024 * 1024)
+    docs_client = DocsRsClient(
+        user_agent=user_agent,
+        disk_cache=disk_cache,
+        memory_cache=memory_cache,
+        max_concurrency=concurrency,
+        fulltext=fulltext,
+    )
+    _debug(f"page cache: {disk_cache.path if disk_cache else 'memory only'} (memory budget {memory_mb} MB)")
+    return docs_client, cache_dir
+
+
+def _crawl_progress_printer() -> Callable[[CrawlReport], None]:
+    last = 0.0
+
+    def progress(report: CrawlReport) -> None:
+        nonlocal last
+        now = time.monotonic()
+        if now - last < 1 and report.done < report.total:
             return
-        global _STDIO_MODE
-        if _STDIO_MODE is None and transport.last_framing:
-            _STDIO_MODE = transport.last_framing
-            _debug(f"stdio mode: {_STDIO_MODE}")
-        _debug(f"<= {msg.get('method')}")
-        req = _as_request(msg)
-
-        if not req.method:
-            _error(req.id, -32600, "Invalid Request: missing method")
-            continue
+        last = now
+        sys.stderr.write(
+            f"\r{report.done}/{report.total} pages ({report.fetched} fetched, {report.cached} cached,"
+            f" {report.failed} failed) {report.pages_per_s:.1f} pages/s"
+        )
+        sys.stderr.flush()
+
+    return progress
+
 
+def _export_main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(
+        prog="komodo-docs-mcp export",
+        description="Write a crate version to a snapshot archive for offline serving (KOMODO_DOCS_MCP_SNAPSHOT).",
+    )
+    ap.add_argument("output", help="archive path, e.g. komodo_client-1.19.5.kdsnap")
+    ap.add_argument("--crate", default="komodo_client")
+    ap.add_argument("--version", default="latest")
+    ap.add_argument("--concurrency", type=int, default=None, help="pages fetched at once")
+    ap.add_argument("--rate", type=float, default=5.0, help="average requests per second; 0 for no limit")
+    args = ap.parse_args(argv)
+
+    docs_client, _ = _build_client()
+    try:
+        meta = export_snapshot(
+            docs_client,
+            args.output,
+            crate=args.crate,
+            version=args.version,
+            concurrency=args.concurrency,
+            rate_per_s=args.rate,
+            progress=_crawl_progress_printer(),
+        )
+    except KeyboardInterrupt:
+        sys.stderr.write("\ninterrupted; run again to resume from the cached pages\n")
+        return 130
+    except (DocsRsError, OSError) as e:
+        sys.stderr.write(f"\nerror: {e}\n")
+        return 1
+    size_kib = os.path.getsize(args.output) / 1024
+    sys.stderr.write(
+        f"\n{args.output}: {meta['crate']} {meta['version']}, {meta['symbols']} symbols, {meta['modules']} modules,"
+        f" {meta['itemPages']} item pages, {size_kib:.0f} KiB\n"
+    )
+    if meta["skippedItemPages"]:
+        sys.stderr.write(f"{meta['skippedItemPages']} item pages listed on module pages could not be fetched\n")
+    return 0
+
+
+def _prefetch_main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(
+        prog="komodo-docs-mcp prefetch",
+        description="Fetch every item page of a crate version into the page cache (KOMODO_DOCS_MCP_CACHE_DIR).",
+    )
+    ap.add_argument("--crate", default="komodo_client")
+    ap.add_argument("--version", default="latest")
+    ap.add_argument("--modules", action="store_true", help="also fetch every module page")
+    ap.add_argument("--concurrency", type=int, default=None, help="pages fetched at once")
+    ap.add_argument("--rate", type=float, default=5.0, help="average requests per second; 0 for no limit")
+    ap.add_argument("--json", action="store_true", help="print the final report as JSON")
+    args = ap.parse_args(argv)
+
+    docs_client, cache_dir = _build_client()
+    if cache_dir is None:
+        sys.stderr.write("warning: the disk cache is off, so the prefetched pages only last for this process\n")
+    try:
+        report = crawl_crate(
+            docs_client,
+            crate=args.crate,
+            version=args.version,
+            include_modules=args.modules,
+            concurrency=args.concurrency,
+            rate_per_s=args.rate,
+            progress=_crawl_progress_printer(),
+        )
+    except KeyboardInterrupt:
+        sys.stderr.write("\ninterrupted; run again to resume from the cached pages\n")
+        return 130
+    except DocsRsError as e:
+        sys.stderr.write(f"\nerror: {e}\n")
+        return 1
+    sys.stderr.write("\n")
+    sys.stdout.write(dumps(report.to_json(), indent=True) + "\n" if args.json else _format_crawl_markdown(report))
+    return 1 if report.failed else 0
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["prefetch"]:
+        sys.exit(_prefetch_main(argv[1:]))
+    if argv[:1] == ["export"]:
+        sys.exit(_export_main(argv[1:]))
+
+    try:
+        docs_client, cache_dir = _build_client(snapshot=_SNAPSHOT)
+    except (SnapshotError, OSError) as e:
+        sys.stderr.write(f"komodo-docs-mcp: cannot open snapshot: {e}\n")
+        sys.exit(1)
+    _debug(f"server start: version={__version__} pid={os.getpid()} cwd={os.getcwd()}")
+    _debug(f"python: {sys.executable} {sys.version.split()[0]}")
+    workers = ensure_int(_WORKERS or None, default=4, min_value=1, max_value=32)
+    stats_interval = ensure_int(_STATS_INTERVAL or None, default=300, min_value=0, max_value=86400)
+    # The summary only goes to the debug log, so there is nothing to do without one.
+    if not (_DEBUG or _LOG_FILE):
+        stats_interval = 0
+    profiler = CallProfiler.from_env(
+        os.environ, default_dir=os.path.join(cache_dir or tempfile.gettempdir(), "profiles"), log=_debug
+    )
+    if profiler is not None:
+        _debug(
+            f"profiling: tools={','.join(sorted(profiler.tools)) or 'all'} threshold={profiler.threshold_ms:g} ms"
+            f" memory={profiler.memory} dir={profiler.directory}"
+        )
+    serve(
+        _StdioJsonRpc(),
+        docs_client,
+        workers=workers,
+        stats_interval_s=stats_interval,
+        profiler=profiler,
+        warmup_modules=_warmup_modules(),
+    )
+
+
+def _progress_reporter(req: JsonRpcRequest, *, unit: str = "item pages") -> Optional[Callable[[int, int], None]]:
+    meta = req.params.get("_meta")
+    token = meta.get("progressToken") if isinstance(meta, dict) else None
+    if token is None:
+        return None
+
+    def report(done: int, total: int) -> None:
+        _notify(
+            "notifications/progress",
+            {"progressToken": token, "progress": done, "total": total, "message": f"{done}/{total} {unit}"},
+        )
+
+    return report
+
+
+def _call_tool(
+    req: JsonRpcRequest,
+    docs_client: DocsRsClient,
+    prefetch: Optional[Callable[[Callable[[], Any]], None]] = None,
+) -> None:
+    name = str(req.params.get("name") or "")
+    arguments = dict(req.params.get("arguments") or {})
+    if name in ("komodo_docs_get_module_docs", "komodo_docs.get_module_docs"):
+        result = _handle_tool_get_module_docs(
+            arguments, docs_client, progress=_progress_reporter(req), prefetch=prefetch
+        )
+        _result(req.id, result)
+    elif name == "komodo_docs_search":
+        _result(req.id, _handle_tool_search(arguments, docs_client))
+    elif name == "komodo_docs_get_item_docs":
+        _result(req.id, _handle_tool_get_item_docs(arguments, docs_client))
+    elif name == "komodo_docs_stats":
+        _result(req.id, _handle_tool_stats(arguments, docs_client))
+    elif name == "komodo_docs_prefetch":
+        _result(
+            req.id,
+            _handle_tool_prefetch(arguments, docs_client, progress=_progress_reporter(req, unit="pages")),
+        )
+    else:
+        _error(req.id, -32601, f"Unknown tool: {name}")
+
+
+def _run_tool_call(
+    req: JsonRpcRequest,
+    docs_client: DocsRsClient,
+    cancel: threading.Event,
+    inflight: dict[Any, threading.Event],
+    inflight_lock: threading.Condition,
+    prefetch: Optional[Callable[[Callable[[], Any]], None]] = None,
+    profiler: Optional[CallProfiler] = None,
+) -> None:
+    name = str(req.params.get("name") or "")
+    profiled = profiler.profile(name, req.id) if profiler is not None and profiler.wants(name) else None
+    metrics = docs_client.metrics
+    metrics.incr("tools.inFlight")
+    started = time.perf_counter()
+    outcome = "ok"
+    with call_stages() as stages:
         try:
-            if req.method == "initialize":
-                _result(
-                    req.id,
-                    {
-                        "protocolVersion": req.params.get("protocolVersion") or "2024-11-05",
-                        "serverInfo": {"name": "komodo-docs-mcp", "version": __version__},
-                        "capabilities": {
-                            "tools": {"listChanged": False},
-                            "resources": {"subscribe": False, "listChanged": False},
-                            "prompts": {"listChanged": False},
-                        },
-                        "instructions": "Use komodo_docs.get_module_docs to fetch and format docs.rs API docs.",
-                    },
-                )
-            elif req.method in ("initialized", "notifications/initialized"):
-                # Notification; no response.
-                _result(req.id, {})
-            elif req.method == "ping":
-                _result(req.id, {})
-            elif req.method == "tools/list":
-                _result(req.id, {"tools": [_tool_schema_get_module_docs(), _tool_schema_search(), _tool_schema_get_item_docs()]})
-            elif req.method == "tools/call":
-                name = str(req.params.get("name") or "")
-                arguments = dict(req.params.get("arguments") or {})
-                if name in ("komodo_docs_get_module_docs", "komodo_docs.get_module_docs"):
-                    _result(req.id, _handle_tool_get_module_docs(arguments, docs_client))
-                elif name == "komodo_docs_search":
-                    _result(req.id, _handle_tool_search(arguments, docs_client))
-                elif name == "komodo_docs_get_item_docs":
-                    _result(req.id, _handle_tool_get_item_docs(arguments, docs_client))
-                else:
-                    _error(req.id, -32601, f"Unknown tool: {name}")
-            elif req.method == "resources/list":
-                _result(req.id, {"resources": []})
-            elif req.method == "resources/templates/list":
-                _result(req.id, {"resourceTemplates": []})
-            elif req.method == "prompts/list":
-                _result(req.id, {"prompts": []})
-            elif req.method in ("resources/read", "prompts/get"):
-                _error(req.id, -32601, f"Method not implemented: {req.method}")
-            else:
-                # Ignore unknown notifications; error on requests.
-                _error(req.id, -32601, f"Method not found: {req.method}")
+            with cancellation_scope(cancel), profiled or contextlib.nullcontext():
+                check_cancelled()
+                _call_tool(req, docs_client, prefetch)
+        except DocsRsCancelled:
+            # The client abandoned the request; cancelled requests get no response.
+            outcome = "cancelled"
+            _debug(f"cancelled: id={req.id!r}")
         except DocsRsError as e:
+            outcome = "docsRsError"
             _result(req.id, {"content": [{"type": "text", "text": f"docs.rs error: {e}"}], "isError": True})
         except Exception as e:
+            outcome = "error"
             _error(req.id, -32603, "Internal error", data=str(e))
+        finally:
+            if req.id is not None:
+                with inflight_lock:
+                    inflight.pop(req.id, None)
+                    inflight_lock.notify_all()
+            ms = (time.perf_counter() - started) * 1000
+            metrics.incr("tools.inFlight", -1)
+            metrics.incr(f"tools.{outcome}")
+            metrics.record(f"tool.{name if name in _TOOL_NAMES else 'unknown'}", ms)
+            _debug(f"tools/call {name} id={req.id!r}: {outcome} in {ms:.0f} ms ({stages.summary() or 'no stages'})")
+
+
+def _run_prefetch(fn: Callable[[], Any], cancel: threading.Event) -> None:
+    try:
+        with cancellation_scope(cancel):
+            fn()
+    except DocsRsCancelled:
+        pass
+    except Exception as e:
+        _debug(f"prefetch failed: {e!r}")
+
+
+def serve(
+    transport: _StdioJsonRpc,
+    docs_client: DocsRsClient,
+    *,
+    workers: int = 4,
+    stats_interval_s: float = 0,
+    profiler: Optional[CallProfiler] = None,
+    warmup_modules: Optional[tuple[str, ...]] = None,
+) -> None:
+    global _STDIO_MODE
+    # tools/call runs on the pool and answers whenever it finishes; everything else is
+    # answered inline so pings and listings never queue behind a slow expansion.
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcp-tool")
+    inflight: dict[Any, threading.Event] = {}
+    inflight_lock = threading.Condition()
+    # Read-ahead for paged results runs one job at a time and is abandoned on exit.
+    prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcp-prefetch")
+    prefetch_cancel = threading.Event()
+
+    def prefetch(fn: Callable[[], Any]) -> None:
+        prefetch_pool.submit(_run_prefetch, fn, prefetch_cancel)
+
+    # Warmup starts with the session (initialize) so its pages load while the client lists
+    # tools; calls for the same pages join the in-progress fetch and parse.
+    warmup_pool: Optional[ThreadPoolExecutor] = None
+    warmup_cancel = threading.Event()
+
+    stats_stop = threading.Event()
+    if stats_interval_s > 0:
+        threading.Thread(
+            target=_log_stats_periodically,
+            args=(docs_client, stats_interval_s, stats_stop),
+            name="mcp-stats",
+            daemon=True,
+        ).start()
+
+    try:
+        while True:
+            try:
+                msg = transport.read_message()
+            except Exception as e:
+                _debug(f"read_message error: {e}")
+                return
+            if msg is None:
+                return
+            if _STDIO_MODE is None and transport.last_framing:
+                _STDIO_MODE = transport.last_framing
+                _debug(f"stdio mode: {_STDIO_MODE}")
+            _debug(f"<= {msg.get('method')}")
+            req = _as_request(msg)
+
+            if not req.method:
+                _error(req.id, -32600, "Invalid Request: missing method")
+                continue
+
+            if req.method == "tools/call":
+                cancel = threading.Event()
+                if req.id is not None:
+                    with inflight_lock:
+                        inflight[req.id] = cancel
+                pool.submit(_run_tool_call, req, docs_client, cancel, inflight, inflight_lock, prefetch, profiler)
+                continue
+
+            if warmup_modules is not None and warmup_pool is None and req.method in (
+                "initialize",
+                "initialized",
+                "notifications/initialized",
+            ):
+                jobs = _warmup_jobs(docs_client, warmup_modules)
+                warmup_pool = ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="mcp-warmup")
+                for job in jobs:
+                    warmup_pool.submit(_run_prefetch, job, warmup_cancel)
+
+            if req.method == "notifications/cancelled":
+                with inflight_lock:
+                    event = inflight.get(req.params.get("requestId"))
+                if event is not None:
+                    event.set()
+                continue
+
+            _handle_request(req)
+    finally:
+        # Accepted calls get a moment to finish and answer; whatever is still running
+        # then (e.g. a prefetch crawl) is cancelled so the process can exit.
+        with inflight_lock:
+            inflight_lock.wait_for(lambda: not inflight, timeout=_EXIT_GRACE_S)
+            for event in inflight.values():
+                event.set()
+        pool.shutdown(wait=True)
+        prefetch_cancel.set()
+        prefetch_pool.shutdown(wait=True)
+        if warmup_pool is not None:
+            warmup_cancel.set()
+            warmup_pool.shutdown(wait=True)
+        if stats_interval_s > 0:
+            stats_stop.set()
+            _debug(_stats_summary_line(docs_client))
+
+
+def _handle_request(req: JsonRpcRequest) -> None:
+    try:
+        if req.method == "initialize":
+            _result(
+                req.id,
+                {
+                    "protocolVersion": req.params.get("protocolVersion") or "2024-11-05",
+                    "serverInfo": {"name": "komodo-docs-mcp", "version": __version__},
+                    "capabilities": {
+                        "tools": {"listChanged": False},
+                        "resources": {"subscribe": False, "listChanged": False},
+                        "prompts": {"listChanged": False},
+                    },
+                    "instructions": "Use komodo_docs.get_module_docs to fetch and format docs.rs API docs.",
+                },
+            )
+        elif req.method in ("initialized", "notifications/initialized"):
+            # Notification; no response.
+            _result(req.id, {})
+        elif req.method == "ping":
+            _result(req.id, {})
+        elif req.method == "tools/list":
+            _result(
+                req.id,
+                {
+                    "tools": [
+                        _tool_schema_get_module_docs(),
+                        _tool_schema_search(),
+                        _tool_schema_get_item_docs(),
+                        _tool_schema_stats(),
+                        _tool_schema_prefetch(),
+                    ]
+                },
+            )
+        elif req.method == "resources/list":
+            _result(req.id, {"resources": []})
+        elif req.method == "resources/templates/list":
+            _result(req.id, {"resourceTemplates": []})
+        elif req.method == "prompts/list":
+            _result(req.id, {"prompts": []})
+        elif req.method in ("resources/read", "prompts/get"):
+            _error(req.id, -32601, f"Method not implemented: {req.method}")
+        else:
+            # Ignore unknown notifications; error on requests.
+            _error(req.id, -32601, f"Method not found: {req.method}")
+    except Exception as e:
+        _error(req.id, -32603, "Internal error", data=str(e))
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import urllib.parse
+import zlib
+from typing import Any, Callable, Iterator, Optional
+
+from . import __version__
+from .crawler import CrawlReport, RateLimiter, module_paths, crawl_crate, crawl_item_pages
+from .docsrs import (
+    DocItem,
+    DocSection,
+    DocsRsClient,
+    DocsRsError,
+    ModuleDocs,
+    normalize_module_path,
+)
+from .fulltext import FullTextIndex
+from .index import SearchIndex
+from .jsonio import dumps_bytes
+from .symbols import SymbolTable
+
+# Layout (little endian):
+#   header   MAGIC, u32 format version, u32 record count, u64 index offset, u64 keys offset
+#   records  zlib-compressed JSON, back to back
+#   index    one entry per record, sorted by key: u64 key offset, u32 key length, u64 record offset, u32 record length
+#   keys     UTF-8 keys, back to back
+MAGIC = b"KDMCPSNP"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIQQ")
+_ENTRY = struct.Struct("<QIQI")
+
+
+class SnapshotError(DocsRsError):
+    pass
+
+
+def write_snapshot(path: str, records: dict[str, Any]) -> None:
+    """Writes `records` (key -> JSON-serializable value) as an archive; the file is replaced atomically."""
+    keys = sorted(records)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(b"\0" * _HEADER.size)
+            offsets: list[tuple[int, int]] = []
+            for key in keys:
+                blob = zlib.compress(dumps_bytes(records[key]), 6)
+                offsets.append((fp.tell(), len(blob)))
+                fp.write(blob)
+            index_offset = fp.tell()
+            keys_offset = index_offset + _ENTRY.size * len(keys)
+            encoded = [key.encode("utf-8") for key in keys]
+            at = keys_offset
+            for raw, (offset, length) in zip(encoded, offsets):
+                fp.write(_ENTRY.pack(at, len(raw), offset, length))
+                at += len(raw)
+            for raw in encoded:
+                fp.write(raw)
+            fp.seek(0)
+            fp.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(keys), index_offset, keys_offset))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class SnapshotArchive:
+    """A snapshot archive opened with mmap; records are looked up and decoded on access only."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fp:
+            try:
+                self._mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # empty file
+                raise SnapshotError(f"{path} is not a snapshot archive") from e
+        try:
+            if len(self._mm) < _HEADER.size:
+                raise SnapshotError(f"{path} is not a snapshot archive")
+            magic, fmt, self._count, self._index_offset, _ = _HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise SnapshotError(f"{path} is not a snapshot archive")
+            if fmt != FORMAT_VERSION:
+                raise SnapshotError(f"{path} has snapshot format {fmt}; this version reads format {FORMAT_VERSION}")
+            if self._index_offset + self._count * _ENTRY.size > len(self._mm):
+                raise SnapshotError(f"{path} is truncated or corrupt")
+            meta = self.get("meta") or {}
+            if not isinstance(meta, dict):
+                raise SnapshotError(f"{path} is corrupt (record 'meta')")
+            self.meta: dict[str, Any] = meta
+        except BaseException:
+            self._mm.close()
+            raise
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def _key(self, i: int) -> bytes:
+        key_offset, key_length, _, _ = _ENTRY.unpack_from(self._mm, self._index_offset + i * _ENTRY.size)
+        return self._mm[key_offset : key_offset + key_length]
+
+    def keys(self, prefix: str = "") -> Iterator[str]:
+        raw = prefix.encode("utf-8")
+        for i in range(self._find(raw), self._count):
+            key = self._key(i)
+            if not key.startswith(raw):
+                break
+            yield key.decode("utf-8")
+
+    def _find(self, key: bytes) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = key.encode("utf-8")
+        i = self._find(raw)
+        if i >= self._count or self._key(i) != raw:
+            return None
+        _, _, offset, length = _ENTRY.unpack_from(self._mm, self._index_offset + i * _ENTRY.size)
+        if offset + length > len(self._mm):
+            raise SnapshotError(f"{self.path} is truncated or corrupt (record {key!r})")
+        try:
+            return json.loads(zlib.decompress(self._mm[offset : offset + length]))
+        except (zlib.error, ValueError) as e:  # ValueError covers JSON and UTF-8 decode errors
+            raise SnapshotError(f"{self.path} is corrupt (record {key!r}): {e}") from e
+
+
+def _module_to_json(module: ModuleDocs) -> dict[str, Any]:
+    return {
+        "crate": module.crate,
+        "version": module.version,
+        "modulePath": module.module_path,
+        "pageUrl": module.page_url,
+        "sections": [
+            {
+                "id": section.id,
+                "title": section.title,
+                "items": [[it.kind, it.name, it.href, it.summary] for it in section.items],
+            }
+            for section in module.sections
+        ],
+    }
+
+
+def _module_from_json(data: dict[str, Any]) -> ModuleDocs:
+    return ModuleDocs(
+        crate=data["crate"],
+        version=data["version"],
+        module_path=data["modulePath"],
+        page_url=data["pageUrl"],
+        sections=[
+            DocSection(
+                id=section["id"],
+                title=section["title"],
+                items=[DocItem(kind=k, name=n, href=h, summary=s) for k, n, h, s in section["items"]],
+            )
+            for section in data["sections"]
+        ],
+    )
+
+
+def _item_key(crate_root: str, base_url: str, href: str) -> Optional[str]:
+    url = urllib.parse.urljoin(base_url, href).split("#", 1)[0]
+    return "item " + url[len(crate_root) :] if url.startswith(crate_root) else None
+
+
+def export_snapshot(
+    client: DocsRsClient,
+    path: str,
+    *,
+    crate: str,
+    version: str = "latest",
+    concurrency: Optional[int] = None,
+    rate_per_s: float = 0.0,
+    progress: Optional[Callable[[CrawlReport], None]] = None,
+) -> dict[str, Any]:
+    """Crawls a crate version (module pages included) and writes it to a snapshot archive at `path`.
+
+    The crawl goes through the client's caches, so pages fetched before (or by an
+    interrupted export) are not requested again. Returns the archive's metadata.
+    """
+    limiter = RateLimiter(rate_per_s)
+    # Parsed pages are kept as they are crawled: the page cache may not hold them all.
+    parsed: dict[str, Any] = {}
+    report = crawl_crate(
+        client,
+        crate=crate,
+        version=version,
+        include_modules=True,
+        concurrency=concurrency,
+        progress=progress,
+        limiter=limiter,
+        results=parsed,
+    )
+    if report.failed:
+        raise SnapshotError(
+            f"{report.failed} of {report.total} pages could not be fetched (first: {report.errors[0]}); "
+            "run the export again to retry them"
+        )
+    page_version, table = client.parse_all_items(crate=crate, version=report.version)
+    crate_root = f"https://docs.rs/{crate}/{page_version}/{crate}/"
+    records: dict[str, Any] = {"all": table.to_columns()}
+
+    # Every item page a tool can reach: all.html entries and the items listed on module pages.
+    pages: dict[str, tuple[str, DocItem]] = {}
+    extra: list[tuple[str, DocItem]] = []
+    for row in range(len(table)):
+        item = DocItem(kind=table.kind(row), name=table.names[row], href=table.href(row))
+        pages["item " + item.href] = (crate_root, item)
+    for module_path in module_paths(table.modules):
+        full_path = f"{crate}::{module_path}" if module_path else crate
+        module = parsed[client.module_url(crate, page_version, full_path)]
+        records["module " + normalize_module_path(crate, full_path)] = _module_to_json(module)
+        base_url = module.page_url.rsplit("/", 1)[0] + "/"
+        for section in module.sections:
+            for it in section.items:
+                key = _item_key(crate_root, base_url, it.href)
+                if key is not None and not it.href.endswith("/index.html") and key not in pages:
+                    pages[key] = (base_url, it)
+                    extra.append((base_url, it))
+    # Pages only listed on module pages are crawled too, against the same rate limit; one that
+    # fails (e.g. a re-export whose page lives in another crate) is left out of the archive.
+    extra_report = crawl_item_pages(
+        client,
+        extra,
+        crate=crate,
+        version=page_version,
+        concurrency=concurrency,
+        progress=progress,
+        limiter=limiter,
+        results=parsed,
+    )
+    for key, (base_url, item) in pages.items():
+        detailed = parsed.get(urllib.parse.urljoin(base_url, item.href))
+        if detailed is not None:
+            records[key] = {"signature": detailed.signature, "docs": detailed.docs}
+
+    records["fulltext"] = client.fulltext.export_docs(crate=crate, version=page_version)
+    meta = {
+        "format": FORMAT_VERSION,
+        "crate": crate,
+        "version": page_version,
+        "createdAt": int(time.time()),
+        "generator": f"komodo-docs-mcp/{__version__}",
+        "symbols": len(table),
+        "modules": sum(1 for key in records if key.startswith("module ")),
+        "itemPages": sum(1 for key in records if key.startswith("item ")),
+        "skippedItemPages": extra_report.failed,
+    }
+    records["meta"] = meta
+    write_snapshot(path, records)
+    return meta
+
+
+class SnapshotClient(DocsRsClient):
+    """Answers from a snapshot archive only: no page is ever requested from docs.rs.
+
+    Module and item records are decoded when a call needs them; the symbol table,
+    search index and full-text index are built from their records on first use.
+    """
+
+    def __init__(self, archive: SnapshotArchive, **kwargs: Any):
+        super().__init__(fulltext=FullTextIndex(loader=lambda: archive.get("fulltext") or ()), **kwargs)
+        self.archive = archive
+        self.crate: str = archive.meta.get("crate", "")
+        self.version: str = archive.meta.get("version", "")
+        self._crate_root = f"https://docs.rs/{self.crate}/{self.version}/{self.crate}/"
+        self._index: Optional[SearchIndex] = None
+        self._index_lock = threading.Lock()
+
+    def stats(self) -> dict[str, Any]:
+        return {**super().stats(), "snapshot": {"path": self.archive.path, "records": len(self.archive), **self.archive.meta}}
+
+    def _fetch_uncached(self, url: str, *, ttl_s: Optional[int], until: Any = None) -> str:  # type: ignore[override]
+        raise SnapshotError(f"{url} is not in the snapshot {self.archive.path} (offline mode)")
+
+    def resolve_version(self, crate: str, version: str) -> str:
+        return self._check(crate, version)
+
+    def _check(self, crate: str, version: str) -> str:
+        if crate != self.crate or version not in ("latest", self.version):
+            raise SnapshotError(
+                f"the snapshot {self.archive.path} holds {self.crate} {self.version} only (offline mode)"
+            )
+        return self.version
+
+    def all_items_index(self, *, crate: str, version: str) -> tuple[str, SearchIndex]:
+        page_version = self._check(crate, version)
+        with self._index_lock:
+            if self._index is None:
+                columns = self.archive.get("all")
+                if not isinstance(columns, dict):
+                    raise SnapshotError(f"{self.archive.path} is corrupt (record 'all')")
+                with self.metrics.timed("parse.allItems", stage="parse"):
+                    try:
+                        table = SymbolTable.from_columns(columns)
+                    except (KeyError, TypeError, ValueError, AttributeError) as e:
+                        raise SnapshotError(f"{self.archive.path} is corrupt (record 'all'): {e!r}") from e
+                    self._index = SearchIndex(table)
+            return page_version, self._index
+
+    def parse_module(self, *, crate: str, version: str, module_path: str) -> ModuleDocs:
+        self._check(crate, version)
+        with self.metrics.timed("parse.module", stage="parse"):
+            data = self.archive.get("module " + normalize_module_path(crate, module_path))
+            if data is None:
+                raise SnapshotError(f"module {module_path} is not in the snapshot {self.archive.path} (offline mode)")
+            return _module_from_json(data)
+
+    def parse_item_page(self, *, base_url: str, item: DocItem) -> DocItem:
+        with self.metrics.timed("parse.item", stage="parse"):
+            key = _item_key(self._crate_root, base_url, item.href)
+            data = self.archive.get(key) if key is not None else None
+        if data is None:
+            # Listed but not archived (e.g. a re-export from another crate): keep the listing entry.
+            return item
+        return DocItem(
+            kind=item.kind,
+            name=item.name,
+            href=item.href,
+            summary=item.summary,
+            signature=data["signature"],
+            docs=data["docs"],
+        )
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Union, overload
+
+
+@dataclass(frozen=True)
+class AllItem:
+    __slots__ = ("kind", "item_path", "href")
+
+    kind: str
+    item_path: str
+    href: str
+
+
+_new = object.__new__
+_set_kind = AllItem.kind.__set__  # type: ignore[attr-defined]
+_set_item_path = AllItem.item_path.__set__  # type: ignore[attr-defined]
+_set_href = AllItem.href.__set__  # type: ignore[attr-defined]
+
+
+def _make_item(kind: str, item_path: str, href: str) -> AllItem:
+    # Fills the slots directly: the frozen dataclass __init__ costs about twice as much,
+    # which adds up when every search result is rebuilt from the table.
+    item = _new(AllItem)
+    _set_kind(item, kind)
+    _set_item_path(item, item_path)
+    _set_href(item, href)
+    return item
+
+
+class SymbolTable:
+    """The all-items symbols of one crate version, stored column-wise.
+
+    Kinds and module paths are stored once and referenced by integer ids, leaf
+    names are interned, and hrefs are rebuilt from module, kind tag and name
+    (`api/read/struct.GetStack.html`); only an href that does not follow that
+    pattern is stored. Rows come back as `AllItem`s, in the original order.
+    """
+
+    __slots__ = ("kinds", "modules", "names", "_folders", "_kind_ids", "_module_ids", "_hrefs")
+
+    def __init__(self, items: Iterable[AllItem] = ()):
+        self.kinds: list[tuple[str, str]] = []  # (kind, href tag such as "struct")
+        self.modules: list[str] = []
+        self.names: list[str] = []
+        self._kind_ids = array("H")
+        self._module_ids = array("I")
+        self._hrefs: dict[int, str] = {}
+
+        kind_ids: dict[tuple[str, str], int] = {}
+        module_ids: dict[str, int] = {}
+        for it in items:
+            module, _, name = it.item_path.rpartition("::")
+            folder, _, file = it.href.rpartition("/")
+            suffix = f".{name}.html"
+            tag = ""
+            if folder == module.replace("::", "/") and file.endswith(suffix) and len(file) > len(suffix):
+                tag = file[: -len(suffix)]
+            else:
+                self._hrefs[len(self.names)] = it.href
+
+            kind_id = kind_ids.get((it.kind, tag))
+            if kind_id is None:
+                kind_id = kind_ids[(it.kind, tag)] = len(self.kinds)
+                self.kinds.append((sys.intern(it.kind), sys.intern(tag)))
+            module_id = module_ids.get(module)
+            if module_id is None:
+                module_id = module_ids[module] = len(self.modules)
+                self.modules.append(sys.intern(module))
+            self._kind_ids.append(kind_id)
+            self._module_ids.append(module_id)
+            self.names.append(sys.intern(name))
+        self._folders = [m.replace("::", "/") + "/" if m else "" for m in self.modules]
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, Any]) -> SymbolTable:
+        """Rebuilds a table from `to_columns` output without re-deriving anything."""
+        table = cls()
+        table.kinds = [(sys.intern(kind), sys.intern(tag)) for kind, tag in columns["kinds"]]
+        table.modules = [sys.intern(m) for m in columns["modules"]]
+        table.names = [sys.intern(n) for n in columns["names"]]
+        table._kind_ids = array("H", columns["kindIds"])
+        table._module_ids = array("I", columns["moduleIds"])
+        table._hrefs = {int(row): href for row, href in columns["hrefs"].items()}
+        table._folders = [m.replace("::", "/") + "/" if m else "" for m in table.modules]
+        return table
+
+    def to_columns(self) -> dict[str, Any]:
+        return {
+            "kinds": [list(k) for k in self.kinds],
+            "modules": self.modules,
+            "names": self.names,
+            "kindIds": self._kind_ids.tolist(),
+            "moduleIds": self._module_ids.tolist(),
+            "hrefs": {str(row): href for row, href in self._hrefs.items()},
+        }
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @overload
+    def __getitem__(self, row: int) -> AllItem: ...
+
+    @overload
+    def __getitem__(self, row: slice) -> list[AllItem]: ...
+
+    def __getitem__(self, row: Union[int, slice]) -> Union[AllItem, list[AllItem]]:
+        if isinstance(row, slice):
+            return [self.row(r) for r in range(*row.indices(len(self.names)))]
+        if row < 0:
+            row += len(self.names)
+        return self.row(row)
+
+    def __iter__(self) -> Iterator[AllItem]:
+        return (self.row(row) for row in range(len(self.names)))
+
+    def row(self, row: int) -> AllItem:
+        """The item at non-negative index `row`."""
+        kind, tag = self.kinds[self._kind_ids[row]]
+        module_id = self._module_ids[row]
+        module = self.modules[module_id]
+        name = self.names[row]
+        href = self._hrefs.get(row) if self._hrefs else None
+        if href is None:
+            href = f"{self._folders[module_id]}{tag}.{name}.html"
+        return _make_item(kind, f"{module}::{name}" if module else name, href)
+
+    def kind(self, row: int) -> str:
+        return self.kinds[self._kind_ids[row]][0]
+
+    def module_id(self, row: int) -> int:
+        return self._module_ids[row]
+
+    def item_path(self, row: int) -> str:
+        module = self.modules[self._module_ids[row]]
+        return f"{module}::{self.names[row]}" if module else self.names[row]
+
+    def href(self, row: int) -> str:
+        href = self._hrefs.get(row)
+        if href is not None:
+            return href
+        return f"{self._folders[self._module_ids[row]]}{self.kinds[self._kind_ids[row]][1]}.{self.names[row]}.html"
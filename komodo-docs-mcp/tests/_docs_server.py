@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class LocalDocsServer:
+    """Serves canned pages over plain HTTP on 127.0.0.1 and records every request."""
+
+    def __init__(self, pages: dict[str, str], *, etag: Optional[str] = '"v1"', compress: bool = False, delay_s: float = 0.0):
+        self.pages = pages
+        self.delay_s = delay_s
+        self.etag = etag
+        self.compress = compress
+        self.connections: set[int] = set()
+        self.requests: list[tuple[str, dict[str, str]]] = []
+        self.statuses: list[int] = []
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                owner.requests.append((self.path, dict(self.headers.items())))
+                owner.connections.add(id(self.connection))
+                if owner.delay_s:
+                    time.sleep(owner.delay_s)
+                body = owner.pages.get(self.path)
+                if body is None:
+                    self._send(404, b"")
+                    return
+                if owner.etag and self.headers.get("If-None-Match") == owner.etag:
+                    self._send(304, b"")
+                    return
+                raw = body.encode("utf-8")
+                gzipped = owner.compress and "gzip" in (self.headers.get("Accept-Encoding") or "")
+                self._send(200, gzip.compress(raw) if gzipped else raw, gzipped=gzipped)
+
+            def _send(self, status: int, body: bytes, *, gzipped: bool = False) -> None:
+                owner.statuses.append(status)
+                self.send_response(status)
+                if owner.etag:
+                    self.send_header("ETag", owner.etag)
+                if gzipped:
+                    self.send_header("Content-Encoding", "gzip")
+                if status != 304:
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if status != 304:
+                    self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def __enter__(self) -> "LocalDocsServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,25 @@
+import json
+import unittest
+
+from benchmarks import run
+
+
+class BenchmarkSuiteTests(unittest.TestCase):
+    def test_cases_run_offline_and_results_are_json(self) -> None:
+        results = run.run(names=["parse_item_page[struct_list_stack_services]", "tools/call search"], repeat=1, min_time_s=0)
+        decoded = json.loads(json.dumps(results))
+        self.assertEqual(decoded["schema"], run.SCHEMA_VERSION)
+        for r in decoded["results"].values():
+            self.assertGreater(r["medianMs"], 0)
+            self.assertGreaterEqual(r["peakKiB"], 0)
+
+    def test_compare_flags_only_regressions_past_threshold(self) -> None:
+        baseline = {"results": {"a": {"medianMs": 10.0, "peakKiB": 100.0}, "b": {"medianMs": 10.0, "peakKiB": 100.0}}}
+        current = {"results": {"a": {"medianMs": 11.0, "peakKiB": 100.0}, "b": {"medianMs": 10.0, "peakKiB": 150.0}}}
+        regressions = run.compare(current, baseline, threshold=0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("b: peakKiB"))
+
+
+if __name__ == "__main__":
+    unittest.main()
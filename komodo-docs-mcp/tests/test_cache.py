@@ -0,0 +1,88 @@
+import tempfile
+import unittest
+
+from _docs_server import LocalDocsServer
+
+from komodo_docs_mcp.cache import CachedPage, DiskPageCache, MemoryPageCache
+from komodo_docs_mcp.docsrs import DocsRsClient
+
+
+class DiskPageCacheTests(unittest.TestCase):
+    def test_new_process_reuses_disk_cache_without_network(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp, LocalDocsServer({"/all.html": "<p>all</p>"}) as server:
+            url = server.url("/all.html")
+            first = DocsRsClient(user_agent="test", disk_cache=DiskPageCache(tmp))
+            self.assertEqual(first.fetch_text(url), "<p>all</p>")
+
+            second = DocsRsClient(user_agent="test", disk_cache=DiskPageCache(tmp))
+            self.assertEqual(second.fetch_text(url), "<p>all</p>")
+            self.assertEqual(len(server.requests), 1)
+
+    def test_expired_entry_is_revalidated_with_etag(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp, LocalDocsServer({"/all.html": "<p>all</p>"}) as server:
+            url = server.url("/all.html")
+            DocsRsClient(user_agent="test", disk_cache=DiskPageCache(tmp)).fetch_text(url)
+
+            client = DocsRsClient(user_agent="test", disk_cache=DiskPageCache(tmp))
+            self.assertEqual(client.fetch_text(url, ttl_s=0), "<p>all</p>")
+            self.assertEqual(server.statuses, [200, 304])
+            self.assertEqual(server.requests[1][1].get("If-None-Match"), '"v1"')
+
+            # The 304 refreshed the timestamp, so a normal TTL read stays local.
+            self.assertEqual(client.fetch_text(url), "<p>all</p>")
+            self.assertEqual(len(server.requests), 2)
+
+
+class MemoryPageCacheTests(unittest.TestCase):
+    def test_evicts_least_recently_used_pages_over_budget(self) -> None:
+        cache = MemoryPageCache(max_bytes=900)
+        for name in ("a", "b", "c"):
+            cache.put(CachedPage(url=name, text=name * 1000, fetched_at=0.0))
+        # Each compressed entry costs ~280 bytes, so all three fit.
+        self.assertIsNotNone(cache.get("a", now=0.0, ttl_s=None))
+        cache.put(CachedPage(url="d", text="d" * 1000, fetched_at=0.0))
+
+        self.assertIsNone(cache.peek("b"))
+        self.assertEqual(cache.peek("a").text, "a" * 1000)  # type: ignore[union-attr]
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertLessEqual(stats["sizeBytes"], 900)
+
+    def test_expired_entries_count_as_misses_but_keep_validators(self) -> None:
+        cache = MemoryPageCache()
+        cache.put(CachedPage(url="u", text="body", fetched_at=0.0, etag='"x"'))
+        self.assertIsNone(cache.get("u", now=1000.0, ttl_s=300))
+        self.assertEqual(cache.peek("u").etag, '"x"')  # type: ignore[union-attr]
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+
+class ParsedCacheTests(unittest.TestCase):
+    _ALL_HTML = (
+        '<span class="version">1.2.3</span>'
+        '<h3 id="structs">Structs</h3>'
+        '<ul class="all-items"><li><a href="api/read/struct.Foo.html">api::read::Foo</a></li></ul>'
+    )
+
+    def test_parse_all_items_reuses_parsed_result_while_page_is_fresh(self) -> None:
+        path = "/komodo_client/1.2.3/komodo_client/all.html"
+        with LocalDocsServer({path: self._ALL_HTML}) as server:
+            client = DocsRsClient(user_agent="test")
+            client.all_items_url = lambda crate, version: server.url(path)  # type: ignore[method-assign]
+
+            first = client.parse_all_items(crate="komodo_client", version="1.2.3")
+            second = client.parse_all_items(crate="komodo_client", version="1.2.3")
+            self.assertIs(first[1], second[1])
+            self.assertEqual(client.stats()["parsed"]["hits"], 1)
+            self.assertEqual(len(server.requests), 1)
+
+    def test_changed_page_drops_parsed_result(self) -> None:
+        memory = MemoryPageCache()
+        client = DocsRsClient(user_agent="test", memory_cache=memory)
+        client._parsed.put(("c", "v", "u"), 1, ["parsed"])
+        memory.put(CachedPage(url="u", text="x" * 100, fetched_at=0.0))
+        memory.put(CachedPage(url="u", text="changed", fetched_at=0.0))
+        self.assertIsNone(client._parsed.get(("c", "v", "u"), 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+import unittest
+
+from komodo_docs_mcp import server
+from komodo_docs_mcp.cache import CachedPage
+from komodo_docs_mcp.crawler import RateLimiter, module_paths, crawl_crate
+from komodo_docs_mcp.docsrs import DocsRsClient, DocsRsError
+
+_PATHS = ["api::read::GetStack", "api::read::ListStacks", "api::write::CreateStack", "entities::stack::Stack"]
+
+
+class _CrateClient(DocsRsClient):
+    _ALL_HTML = (
+        '<span class="version">1.2.3</span><h3 id="structs">Structs</h3><ul class="all-items">'
+        + "".join(
+            f'<li><a href="{p.rsplit("::", 1)[0].replace("::", "/")}/struct.{p.rsplit("::", 1)[1]}.html">{p}</a></li>'
+            for p in _PATHS
+        )
+        + "</ul>"
+    )
+
+    def __init__(self, *, failing: str = "") -> None:
+        super().__init__(user_agent="test", max_concurrency=3)
+        self.failing = failing
+        self.requests: list[str] = []
+        self._lock = threading.Lock()
+
+    def _fetch_uncached(self, url: str, *, ttl_s, until=None) -> str:  # type: ignore[override]
+        with self._lock:
+            self.requests.append(url)
+        if self.failing and self.failing in url:
+            raise DocsRsError(f"docs.rs returned HTTP 500 for {url}")
+        if url.endswith("/all.html"):
+            text = self._ALL_HTML
+        elif url.endswith("/index.html"):
+            text = '<span class="version">1.2.3</span>'
+        else:
+            name = url.rsplit("/", 1)[1][len("struct.") : -len(".html")]
+            text = f'<pre class="rust item-decl">pub struct {name};</pre><div class="docblock"><p>{name} docs.</p></div>'
+        self._cache.put(CachedPage(url=url, text=text, fetched_at=time.time()))
+        return text
+
+
+class CrawlerTests(unittest.TestCase):
+    def test_crawls_every_item_page_and_resumes_from_the_cache(self) -> None:
+        client = _CrateClient()
+        reports = []
+        report = crawl_crate(client, crate="komodo_client", version="1.2.3", progress=reports.append)
+        self.assertEqual((report.total, report.done, report.fetched, report.cached, report.failed), (4, 4, 4, 0, 0))
+        self.assertEqual([r.done for r in reports], [1, 2, 3, 4])
+        self.assertEqual(len(client.fulltext), 4)
+        self.assertEqual(client.fulltext.search("GetStack", crate="komodo_client")[0].item_path, "api::read::GetStack")
+
+        client.requests.clear()
+        again = crawl_crate(client, crate="komodo_client", version="1.2.3")
+        self.assertEqual((again.fetched, again.cached), (0, 4))
+        self.assertEqual(client.requests, [])
+
+    def test_failed_pages_are_reported_and_the_crawl_goes_on(self) -> None:
+        report = crawl_crate(_CrateClient(failing="CreateStack"), crate="komodo_client", version="1.2.3")
+        self.assertEqual((report.done, report.fetched, report.failed), (4, 3, 1))
+        self.assertIn("CreateStack", report.errors[0])
+
+    def test_module_pages_include_parent_modules(self) -> None:
+        self.assertEqual(module_paths(["api::read", "entities::stack"]), ["", "api", "entities", "api::read", "entities::stack"])
+        client = _CrateClient()
+        report = crawl_crate(client, crate="komodo_client", version="1.2.3", include_modules=True)
+        self.assertEqual(report.total, 4 + 6)
+        self.assertIn("https://docs.rs/komodo_client/1.2.3/komodo_client/api/index.html", client.requests)
+
+    def test_rate_limiter_spaces_requests(self) -> None:
+        limiter = RateLimiter(50)
+        started = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+    def test_prefetch_tool_reports_json(self) -> None:
+        result = server._handle_tool_prefetch(
+            {"version": "1.2.3", "maxRequestsPerSecond": 0, "format": "json"}, _CrateClient()
+        )
+        payload = json.loads(result["content"][0]["text"])
+        self.assertEqual((payload["version"], payload["done"], payload["failed"]), ("1.2.3", 4, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
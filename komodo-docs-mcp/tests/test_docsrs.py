@@ -1,6 +1,22 @@
+import json
+import threading
+import time
 import unittest
 
-from komodo_docs_mcp.docsrs import DocsRsClient, module_docs_to_markdown, search_all_items
+from _docs_server import LocalDocsServer
+
+from komodo_docs_mcp.cache import CachedPage
+from komodo_docs_mcp.docsrs import (
+    DocItem,
+    DocsRsCancelled,
+    DocsRsClient,
+    cancellation_scope,
+    check_cancelled,
+    module_docs_to_json,
+    module_docs_to_markdown,
+    parse_item_html,
+    search_all_items,
+)
 
 
 class _FakeDocsRsClient(DocsRsClient):
@@ -14,7 +30,7 @@ class _FakeDocsRsClient(DocsRsClient):
         self._all_html = all_html
         return self
 
-    def fetch_text(self, url: str, *, ttl_s: int = 300) -> str:  # type: ignore[override]
+    def fetch_text(self, url: str, *, ttl_s: int = 300, until=None) -> str:  # type: ignore[override]
         if url.endswith("/komodo_client/api/read/index.html"):
             return self._module_html
         if url.endswith("/komodo_client/all.html"):
@@ -24,6 +40,28 @@ class _FakeDocsRsClient(DocsRsClient):
         raise AssertionError(f"unexpected url {url}")
 
 
+class _SlowItemsClient(DocsRsClient):
+    def __init__(self, module_html: str):
+        super().__init__(user_agent="test", max_concurrency=4)
+        self._module_html = module_html
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def fetch_text(self, url: str, *, ttl_s: int = 300, until=None) -> str:  # type: ignore[override]
+        if url.endswith("/index.html"):
+            return self._module_html
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Later items finish first, so ordering bugs would show up.
+        n = int(url.rsplit("Item", 1)[1].split(".")[0])
+        time.sleep(0.002 * (8 - n))
+        with self._lock:
+            self.in_flight -= 1
+        return f'<pre class="rust item-decl">pub struct Item{n};</pre>'
+
+
 class DocsRsParsingTests(unittest.TestCase):
     def test_parse_module_and_item(self) -> None:
         module_html = (
@@ -83,6 +121,26 @@ class DocsRsParsingTests(unittest.TestCase):
         self.assertIn("```rust", md)
         self.assertIn("pub struct Foo", md)
 
+    def test_item_docs_are_fetched_concurrently_in_stable_order(self) -> None:
+        module_html = (
+            '<h2 id="structs" class="section-header">Structs<a href="#structs" class="anchor">§</a></h2>'
+            '<dl class="item-table">'
+            + "".join(f'<dt><a class="struct" href="struct.Item{n}.html">Item{n}</a></dt>' for n in range(8))
+            + "</dl>"
+        )
+        client = _SlowItemsClient(module_html)
+        module = client.parse_module(crate="komodo_client", version="1.2.3", module_path="komodo_client::api::read")
+
+        payload = json.loads(module_docs_to_json(module, include_item_docs=True, max_items=6, client=client))
+        signatures = [it["signature"] for it in payload["sections"][0]["items"]]
+        self.assertEqual(signatures, [f"pub struct Item{n};" for n in range(6)] + [None, None])
+        self.assertGreater(client.max_in_flight, 1)
+        self.assertLessEqual(client.max_in_flight, 4)
+
+        md = module_docs_to_markdown(module, include_item_docs=True, max_items=6, client=client, concurrency=2)
+        self.assertLess(md.index("### Item0"), md.index("### Item5"))
+        self.assertIn("_Stopped after 6 items (maxItems)._", md)
+
     def test_all_items_search(self) -> None:
         all_html = (
             '<span class="version">1.2.3</span>'
@@ -99,5 +157,121 @@ class DocsRsParsingTests(unittest.TestCase):
         self.assertEqual(hits[0].item_path, "entities::stack::StackListItem")
 
 
+class VersionResolutionTests(unittest.TestCase):
+    _LATEST_PATH = "/komodo_client/latest/komodo_client/api/read/index.html"
+    _MODULE_HTML = (
+        '<span class="version">1.2.3</span>'
+        '<h2 id="structs" class="section-header">Structs<a href="#structs" class="anchor">§</a></h2>'
+        '<dl class="item-table"><dt><a class="struct" href="struct.Foo.html">Foo</a></dt></dl>'
+    )
+
+    def _client(self, server: LocalDocsServer) -> DocsRsClient:
+        client = DocsRsClient(user_agent="test")
+        client.module_url = lambda crate, version, module_path: server.url(  # type: ignore[method-assign]
+            f"/{crate}/{version}/{crate}/api/read/index.html"
+        )
+        return client
+
+    def test_latest_is_pinned_to_concrete_version(self) -> None:
+        with LocalDocsServer({self._LATEST_PATH: self._MODULE_HTML}) as server:
+            client = self._client(server)
+            first = client.parse_module(crate="komodo_client", version="latest", module_path="api::read")
+            self.assertIn("/komodo_client/1.2.3/", first.page_url)
+            self.assertEqual(client.resolve_version("komodo_client", "latest"), "1.2.3")
+
+            # The versioned page was seeded from the latest response and never expires.
+            second = client.parse_module(crate="komodo_client", version="latest", module_path="api::read")
+            self.assertIs(first, second)
+            self.assertEqual([path for path, _ in server.requests], [self._LATEST_PATH])
+
+    def test_expired_pointer_only_revalidates_latest_page(self) -> None:
+        with LocalDocsServer({self._LATEST_PATH: self._MODULE_HTML}) as server:
+            client = self._client(server)
+            client.parse_module(crate="komodo_client", version="latest", module_path="api::read")
+            client.latest_ttl_s = 0
+            self.assertEqual(client.resolve_version("komodo_client", "latest"), "latest")
+            module = client.parse_module(crate="komodo_client", version="latest", module_path="api::read")
+            self.assertEqual(module.version, "1.2.3")
+            self.assertEqual(server.statuses, [200, 304])
+
+
+class _BlockingClient(DocsRsClient):
+    """The first fetch blocks until released, then honours the caller's cancellation."""
+
+    def __init__(self, html: str) -> None:
+        super().__init__(user_agent="test")
+        self.html = html
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.fetches = 0
+
+    def _fetch_uncached(self, url: str, *, ttl_s, until=None) -> str:  # type: ignore[override]
+        self.fetches += 1
+        if self.fetches == 1:
+            self.entered.set()
+            self.release.wait(5)
+            check_cancelled()
+        self._cache.put(CachedPage(url=url, text=self.html, fetched_at=time.time()))
+        return self.html
+
+
+class SingleFlightCancellationTests(unittest.TestCase):
+    def test_cancelled_leader_does_not_fail_a_live_follower(self) -> None:
+        client = _BlockingClient(VersionResolutionTests._MODULE_HTML)
+        cancel = threading.Event()
+        outcome: dict[str, object] = {}
+
+        def call(name: str, event: threading.Event) -> None:
+            try:
+                with cancellation_scope(event):
+                    outcome[name] = client.parse_module(crate="komodo_client", version="1.2.3", module_path="api::read")
+            except DocsRsCancelled as e:
+                outcome[name] = e
+
+        leader = threading.Thread(target=call, args=("leader", cancel))
+        leader.start()
+        self.assertTrue(client.entered.wait(5))
+        follower = threading.Thread(target=call, args=("follower", threading.Event()))
+        follower.start()
+        deadline = time.monotonic() + 5
+        while client.stats()["inflight"]["coalesced"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        cancel.set()
+        client.release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertIsInstance(outcome["leader"], DocsRsCancelled)
+        self.assertEqual([it.name for it in outcome["follower"].sections[0].items], ["Foo"])
+        self.assertEqual(client.fetches, 2)
+
+
+class ItemStreamingTests(unittest.TestCase):
+    _PATH = "/komodo_client/1.2.3/komodo_client/api/read/struct.Foo.html"
+    # The trait-impl listing after the main docblock is what streaming avoids downloading.
+    _PAGE = (
+        '<pre class="rust item-decl">pub struct Foo { pub a: i32 }</pre>'
+        '<details class="toggle top-doc" open><div class="docblock"><p>Foo docs.</p></div></details>'
+        + "".join(f'<section id="impl-{i}"><div class="docblock"><p>impl {i:08x} docs</p></div></section>' for i in range(8000))
+    )
+
+    def test_item_page_download_stops_after_main_docblock(self) -> None:
+        item = DocItem(kind="struct", name="Foo", href="struct.Foo.html")
+        with LocalDocsServer({self._PATH: self._PAGE}, compress=True) as server:
+            client = DocsRsClient(user_agent="test")
+            detailed = client.parse_item_page(base_url=server.url(self._PATH), item=item)
+            self.assertEqual(detailed, parse_item_html(self._PAGE, item=item))
+
+            stats = client.stats()["http"]
+            self.assertEqual(stats["streamsStopped"], 1)
+            self.assertGreater(stats["bytesSkipped"], 0)
+            self.assertLess(stats["bytesDecoded"], len(self._PAGE))
+
+            # The prefix is cached apart from the page: a full fetch still downloads everything.
+            self.assertEqual(client.parse_item_page(base_url=server.url(self._PATH), item=item), detailed)
+            self.assertEqual(client.fetch_text(server.url(self._PATH)), self._PAGE)
+            self.assertEqual(len(server.requests), 2)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from komodo_docs_mcp.fulltext import FullTextIndex, doc_location, tokenize
+
+_BASE = "https://docs.rs/komodo_client/1.2.3/komodo_client/api/read/"
+
+
+def _populate(index: FullTextIndex) -> None:
+    index.add_listing(_BASE + "struct.ListStackServices.html", name="ListStackServices", summary="Lists a stack's services.")
+    index.add_listing(_BASE + "struct.ListStacks.html", name="ListStacks", summary="List stacks matching optional query.")
+    index.add_listing(_BASE + "struct.GetBuild.html", name="GetBuild", summary="Get a specific build.")
+    index.add_page(
+        _BASE + "struct.GetBuild.html",
+        name="GetBuild",
+        signature="pub struct GetBuild { pub build: String }",
+        docs="Get a specific build. Response: Build. Accepts the id or name.",
+    )
+
+
+class FullTextIndexTests(unittest.TestCase):
+    def test_tokenize_splits_camel_case_and_stems(self) -> None:
+        self.assertEqual(tokenize("ListStackServices"), ["liststackservice", "list", "stack", "service"])
+        self.assertEqual(tokenize("the endpoint that lists stack services"), ["endpoint", "list", "stack", "service"])
+
+    def test_doc_location_from_url(self) -> None:
+        self.assertEqual(
+            doc_location(_BASE + "struct.ListStacks.html"),
+            ("komodo_client", "1.2.3", "struct", "api::read::ListStacks"),
+        )
+        self.assertEqual(doc_location(_BASE + "index.html"), ("komodo_client", "1.2.3", "mod", "api::read"))
+
+    def test_concept_query_ranks_best_match_first(self) -> None:
+        index = FullTextIndex()
+        _populate(index)
+        hits = index.search("the endpoint that lists stack services", crate="komodo_client", version="1.2.3")
+        self.assertEqual(hits[0].item_path, "api::read::ListStackServices")
+        self.assertEqual(hits[0].summary, "Lists a stack's services.")
+        self.assertEqual(index.search("accepts id", crate="komodo_client")[0].item_path, "api::read::GetBuild")
+        self.assertEqual(index.search("stack", crate="other_crate"), [])
+
+    def test_page_docs_keep_listing_summary(self) -> None:
+        index = FullTextIndex()
+        _populate(index)
+        hit = index.search("build", crate="komodo_client", limit=1)[0]
+        self.assertEqual(hit.summary, "Get a specific build.")
+
+    def test_persisted_index_is_reloaded(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "fulltext.sqlite3")
+            _populate(FullTextIndex(path))
+            reloaded = FullTextIndex(path)
+            self.assertEqual(len(reloaded), 3)
+            hits = reloaded.search("stack services", crate="komodo_client", version="1.2.3")
+            self.assertEqual(hits[0].item_path, "api::read::ListStackServices")
+
+    def test_listing_batches_and_later_pages_are_persisted(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "fulltext.sqlite3")
+            index = FullTextIndex(path)
+            index.add_listings((_BASE + f"struct.Get{n}.html", f"Get{n}", f"Get item {n}.") for n in range(50))
+            index.add_page(_BASE + "struct.Get7.html", name="Get7", signature=None, docs="Needs the deployment id.")
+            reloaded = FullTextIndex(path)
+            self.assertEqual(len(reloaded), 50)
+            hit = reloaded.search("deployment", crate="komodo_client")[0]
+            self.assertEqual((hit.item_path, hit.summary), ("api::read::Get7", "Get item 7."))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from komodo_docs_mcp.fuzzy import FuzzyIndex, camel_tokens, osa_distance
+
+_NAMES = [
+    "StackListItem",
+    "StackListItemInfo",
+    "ListStacks",
+    "ListStackServices",
+    "GetUIConfig",
+    "DeployStack",
+    "Server",
+    "StackListItem",
+]
+
+
+class FuzzyIndexTests(unittest.TestCase):
+    def test_osa_distance(self) -> None:
+        self.assertEqual(osa_distance("stack", "stack", 2), 0)
+        self.assertEqual(osa_distance("stack", "stakc", 2), 1)
+        self.assertEqual(osa_distance("stack", "stacks", 2), 1)
+        self.assertEqual(osa_distance("stack", "sack", 2), 1)
+        self.assertEqual(osa_distance("stack", "server", 2), 3)
+        self.assertEqual(osa_distance("abcdef", "badcfe", 5), 3)
+
+    def test_camel_tokens(self) -> None:
+        self.assertEqual(camel_tokens("GetUIConfig"), ["get", "ui", "config"])
+        self.assertEqual(camel_tokens("GetUiConfig"), ["get", "ui", "config"])
+        self.assertEqual(camel_tokens("ListStackServices"), ["list", "stack", "service"])
+
+    def test_typos_casing_and_reordered_words(self) -> None:
+        index = FuzzyIndex(_NAMES)
+
+        def names(query: str, limit: int = 10) -> list[str]:
+            return [_NAMES[p] for p in index.search(query, limit=limit)]
+
+        self.assertEqual(names("StackListItems", limit=2), ["StackListItem", "StackListItem"])
+        self.assertEqual(names("stakclistitem", limit=1), ["StackListItem"])
+        self.assertEqual(names("ListStackService", limit=1), ["ListStackServices"])
+        self.assertEqual(names("StackServicesList", limit=1), ["ListStackServices"])
+        self.assertEqual(names("GetUiConfig"), ["GetUIConfig"])
+        self.assertEqual(names("Deploystak"), ["DeployStack"])
+        self.assertEqual(names("Zzzzzz"), [])
+        self.assertEqual(names(""), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import threading
+import unittest
+import zlib
+
+from _docs_server import LocalDocsServer
+
+from komodo_docs_mcp.docsrs import DocsRsClient, DocsRsError
+from komodo_docs_mcp.httppool import HttpPool, _StreamDecoder
+
+
+class HttpPoolTests(unittest.TestCase):
+    def test_reuses_connection_and_decodes_gzip(self) -> None:
+        page = "<p>" + "rustdoc " * 500 + "</p>"
+        with LocalDocsServer({"/a.html": page, "/b.html": "<p>b</p>"}, compress=True) as server:
+            client = DocsRsClient(user_agent="test")
+            self.assertEqual(client.fetch_text(server.url("/a.html")), page)
+            self.assertEqual(client.fetch_text(server.url("/b.html")), "<p>b</p>")
+
+            self.assertEqual(len(server.connections), 1)
+            self.assertIn("gzip", server.requests[0][1]["Accept-Encoding"])
+            stats = client.stats()["http"]
+            self.assertEqual((stats["connectionsOpened"], stats["connectionsReused"]), (1, 1))
+            self.assertLess(stats["bytesReceived"], stats["bytesDecoded"])
+
+    def test_until_that_never_holds_reads_whole_body_and_keeps_connection(self) -> None:
+        page = "<p>" + "rustdoc " * 5000 + "</p>"
+        with LocalDocsServer({"/a.html": page, "/b.html": "<p>b</p>"}, compress=True) as server:
+            pool = HttpPool()
+            resp = pool.get(server.url("/a.html"), headers={}, until=lambda body: False)
+            self.assertTrue(resp.complete)
+            self.assertEqual(resp.body.decode(), page)
+            pool.get(server.url("/b.html"), headers={}, until=lambda body: True)
+            self.assertEqual(len(server.connections), 1)
+            self.assertEqual(pool.stats()["streamsStopped"], 0)
+
+    def test_stream_decoder_accepts_both_deflate_flavours(self) -> None:
+        data = b"rustdoc " * 1000
+        for compressed in (zlib.compress(data), zlib.compress(data)[2:-4]):
+            decoder = _StreamDecoder("deflate")
+            out = b"".join(decoder.feed(compressed[i : i + 100]) for i in range(0, len(compressed), 100))
+            self.assertEqual(out + decoder.flush(), data)
+
+    def test_error_status_is_returned_not_raised(self) -> None:
+        with LocalDocsServer({}) as server:
+            resp = HttpPool().get(server.url("/missing.html"), headers={})
+            self.assertEqual(resp.status, 404)
+            self.assertEqual(resp.body, b"")
+
+
+class SingleFlightTests(unittest.TestCase):
+    def _fetch_concurrently(self, client: DocsRsClient, url: str, n: int = 8) -> list[object]:
+        results: list[object] = [None] * n
+        barrier = threading.Barrier(n)
+
+        def run(i: int) -> None:
+            barrier.wait()
+            try:
+                results[i] = client.fetch_text(url)
+            except DocsRsError as e:
+                results[i] = e
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_concurrent_fetches_of_same_url_share_one_request(self) -> None:
+        with LocalDocsServer({"/all.html": "<p>all</p>"}, delay_s=0.1) as server:
+            client = DocsRsClient(user_agent="test")
+            results = self._fetch_concurrently(client, server.url("/all.html"))
+            self.assertEqual(results, ["<p>all</p>"] * 8)
+            self.assertEqual(len(server.requests), 1)
+            self.assertEqual(client.stats()["inflight"]["inFlight"], 0)
+
+    def test_waiters_receive_the_leaders_error(self) -> None:
+        with LocalDocsServer({}, delay_s=0.1) as server:
+            client = DocsRsClient(user_agent="test")
+            results = self._fetch_concurrently(client, server.url("/missing.html"))
+            self.assertTrue(all(isinstance(r, DocsRsError) for r in results))
+            self.assertEqual(len(server.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from komodo_docs_mcp.docsrs import AllItem, search_all_items
+from komodo_docs_mcp.index import SearchIndex, normalize_item_path
+
+
+def _items() -> list[AllItem]:
+    paths = [
+        "entities::stack::StackListItem",
+        "entities::stack::Stack",
+        "entities::stack::StackServiceNames",
+        "api::read::ListStacks",
+        "api::read::ListStackServices",
+        "api::read::GetStacksSummary",
+        "api::write::CreateStack",
+        "api::execute::DeployStack",
+        "entities::server::Server",
+        "entities::deployment::DeploymentListItem",
+        "api::read::ListItems",
+        "api::read::Stack",
+        "a",
+    ]
+    return [AllItem(kind="structs", item_path=p, href=p.replace("::", "/") + ".html") for p in paths]
+
+
+class SearchIndexTests(unittest.TestCase):
+    def test_matches_linear_search_ranking(self) -> None:
+        items = _items()
+        index = SearchIndex(items)
+        for query in [
+            "StackListItem", "stack", "ListStack", "list", "st", "s", "", "EntITIES::stack", "zzz", "kServ",
+            "read", "api", "ities::st", "::list", "read::", "a",
+        ]:
+            for limit in (1, 3, 50):
+                self.assertEqual(
+                    index.search(query, limit=limit),
+                    search_all_items(items, query=query, limit=limit),
+                    msg=f"query={query!r} limit={limit}",
+                )
+
+    def test_query_with_unknown_trigram_has_no_candidates(self) -> None:
+        self.assertEqual(SearchIndex(_items()).search("stackxyz", limit=10), [])
+
+
+class ResolveTests(unittest.TestCase):
+    def test_path_forms_normalize_to_the_item_path(self) -> None:
+        for query in [
+            "api::read::GetStack",
+            " `komodo_client::api::read::GetStack` ",
+            "crate::api::read::GetStack",
+            "api/read/GetStack",
+            "api/read/struct.GetStack.html",
+            "https://docs.rs/komodo-client/1.2.3/komodo_client/api/read/struct.GetStack.html#method.x",
+        ]:
+            self.assertEqual(normalize_item_path(query, crate="komodo-client"), "api::read::GetStack", msg=query)
+
+    def test_resolves_paths_suffixes_and_leaf_names(self) -> None:
+        index = SearchIndex(_items())
+
+        def paths(query: str) -> list[str]:
+            return [it.item_path for it in index.resolve(query, crate="komodo_client")]
+
+        self.assertEqual(paths("komodo_client::api::read::Stack"), ["api::read::Stack"])
+        self.assertEqual(paths("entities/stack/Stack"), ["entities::stack::Stack"])
+        self.assertEqual(paths("stack::stacklistitem"), ["entities::stack::StackListItem"])
+        self.assertEqual(paths("Stack"), ["api::read::Stack", "entities::stack::Stack"])
+        self.assertEqual(paths("write::Stack"), [])
+        self.assertEqual(paths("Stac"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
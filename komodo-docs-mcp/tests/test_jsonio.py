@@ -0,0 +1,24 @@
+import json
+import unittest
+
+from komodo_docs_mcp import jsonio
+
+
+class JsonIoTests(unittest.TestCase):
+    _PAYLOAD = {"crate": "komodo_client", "hits": [{"summary": "Lists a stack’s services.", "score": 1.25}], "n": None}
+
+    def test_indented_output_matches_stdlib(self) -> None:
+        self.assertEqual(jsonio.dumps(self._PAYLOAD, indent=True), json.dumps(self._PAYLOAD, indent=2, ensure_ascii=False))
+
+    def test_compact_output_round_trips_as_utf8(self) -> None:
+        raw = jsonio.dumps_bytes(self._PAYLOAD)
+        self.assertNotIn(b"\n", raw)
+        self.assertIn("’".encode("utf-8"), raw)
+        self.assertEqual(json.loads(raw), self._PAYLOAD)
+
+    def test_values_only_the_stdlib_encodes_still_work(self) -> None:
+        self.assertEqual(json.loads(jsonio.dumps({"big": 2**70, 1: "x"})), {"big": 2**70, "1": "x"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import threading
+import unittest
+
+from komodo_docs_mcp.metrics import Histogram, Metrics, call_stages
+
+
+class HistogramTests(unittest.TestCase):
+    def test_quantiles_are_bucket_bounds_capped_at_max(self) -> None:
+        h = Histogram()
+        for ms in (0.5, 3, 3, 4, 40, 12_000):
+            h.observe(ms)
+        self.assertEqual(h.quantile(0.5), 5.0)
+        self.assertEqual(h.quantile(0.8), 50.0)
+        self.assertEqual(h.quantile(1.0), 12_000)
+        snap = h.snapshot()
+        self.assertEqual(snap["count"], 6)
+        self.assertEqual(snap["buckets"], {"<=1": 1, "<=5": 3, "<=50": 1, "<=30000": 1})
+
+    def test_empty_histogram(self) -> None:
+        self.assertEqual(Histogram().snapshot()["p99Ms"], 0.0)
+
+
+class MetricsTests(unittest.TestCase):
+    def test_stages_are_collected_only_inside_call_stages(self) -> None:
+        metrics = Metrics()
+        metrics.record("fetch", 2.0, stage="fetch")
+        with call_stages() as stages:
+            metrics.record("fetch", 3.0, stage="fetch")
+            worker = threading.Thread(target=metrics.record, args=("parse.item", 1.0), kwargs={"stage": "parse"})
+            worker.start()
+            worker.join()
+            metrics.record("render.json", 4.0, stage="render")
+        self.assertEqual(stages.ms, {"fetch": 3.0, "render": 4.0})
+        self.assertEqual(metrics.snapshot()["histograms"]["fetch"]["count"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import pstats
+import tempfile
+import unittest
+
+from komodo_docs_mcp.profiling import CallProfiler
+
+
+def _busy() -> int:
+    return sum(len(str(n)) for n in range(20_000))
+
+
+class CallProfilerTests(unittest.TestCase):
+    def test_disabled_unless_tools_or_threshold_are_set(self) -> None:
+        self.assertIsNone(CallProfiler.from_env({}, default_dir="x"))
+        self.assertIsNone(CallProfiler.from_env({"KOMODO_DOCS_MCP_PROFILE": "off"}, default_dir="x"))
+
+        p = CallProfiler.from_env({"KOMODO_DOCS_MCP_PROFILE": "komodo_docs_search, komodo_docs_stats"}, default_dir="x")
+        assert p is not None
+        self.assertTrue(p.wants("komodo_docs_search"))
+        self.assertFalse(p.wants("komodo_docs_get_module_docs"))
+
+        p = CallProfiler.from_env({"KOMODO_DOCS_MCP_PROFILE_THRESHOLD_MS": "250"}, default_dir="x")
+        assert p is not None
+        self.assertTrue(p.wants("anything"))
+        self.assertEqual(p.threshold_ms, 250.0)
+
+    def test_writes_profile_and_allocation_summary(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            logged: list[str] = []
+            profiler = CallProfiler(directory=tmp, memory=True, log=logged.append)
+            with profiler.profile("komodo_docs_search", 7):
+                _busy()
+            names = sorted(os.listdir(tmp))
+            self.assertEqual([n.rsplit(".", 1)[-1] for n in names], ["txt", "prof"])
+            self.assertIn("komodo_docs_search-7-", names[1])
+            stats = pstats.Stats(os.path.join(tmp, names[1]))
+            self.assertTrue(any(func[2] == "_busy" for func in stats.stats))  # type: ignore[attr-defined]
+            with open(os.path.join(tmp, names[0]), encoding="utf-8") as fp:
+                self.assertIn("allocation sites", fp.read())
+            self.assertEqual(len(logged), 1)
+
+    def test_fast_calls_under_threshold_leave_nothing(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = CallProfiler(directory=tmp, threshold_ms=60_000)
+            with profiler.profile("komodo_docs_search", 1):
+                _busy()
+            self.assertEqual(os.listdir(tmp), [])
+            self.assertEqual(profiler.written, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
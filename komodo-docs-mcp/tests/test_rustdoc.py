@@ -0,0 +1,96 @@
+import unittest
+
+from komodo_docs_mcp.docsrs import (
+    parse_all_items_html,
+    parse_all_items_html_regex,
+    parse_module_html,
+    parse_module_html_regex,
+    _strip_tags_regex,
+)
+from komodo_docs_mcp.rustdoc import html_to_text, scan_rustdoc
+
+_MODULE_HTML = (
+    '<nav class="sidebar"><h2><a href="../../index.html">komodo_client</a><span class="version">1.19.5</span></h2>'
+    '<ul class="block struct"><li><a href="struct.GetStack.html">GetStack</a></li></ul></nav>'
+    '<div class="rustdoc-breadcrumbs"><a href="../../index.html">komodo_client</a>'
+    '::<wbr><a href="../index.html">api</a></div>'
+    "<h1>Module <span>read</span>&nbsp;</h1>"
+    '<div class="docblock"><h2 id="read-requests"><a class="doc-anchor" href="#read-requests">§</a>Read</h2></div>'
+    '<h2 id="structs" class="section-header">Structs<a href="#structs" class="anchor">§</a></h2>'
+    '<dl class="item-table">'
+    '<dt><a class="struct" href="struct.GetStack.html" title="struct komodo_client::api::read::GetStack">Get<wbr>Stack</a></dt>'
+    '<dd>Get a stack. Response: <a href="../../entities/stack/type.Stack.html"><code>Stack</code></a>.</dd>'
+    '<dt><a class="struct" href="struct.ListStacks.html">List<wbr>Stacks</a></dt>'
+    '<dt><a class="struct deprecated" href="struct.Old.html">Old&amp;Busted</a></dt><dd></dd>'
+    "</dl>"
+    '<h2 id="traits" class="section-header">Traits<a href="#traits" class="anchor">§</a></h2>'
+    '<dl class="item-table"><dt><a class="trait" href="trait.KomodoReadRequest.html">Komodo<wbr>Read<wbr>Request</a></dt>'
+    "<dd>Marker.</dd></dl>"
+)
+
+_ALL_HTML = (
+    '<span class="version">1.19.5</span><h1>List of all items</h1>'
+    '<h3 id="structs">Structs</h3><ul class="all-items">'
+    '<li><a href="api/read/struct.GetStack.html">api::read::Get<wbr>Stack</a></li>'
+    '<li><a href="entities/stack/struct.StackConfig.html">entities::stack::Stack<wbr>Config</a></li>'
+    "</ul>"
+    '<h3 id="macros">Macros</h3><ul class="all-items"><li><a href="macro.api_doc.html">api_doc</a></li></ul>'
+)
+
+
+class ScanRustdocTests(unittest.TestCase):
+    def test_module_parser_matches_regex_parser(self) -> None:
+        kwargs = dict(crate="komodo_client", version="latest", module_path="api::read", page_url="https://docs.rs/x")
+        module = parse_module_html(_MODULE_HTML, **kwargs)
+        self.assertEqual(module, parse_module_html_regex(_MODULE_HTML, **kwargs))
+        self.assertEqual(module.version, "1.19.5")
+        self.assertEqual(module.module_path, "komodo_client::api::read")
+        self.assertEqual([s.id for s in module.sections], ["structs", "traits"])
+        self.assertEqual([it.name for it in module.sections[0].items], ["GetStack", "ListStacks", "Old&Busted"])
+        self.assertEqual([it.summary is None for it in module.sections[0].items], [False, True, True])
+
+    def test_all_items_parser_matches_regex_parser(self) -> None:
+        version, items = parse_all_items_html(_ALL_HTML, version="latest")
+        self.assertEqual((version, items), parse_all_items_html_regex(_ALL_HTML, version="latest"))
+        self.assertEqual(version, "1.19.5")
+        self.assertEqual([(it.kind, it.item_path) for it in items][-1], ("macros", "api_doc"))
+        self.assertEqual(len(items), 3)
+
+    def test_section_header_is_not_paired_with_a_later_sections_table(self) -> None:
+        html = (
+            '<h2 id="empty" class="section-header">Empty<a href="#empty">§</a></h2><p>nothing</p>'
+            '<h2 id="structs" class="section-header">Structs<a href="#structs">§</a></h2>'
+            '<dl class="item-table"><dt><a class="struct" href="struct.A.html">A</a></dt></dl>'
+        )
+        sections = [e[1] for e in scan_rustdoc(html) if e[0] == "section"]
+        self.assertEqual(sections, ["structs"])
+
+
+class HtmlToTextTests(unittest.TestCase):
+    def test_matches_multi_pass_stripper(self) -> None:
+        # Only fragments without the tags whose `\\s` patterns never matched in the old stripper.
+        fragments = [
+            "api::read::Get<wbr>Stack",
+            "Plain &amp; simple",
+            '<p>Get a stack. Response: <a href="../type.Stack.html"><code>Stack</a>.',
+            '<pre class="rust"><code><span class="kw">let </span>x = 1;',
+            "<p>one\n\n\n\n<p>two",
+            '<code class="x">a &lt;b&gt;',
+            "a <> b < c",
+            "<spanx>y</spanx><prefix>z",
+            "<P>upper</P><BR>",
+            "",
+        ]
+        for fragment in fragments:
+            self.assertEqual(html_to_text(fragment), _strip_tags_regex(fragment), msg=fragment)
+
+    def test_renders_tags_the_multi_pass_stripper_dropped(self) -> None:
+        self.assertEqual(html_to_text("<p>one</p><p>two</p>"), "one\n\ntwo")
+        self.assertEqual(html_to_text("a<br>b<br/>c<br />d"), "a\nb\nc\nd")
+        self.assertEqual(html_to_text("<ul><li>x</li><li >y</li></ul>"), "- x\n- y")
+        self.assertEqual(html_to_text("use <code>Foo</code>"), "use `Foo`")
+        self.assertEqual(html_to_text("<pre>let x;</pre>after"), "```text\nlet x;\n```\nafter")
+
+
+if __name__ == "__main__":
+    unittest.main()
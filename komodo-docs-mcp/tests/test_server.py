@@ -0,0 +1,395 @@
+import io
+import json
+import threading
+import time
+import types
+import unittest
+from typing import Any, Optional
+from unittest import mock
+
+from komodo_docs_mcp import docsrs, server
+from komodo_docs_mcp.cache import CachedPage
+from komodo_docs_mcp.docsrs import DocsRsClient, ModuleDocs, check_cancelled
+
+
+class _SlowModuleClient(DocsRsClient):
+    def __init__(self) -> None:
+        super().__init__(user_agent="test")
+        self.polls = 0
+        self.polls_per_call = 50
+
+    def parse_module(self, *, crate: str, version: str, module_path: str) -> ModuleDocs:  # type: ignore[override]
+        # Stands in for a long expansion that keeps fetching pages.
+        for _ in range(self.polls_per_call):
+            self.polls += 1
+            check_cancelled()
+            time.sleep(0.01)
+        return ModuleDocs(crate=crate, version="1.2.3", module_path=module_path, page_url="x/index.html", sections=[])
+
+
+class _OfflineClient(DocsRsClient):
+    def fetch_text(self, url: str, *, ttl_s: int = 300, until=None) -> str:  # type: ignore[override]
+        raise AssertionError(f"unexpected fetch of {url}")
+
+
+class _ItemsClient(DocsRsClient):
+    _MODULE_HTML = (
+        '<span class="version">1.2.3</span>'
+        '<h2 id="structs" class="section-header">Structs<a href="#structs" class="anchor">§</a></h2>'
+        '<dl class="item-table">'
+        + "".join(f'<dt><a class="struct" href="struct.Item{n}.html">Item{n}</a></dt>' for n in range(5))
+        + "</dl>"
+    )
+
+    def __init__(self) -> None:
+        super().__init__(user_agent="test", max_concurrency=2)
+        self.fetched: list[str] = []
+
+    def fetch_text(self, url: str, *, ttl_s: int = 300, until=None) -> str:  # type: ignore[override]
+        if url.endswith("/index.html"):
+            return self._MODULE_HTML
+        self.fetched.append(url.rsplit("/", 1)[1])
+        n = url.rsplit("Item", 1)[1].split(".")[0]
+        return f'<pre class="rust item-decl">pub struct Item{n};</pre>'
+
+
+class _ChunkedReader:
+    """stdin.buffer stand-in that hands out at most `chunk` bytes per read."""
+
+    def __init__(self, data: bytes, chunk: int) -> None:
+        self._data = io.BytesIO(data)
+        self._chunk = chunk
+
+    def read1(self, size: int = -1) -> bytes:
+        return self._data.read1(min(size, self._chunk))
+
+
+def _read_all(data: bytes, chunk: int = 7) -> tuple[list[Any], list[str]]:
+    transport = server._StdioJsonRpc()
+    messages: list[Any] = []
+    framings: list[str] = []
+    with mock.patch.object(server.sys, "stdin", types.SimpleNamespace(buffer=_ChunkedReader(data, chunk))):
+        while (msg := transport.read_message()) is not None:
+            messages.append(msg)
+            framings.append(transport.last_framing)
+    return messages, framings
+
+
+class _CountingPagesClient(DocsRsClient):
+    _ALL_HTML = (
+        '<span class="version">1.2.3</span><h3 id="structs">Structs</h3><ul class="all-items">'
+        '<li><a href="api/read/struct.GetStack.html">api::read::GetStack</a></li></ul>'
+    )
+
+    def __init__(self) -> None:
+        super().__init__(user_agent="test")
+        self.fetches: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _fetch_uncached(self, url: str, *, ttl_s, until=None) -> str:  # type: ignore[override]
+        with self._lock:
+            self.fetches[url] = self.fetches.get(url, 0) + 1
+        time.sleep(0.05)  # slow enough for the calls to arrive while the warmup is fetching
+        text = self._ALL_HTML if url.endswith("/all.html") else _ItemsClient._MODULE_HTML
+        self._cache.put(CachedPage(url=url, text=text, fetched_at=time.time()))
+        return text
+
+
+def _serve(messages: list[dict[str, Any]], client: DocsRsClient, **kwargs: Any) -> list[dict[str, Any]]:
+    stdin = types.SimpleNamespace(buffer=io.BytesIO("".join(json.dumps(m) + "\n" for m in messages).encode()))
+    stdout = io.StringIO()
+    with mock.patch.object(server.sys, "stdin", stdin), mock.patch.object(server.sys, "stdout", stdout):
+        server.serve(server._StdioJsonRpc(), client, workers=2, **kwargs)
+    return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+def _call(req_id: int, name: str, arguments: dict[str, Any]) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": req_id, "method": "tools/call", "params": {"name": name, "arguments": arguments}}
+
+
+class ServerDispatchTests(unittest.TestCase):
+    def test_ping_is_answered_while_tool_call_runs(self) -> None:
+        responses = _serve(
+            [
+                _call(1, "komodo_docs_get_module_docs", {"modulePath": "komodo_client::api::read"}),
+                {"jsonrpc": "2.0", "id": 2, "method": "ping"},
+            ],
+            _SlowModuleClient(),
+        )
+        self.assertEqual([r["id"] for r in responses], [2, 1])
+        self.assertIn("komodo_client::api::read", responses[1]["result"]["content"][0]["text"])
+
+    def test_cancelled_call_stops_and_gets_no_response(self) -> None:
+        client = _SlowModuleClient()
+        responses = _serve(
+            [
+                _call(1, "komodo_docs_get_module_docs", {}),
+                {"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": 1}},
+                {"jsonrpc": "2.0", "id": 2, "method": "ping"},
+            ],
+            client,
+        )
+        self.assertEqual([r["id"] for r in responses], [2])
+        self.assertLess(client.polls, 50)
+
+
+    def test_calls_still_running_after_stdin_closes_are_cancelled(self) -> None:
+        client = _SlowModuleClient()
+        client.polls_per_call = 1000  # ~10 s, like a prefetch crawl
+        started = time.monotonic()
+        with mock.patch.object(server, "_EXIT_GRACE_S", 0.1):
+            responses = _serve([_call(1, "komodo_docs_get_module_docs", {})], client)
+        self.assertEqual(responses, [])
+        self.assertLess(time.monotonic() - started, 2)
+
+class ModuleDocsProgressTests(unittest.TestCase):
+    def test_progress_notifications_follow_item_pages(self) -> None:
+        req = _call(1, "komodo_docs_get_module_docs", {"includeItemDocs": True, "maxItems": 5})
+        req["params"]["_meta"] = {"progressToken": "tok"}
+        messages = _serve([req], _ItemsClient())
+
+        progress = [m["params"] for m in messages if m.get("method") == "notifications/progress"]
+        self.assertEqual([p["progress"] for p in progress], [1, 2, 3, 4, 5])
+        self.assertTrue(all(p["progressToken"] == "tok" and p["total"] == 5 for p in progress))
+        self.assertEqual(messages[-1]["id"], 1)
+
+    def test_page_size_returns_first_items_with_continuation(self) -> None:
+        client = _ItemsClient()
+        args = {"pageSize": 2, "maxItems": 5, "format": "json"}
+        pages = []
+        while True:
+            result = server._handle_tool_get_module_docs(args, client)
+            pages.append(json.loads(result["content"][0]["text"]))
+            if not pages[-1]["continuation"]:
+                break
+            args = {"continuation": pages[-1]["continuation"]}
+
+        self.assertEqual([p["expanded"]["count"] for p in pages], [2, 2, 1])
+        self.assertEqual(len(pages[0]["sections"][0]["items"]), 5)
+        later = [it["signature"] for p in pages[1:] for it in p["sections"][0]["items"]]
+        self.assertEqual(later, [f"pub struct Item{n};" for n in range(2, 5)])
+        self.assertEqual(pages[1]["version"], "1.2.3")
+
+        md = server._handle_tool_get_module_docs({"pageSize": 2, "maxItems": 5}, client)["content"][0]["text"]
+        self.assertIn("_Expanded items 1–2 of 5. Call again with `continuation:", md)
+
+    def test_invalid_continuation_is_a_tool_error(self) -> None:
+        result = server._handle_tool_get_module_docs({"continuation": "not base64!"}, _ItemsClient())
+        self.assertTrue(result["isError"])
+
+
+class WarmupTests(unittest.TestCase):
+    def test_initialize_warms_pages_and_calls_share_the_work(self) -> None:
+        client = _CountingPagesClient()
+        parse_all_items_html = docsrs.parse_all_items_html
+
+        def slow_parse(html: str, *, version: str) -> Any:
+            time.sleep(0.05)  # a real all.html takes a while to parse
+            return parse_all_items_html(html, version=version)
+
+        with mock.patch.object(docsrs, "parse_all_items_html", slow_parse):
+            responses = _serve(
+                [
+                    {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+                    {"jsonrpc": "2.0", "id": 2, "method": "tools/list"},
+                    _call(3, "komodo_docs_search", {"query": "GetStack"}),
+                    _call(4, "komodo_docs_get_module_docs", {"modulePath": "komodo_client::api::read"}),
+                ],
+                client,
+                warmup_modules=("api::read",),
+            )
+        self.assertEqual(sorted(r["id"] for r in responses), [1, 2, 3, 4])
+        by_id = {r["id"]: r for r in responses}
+        self.assertIn("api::read::GetStack", by_id[3]["result"]["content"][0]["text"])
+        self.assertEqual(set(client.fetches.values()), {1}, client.fetches)
+        histograms = client.metrics.snapshot()["histograms"]
+        self.assertEqual(histograms["warmup.allItems"]["count"], 1)
+        self.assertEqual((histograms["parse.allItems"]["count"], histograms["parse.module"]["count"]), (1, 1))
+
+    def test_no_warmup_by_default(self) -> None:
+        client = _CountingPagesClient()
+        _serve([{"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}}], client)
+        self.assertEqual(client.fetches, {})
+
+
+class StatsToolTests(unittest.TestCase):
+    def test_stats_cover_tool_latency_stages_and_fetches(self) -> None:
+        client = _ItemsClient()
+        _serve([_call(1, "komodo_docs_get_module_docs", {"includeItemDocs": True, "format": "json"})], client)
+        stats = json.loads(server._handle_tool_stats({"format": "json"}, client)["content"][0]["text"])
+        self.assertEqual(stats["tools"]["komodo_docs_get_module_docs"]["count"], 1)
+        self.assertEqual(stats["stages"]["parse.item"]["count"], 5)
+        self.assertEqual(stats["stages"]["render.json"]["count"], 1)
+        self.assertEqual(stats["counters"]["tools.ok"], 1)
+        self.assertEqual(stats["inFlight"], {"toolCalls": 0, "fetches": 0})
+
+        md = server._handle_tool_stats({}, client)["content"][0]["text"]
+        self.assertIn("| komodo_docs_get_module_docs | 1 |", md)
+        self.assertIn("calls: komodo_docs_get_module_docs 1x", server._stats_summary_line(client))
+
+
+class TransportTests(unittest.TestCase):
+    def test_pipelined_ndjson_split_across_reads(self) -> None:
+        sent = [{"id": n, "text": "é" * n} for n in range(20)]
+        messages, _ = _read_all("".join(json.dumps(m, ensure_ascii=False) + "\n" for m in sent).encode())
+        self.assertEqual(messages, sent)
+
+    def test_raw_json_without_newlines(self) -> None:
+        data = b'{"id": 1}{"id": 2}\n{\n  "id": 3,\n  "nested": {"a": [1]}\n}\n{"id": 4}'
+        messages, _ = _read_all(data, chunk=3)
+        self.assertEqual([m["id"] for m in messages], [1, 2, 3, 4])
+
+    def test_pretty_printed_messages_are_decoded_once(self) -> None:
+        sent = [
+            {"id": 1, "text": 'braces } ] { [ and "quotes" \\', "items": [{"n": n} for n in range(500)]},
+            {"id": 2, "text": "é" * 50},
+        ]
+        data = "".join(json.dumps(m, indent=2, ensure_ascii=False) + "\n" for m in sent).encode()
+        self.assertGreater(data.count(b"\n"), 1000)
+        decoder = json.JSONDecoder()
+        with mock.patch.object(server, "JSONDecoder", return_value=decoder), mock.patch.object(
+            decoder, "raw_decode", wraps=decoder.raw_decode
+        ) as raw_decode:
+            messages, _ = _read_all(data, chunk=5)
+        self.assertEqual(messages, sent)
+        # At most a failed try on the first line, then one decode once the brackets close.
+        self.assertLessEqual(raw_decode.call_count, 2 * len(sent))
+
+    def test_content_length_and_ndjson_mixed(self) -> None:
+        big = json.dumps({"id": 1, "blob": "x" * 200_000}).encode()
+        data = (
+            b"Content-Length: %d\r\n\r\n%s" % (len(big), big)
+            + b'\n{"id": 2}\n'
+            + b'Content-Length: 9\n\n{"id": 3}'
+        )
+        messages, framings = _read_all(data, chunk=4096)
+        self.assertEqual([m["id"] for m in messages], [1, 2, 3])
+        self.assertEqual(len(messages[0]["blob"]), 200_000)
+        self.assertEqual(framings, ["content-length", "ndjson", "content-length"])
+
+    def test_truncated_message_ends_the_stream(self) -> None:
+        messages, _ = _read_all(b'{"id": 1}\n{"id": 2')
+        self.assertEqual(messages, [{"id": 1}])
+
+
+class _CountingStdout:
+    def __init__(self) -> None:
+        self.buffer = self
+        self.writes: list[bytes] = []
+
+    def write(self, data: bytes) -> None:
+        self.writes.append(bytes(data))
+
+    def flush(self) -> None:
+        pass
+
+
+class WriterTests(unittest.TestCase):
+    def test_content_length_frame_is_one_write(self) -> None:
+        stdout = _CountingStdout()
+        with mock.patch.object(server.sys, "stdout", stdout), mock.patch.object(server, "_STDIO_MODE", "content-length"):
+            server._write_message({"jsonrpc": "2.0", "id": 1, "result": {"text": "ü"}})
+        self.assertEqual(len(stdout.writes), 1)
+        header, body = stdout.writes[0].split(b"\r\n\r\n", 1)
+        self.assertEqual(header, b"Content-Length: %d" % len(body))
+        self.assertEqual(json.loads(body)["result"]["text"], "ü")
+
+    def test_concurrent_messages_stay_whole_and_ordered_per_thread(self) -> None:
+        stdout = _CountingStdout()
+
+        def worker(t: int) -> None:
+            for n in range(200):
+                server._write_message({"t": t, "n": n, "pad": "x" * (n % 7) * 100})
+
+        with mock.patch.object(server.sys, "stdout", stdout):
+            threads = [threading.Thread(target=worker, args=(t,)) for t in range(4)]
+            for th in threads:
+                th.start()
+            for th in threads:
+                th.join()
+        messages = [json.loads(line) for line in b"".join(stdout.writes).splitlines()]
+        self.assertEqual(len(messages), 800)
+        for t in range(4):
+            self.assertEqual([m["n"] for m in messages if m["t"] == t], list(range(200)))
+
+
+class _ItemPagesClient(DocsRsClient):
+    _ALL_HTML = (
+        '<span class="version">1.2.3</span><h3 id="structs">Structs</h3><ul class="all-items">'
+        '<li><a href="api/read/struct.Stack.html">api::read::Stack</a></li>'
+        '<li><a href="entities/stack/struct.StackConfig.html">entities::stack::StackConfig</a></li>'
+        '<li><a href="entities/stack/struct.Stack.html">entities::stack::Stack</a></li></ul>'
+    )
+
+    def fetch_text(self, url: str, *, ttl_s: int = 300, until=None) -> str:  # type: ignore[override]
+        if url.endswith("/all.html"):
+            return self._ALL_HTML
+        name = url.rsplit("/", 1)[1][len("struct.") : -len(".html")]
+        return f'<pre class="rust item-decl">pub struct {name};</pre>'
+
+
+class ItemDocsToolTests(unittest.TestCase):
+    def _item(self, query: str, client: Optional[DocsRsClient] = None) -> dict[str, Any]:
+        client = client or _ItemPagesClient(user_agent="test")
+        result = server._handle_tool_get_item_docs({"item": query, "format": "json"}, client)
+        return json.loads(result["content"][0]["text"])
+
+    def test_full_path_wins_over_shorter_matches(self) -> None:
+        payload = self._item("komodo_client::entities::stack::Stack")
+        self.assertEqual(payload["item"]["itemPath"], "entities::stack::Stack")
+        self.assertEqual(payload["item"]["signature"], "pub struct Stack;")
+        self.assertEqual(payload["match"], "exact")
+        self.assertEqual(payload["alternatives"], [])
+
+    def test_leaf_name_lists_other_candidates(self) -> None:
+        payload = self._item("entities/stack/struct.Stack.html")
+        self.assertEqual(payload["item"]["itemPath"], "entities::stack::Stack")
+        payload = self._item("Stack")
+        self.assertEqual(payload["item"]["itemPath"], "api::read::Stack")
+        self.assertEqual([a["itemPath"] for a in payload["alternatives"]], ["entities::stack::Stack"])
+
+    def test_falls_back_to_search_then_near_misses(self) -> None:
+        payload = self._item("StackConf")
+        self.assertEqual((payload["match"], payload["item"]["itemPath"]), ("substring", "entities::stack::StackConfig"))
+        payload = self._item("entities::stack::StakcConfigs")
+        self.assertEqual((payload["match"], payload["item"]["itemPath"]), ("fuzzy", "entities::stack::StackConfig"))
+
+    def test_near_miss_index_is_only_built_on_a_miss(self) -> None:
+        client = _ItemPagesClient(user_agent="test")
+        self._item("Stack", client)
+        self._item("StackConf", client)
+        _, index = client.all_items_index(crate="komodo_client", version="latest")
+        self.assertIsNone(index._fuzzy)
+        self._item("StakcConfig", client)
+        self.assertIsNotNone(index._fuzzy)
+
+
+class SearchToolTests(unittest.TestCase):
+    def test_fulltext_mode_answers_from_index_without_fetching(self) -> None:
+        client = _OfflineClient(user_agent="test")
+        client.fulltext.add_listing(
+            "https://docs.rs/komodo_client/latest/komodo_client/api/read/struct.ListStackServices.html",
+            name="ListStackServices",
+            summary="Lists a stack's services.",
+        )
+        result = server._handle_tool_search(
+            {"query": "endpoint that lists stack services", "mode": "fulltext", "format": "json"}, client
+        )
+        hits = json.loads(result["content"][0]["text"])["hits"]
+        self.assertEqual(hits[0]["itemPath"], "api::read::ListStackServices")
+
+    def test_compact_json_is_minified(self) -> None:
+        client = _OfflineClient(user_agent="test")
+        client.fulltext.add_listing(
+            "https://docs.rs/komodo_client/latest/komodo_client/api/read/struct.GetStack.html", name="GetStack", summary="Get a stack."
+        )
+        args = {"query": "stack", "mode": "fulltext", "format": "json"}
+        pretty = server._handle_tool_search(args, client)["content"][0]["text"]
+        compact = server._handle_tool_search({**args, "compact": True}, client)["content"][0]["text"]
+        self.assertEqual(json.loads(compact), json.loads(pretty))
+        self.assertEqual(compact.count("\n"), 1)
+        self.assertLess(len(compact), len(pretty))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from komodo_docs_mcp import server, snapshot
+from komodo_docs_mcp.cache import CachedPage, MemoryPageCache
+from komodo_docs_mcp.crawler import RateLimiter
+from komodo_docs_mcp.docsrs import DocsRsClient, DocsRsError
+from komodo_docs_mcp.snapshot import SnapshotArchive, SnapshotClient, SnapshotError, export_snapshot, write_snapshot
+
+_PATHS = ["api::read::GetStack", "api::read::ListStacks", "entities::stack::Stack"]
+
+
+class _CrateClient(DocsRsClient):
+    _ALL_HTML = (
+        '<span class="version">1.2.3</span><h3 id="structs">Structs</h3><ul class="all-items">'
+        + "".join(
+            f'<li><a href="{p.rsplit("::", 1)[0].replace("::", "/")}/struct.{p.rsplit("::", 1)[1]}.html">{p}</a></li>'
+            for p in _PATHS
+        )
+        + "</ul>"
+    )
+    _READ_HTML = (
+        '<span class="version">1.2.3</span>'
+        '<h2 id="structs" class="section-header">Structs<a href="#structs" class="anchor">§</a></h2>'
+        '<dl class="item-table">'
+        '<dt><a class="struct" href="struct.GetStack.html">GetStack</a></dt><dd>Get a stack.</dd>'
+        '<dt><a class="struct" href="struct.ListStacks.html">ListStacks</a></dt><dd>List stacks.</dd>'
+        "</dl>"
+    )
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(user_agent="test", **kwargs)
+        self.requests = 0
+
+    def _fetch_uncached(self, url: str, *, ttl_s, until=None) -> str:  # type: ignore[override]
+        self.requests += 1
+        if url.endswith("/struct.Gone.html"):
+            raise DocsRsError(f"docs.rs returned HTTP 404 for {url}")
+        if url.endswith("/all.html"):
+            text = self._ALL_HTML
+        elif url.endswith("/api/read/index.html"):
+            text = self._READ_HTML
+        elif url.endswith("/index.html"):
+            text = '<span class="version">1.2.3</span>'
+        else:
+            name = url.rsplit("/", 1)[1][len("struct.") : -len(".html")]
+            text = f'<pre class="rust item-decl">pub struct {name};</pre><div class="docblock"><p>{name} docs.</p></div>'
+        self._cache.put(CachedPage(url=url, text=text, fetched_at=time.time()))
+        return text
+
+
+class SnapshotTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, "komodo_client.kdsnap")
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def _text(self, result: dict) -> dict:
+        self.assertFalse(result.get("isError"), result)
+        return json.loads(result["content"][0]["text"])
+
+    def test_export_then_answer_all_tools_offline(self) -> None:
+        meta = export_snapshot(_CrateClient(), self.path, crate="komodo_client")
+        self.assertEqual((meta["version"], meta["symbols"], meta["itemPages"]), ("1.2.3", 3, 3))
+
+        archive = SnapshotArchive(self.path)
+        self.addCleanup(archive.close)
+        self.assertEqual(list(archive.keys("module ")), [
+            "module komodo_client", "module komodo_client/api", "module komodo_client/api/read",
+            "module komodo_client/entities", "module komodo_client/entities/stack",
+        ])
+        client = SnapshotClient(archive)
+
+        hits = self._text(server._handle_tool_search({"query": "stack", "format": "json"}, client))["hits"]
+        self.assertEqual([h["itemPath"] for h in hits], ["entities::stack::Stack", "api::read::GetStack", "api::read::ListStacks"])
+        item = self._text(server._handle_tool_get_item_docs({"item": "api::read::GetStack", "format": "json"}, client))
+        self.assertEqual((item["version"], item["item"]["signature"]), ("1.2.3", "pub struct GetStack;"))
+        module = self._text(
+            server._handle_tool_get_module_docs({"includeItemDocs": True, "format": "json"}, client)
+        )
+        self.assertEqual([it["signature"] for it in module["sections"][0]["items"]], ["pub struct GetStack;", "pub struct ListStacks;"])
+        fulltext = self._text(
+            server._handle_tool_search({"query": "list stacks", "mode": "fulltext", "format": "json"}, client)
+        )
+        self.assertEqual(fulltext["hits"][0]["itemPath"], "api::read::ListStacks")
+
+        with self.assertRaises(SnapshotError):
+            client.parse_module(crate="komodo_client", version="2.0.0", module_path="api::read")
+        with self.assertRaises(SnapshotError):
+            client.fetch_text("https://docs.rs/komodo_client/1.2.3/komodo_client/api/write/index.html")
+
+    def test_pages_only_listed_on_module_pages_are_rate_limited_too(self) -> None:
+        client = _CrateClient()
+        client._READ_HTML = _CrateClient._READ_HTML.replace(
+            "</dl>", '<dt><a class="struct" href="struct.Hidden.html">Hidden</a></dt></dl>'
+        )
+        acquired = []
+
+        class CountingLimiter(RateLimiter):
+            def acquire(self) -> None:
+                acquired.append(1)
+                super().acquire()
+
+        with mock.patch.object(snapshot, "RateLimiter", CountingLimiter):
+            meta = export_snapshot(client, self.path, crate="komodo_client")
+        self.assertEqual(meta["itemPages"], 4)
+        # Every request but the all.html one the crawl starts from.
+        self.assertEqual(len(acquired), client.requests - 1)
+
+    def test_pages_evicted_from_a_small_memory_cache_are_still_archived(self) -> None:
+        client = _CrateClient(memory_cache=MemoryPageCache(max_bytes=700))
+        client._READ_HTML = _CrateClient._READ_HTML.replace(
+            "</dl>", '<dt><a class="struct" href="struct.Gone.html">Gone</a></dt></dl>'
+        )
+        meta = export_snapshot(client, self.path, crate="komodo_client")
+        self.assertEqual((meta["itemPages"], meta["skippedItemPages"]), (3, 1))
+
+        archive = SnapshotArchive(self.path)
+        self.addCleanup(archive.close)
+        args = {"item": "entities::stack::Stack", "format": "json"}
+        item = self._text(server._handle_tool_get_item_docs(args, SnapshotClient(archive)))
+        self.assertEqual(item["item"]["signature"], "pub struct Stack;")
+
+    def test_records_are_found_by_key_and_bad_files_are_rejected(self) -> None:
+        write_snapshot(self.path, {"meta": {"crate": "c"}, "b": [1, 2], "a": "x" * 10_000})
+        archive = SnapshotArchive(self.path)
+        self.addCleanup(archive.close)
+        self.assertEqual((len(archive), archive.get("a"), archive.get("b"), archive.get("c")), (3, "x" * 10_000, [1, 2], None))
+        self.assertLess(os.path.getsize(self.path), 1000)
+
+        with open(self.path, "wb") as fp:
+            fp.write(b"not an archive, just some bytes")
+        with self.assertRaises(SnapshotError):
+            SnapshotArchive(self.path)
+
+    def test_truncated_or_corrupt_archives_raise_snapshot_errors(self) -> None:
+        write_snapshot(self.path, {"meta": {"crate": "c"}, "a": "x" * 10_000})
+        with open(self.path, "rb") as fp:
+            data = fp.read()
+        for broken in (data[: len(data) // 2], data[:40]):
+            with open(self.path, "wb") as fp:
+                fp.write(broken)
+            with self.assertRaises(SnapshotError):
+                SnapshotArchive(self.path)
+
+        meta = {"crate": "c", "version": "1"}
+        for records in ({"meta": meta}, {"meta": meta, "all": {"names": []}}):
+            write_snapshot(self.path, records)
+            archive = SnapshotArchive(self.path)
+            self.addCleanup(archive.close)
+            with self.assertRaises(SnapshotError):
+                SnapshotClient(archive).all_items_index(crate="c", version="latest")
+
+        # Garble the first record ("a") past its zlib header.
+        with open(self.path, "wb") as fp:
+            fp.write(data[:40] + b"\xff" * 8 + data[48:])
+        archive = SnapshotArchive(self.path)
+        self.addCleanup(archive.close)
+        with self.assertRaises(SnapshotError):
+            archive.get("a")
+
+
+if __name__ == "__main__":
+    unittest.main()
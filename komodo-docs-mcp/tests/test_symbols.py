@@ -0,0 +1,29 @@
+import unittest
+
+from komodo_docs_mcp.symbols import AllItem, SymbolTable
+
+
+class SymbolTableTests(unittest.TestCase):
+    _ITEMS = [
+        AllItem(kind="structs", item_path="api::read::GetStack", href="api/read/struct.GetStack.html"),
+        AllItem(kind="type aliases", item_path="entities::stack::Stack", href="entities/stack/type.Stack.html"),
+        AllItem(kind="structs", item_path="api::read::ListStacks", href="api/read/struct.ListStacks.html"),
+        AllItem(kind="macros", item_path="api_doc", href="macro.api_doc.html"),
+        AllItem(kind="structs", item_path="odd::Thing", href="elsewhere/struct.Thing.html#anchor"),
+    ]
+
+    def test_rows_round_trip(self) -> None:
+        table = SymbolTable(self._ITEMS)
+        self.assertEqual(list(table), self._ITEMS)
+        self.assertEqual(table[-1], self._ITEMS[-1])
+        self.assertEqual(table[1:3], self._ITEMS[1:3])
+
+    def test_kinds_and_modules_are_shared(self) -> None:
+        table = SymbolTable(self._ITEMS)
+        self.assertEqual(table.modules, ["api::read", "entities::stack", "", "odd"])
+        self.assertEqual(len(table.kinds), 4)  # the odd href is stored apart, under its own (kind, "") entry
+        self.assertIs(table.kind(0), table.kind(2))
+
+
+if __name__ == "__main__":
+    unittest.main()